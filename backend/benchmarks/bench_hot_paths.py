@@ -0,0 +1,63 @@
+"""
+Benchmarks for the request hot paths, over seeded synthetic corpora (see conftest.py).
+"""
+import pytest
+
+from pdf_utils import clean_text, extract_pdf_text
+from llm.enhanced_analyzer import EnhancedCareerAnalyzer
+from llm.structured_output import ANALYSIS_SCHEMA, parse_json_text, parse_structured
+
+ROLES = ["Data Analyst", "Data Scientist", "Software Engineer"]
+
+
+def test_extract_skills_from_text(benchmark, api_module, resumes):
+    benchmark(lambda: [api_module.extract_skills_from_text(text) for text in resumes])
+
+
+def test_fallback_analyze(benchmark, api_module, resumes):
+    cases = [(text, api_module.extract_skills_from_text(text), ROLES[i % len(ROLES)])
+             for i, text in enumerate(resumes)]
+    benchmark(lambda: [api_module.fallback_analyze(text, skills, role, "Intermediate", "Technology")
+                       for text, skills, role in cases])
+
+
+def test_anonymize_resume(benchmark, api_module, resumes):
+    if api_module.nlp is None:
+        pytest.skip("spaCy model en_core_web_sm not installed")
+
+    # The path analyze-resume runs: select the prompt's sections, then redact them
+    requests = [api_module.ResumeAnalysisRequest(resume_text=text, skills=["python", "sql"],
+                                                 target_role=ROLES[i % len(ROLES)])
+                for i, text in enumerate(resumes)]
+
+    def run():
+        api_module._anonymize_cache.clear()  # measure NER, not the cache
+        return [api_module.prompt_resume(request) for request in requests]
+    benchmark(run)
+
+
+def test_clean_text(benchmark, resumes):
+    benchmark(lambda: [clean_text(text) for text in resumes])
+
+
+def test_extract_pdf_text(benchmark, resume_pdf):
+    pages = benchmark.pedantic(extract_pdf_text, args=(resume_pdf,), rounds=5, iterations=1)
+    assert len(pages) > 1 and any("EXPERIENCE" in p.text for p in pages)
+
+
+def test_get_role_insights(benchmark, unified_analyzer):
+    results = benchmark(lambda: [unified_analyzer.get_role_insights(role) for role in ROLES])
+    assert all("error" not in r for r in results)
+
+
+def test_analyze_skill_trends(benchmark, unified_analyzer):
+    benchmark.pedantic(unified_analyzer.analyze_skill_trends, args=("python",), rounds=3, iterations=1)
+
+
+def test_parse_json_text(benchmark, llm_replies):
+    benchmark(lambda: [parse_json_text(reply) for reply in llm_replies])
+
+
+def test_parse_structured_analysis(benchmark, llm_replies):
+    fallback = EnhancedCareerAnalyzer._get_fallback_analysis(None, ["python"], "Data Analyst", {})
+    benchmark(lambda: [parse_structured(reply, ANALYSIS_SCHEMA, fallback) for reply in llm_replies])
@@ -0,0 +1,89 @@
+"""
+Fixtures for the hot-path benchmark suite (bench_*.py).
+
+Run from backend/:
+  pytest benchmarks                                   # run and print timings
+  pytest benchmarks --benchmark-save=baseline         # store a baseline in benchmarks/.benchmarks
+  pytest benchmarks --benchmark-compare --benchmark-compare-fail=median:15%
+                                                      # fail if any median regressed >15% vs the last save
+Corpus size and seed: --corpus-size (default 200) and --corpus-seed (default 1234).
+Baselines are machine-specific: compare only runs made on the same host.
+"""
+import json
+import os
+import random
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# No LLM traffic from benchmarks: empty keys keep the analyzers in fallback mode
+# (load_dotenv does not override variables that are already set)
+os.environ["GEMINI_API_KEY"] = ""
+os.environ["OPENAI_API_KEY"] = ""
+
+for path in (BACKEND_DIR, os.path.join(BACKEND_DIR, "llm"), os.path.dirname(os.path.abspath(__file__))):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import corpus  # noqa: E402
+
+
+def pytest_addoption(parser):
+    parser.addoption("--corpus-size", type=int, default=200, help="synthetic items per corpus")
+    parser.addoption("--corpus-seed", type=int, default=1234, help="seed for the synthetic corpora")
+
+
+@pytest.fixture(scope="session")
+def corpus_size(request):
+    return request.config.getoption("--corpus-size")
+
+
+@pytest.fixture(scope="session")
+def corpus_seed(request):
+    return request.config.getoption("--corpus-seed")
+
+
+@pytest.fixture(scope="session")
+def resumes(corpus_size, corpus_seed):
+    return corpus.resume_corpus(corpus_size, corpus_seed)
+
+
+@pytest.fixture(scope="session")
+def llm_replies(corpus_size, corpus_seed):
+    return corpus.llm_replies(corpus_size, corpus_seed)
+
+
+@pytest.fixture(scope="session")
+def resume_pdf(tmp_path_factory, corpus_seed):
+    """One multi-page PDF built from several synthetic resumes"""
+    rng = random.Random(corpus_seed)
+    text = "\n\n".join(corpus.resume_text(rng, jobs=6) for _ in range(3))
+    return corpus.write_pdf(str(tmp_path_factory.mktemp("pdf") / "resume.pdf"), text)
+
+
+@pytest.fixture(scope="session")
+def api_module():
+    """llm/api.py imported with LLM keys blanked (fallback analyzer paths only)"""
+    from llm import api
+    return api
+
+
+@pytest.fixture(scope="session")
+def unified_analyzer(tmp_path_factory, corpus_size, corpus_seed):
+    """UnifiedCareerAnalyzer loading a synthetic dataset (50 positions per corpus item)"""
+    data_root = tmp_path_factory.mktemp("dataset")
+    os.makedirs(data_root / "data")
+    frame = corpus.positions_frame(corpus_size * 50, corpus_seed)
+    frame.to_csv(data_root / "data" / "merged_processed.csv", index=False)
+    with open(data_root / "data" / "merged_analysis.json", "w") as f:
+        json.dump(corpus.analysis_summary(frame), f)
+
+    from unified_career_analyzer import UnifiedCareerAnalyzer
+    cwd = os.getcwd()
+    os.chdir(data_root)  # the analyzer reads data/ relative to the working directory
+    try:
+        return UnifiedCareerAnalyzer()
+    finally:
+        os.chdir(cwd)
@@ -0,0 +1,251 @@
+"""
+Seeded synthetic inputs for the benchmarks: resumes (text and PDF), historical
+position records in the merged_processed.csv schema, and LLM replies.
+
+Everything is derived from random.Random(seed), so a given (size, seed) pair
+always produces the same corpus and benchmark runs stay comparable.
+"""
+import ast
+import json
+import random
+
+import numpy as np
+import pandas as pd
+
+ROLES = ["Data Analyst", "Data Scientist", "Software Engineer", "Machine Learning Engineer",
+         "Business Analyst", "Data Engineer", "Product Manager", "DevOps Engineer"]
+SENIORITY = ["", "Senior ", "Junior ", "Lead ", "Principal "]
+INDUSTRIES = ["Technology", "Finance", "Healthcare", "Retail", "Consulting", "Manufacturing"]
+EXPERIENCE_LEVELS = ["Entry", "Intermediate", "Senior", "Lead"]
+
+# Ordered by popularity; sampled with Zipf weights so a few skills dominate, as in real postings
+SKILLS = [
+    "python", "sql", "excel", "java", "javascript", "aws", "tableau", "machine learning",
+    "docker", "git", "linux", "pandas", "statistics", "react", "power bi", "azure", "kubernetes",
+    "spark", "data analysis", "tensorflow", "numpy", "scikit-learn", "postgresql", "mongodb",
+    "rest", "node.js", "c++", "r", "deep learning", "nlp", "gcp", "jenkins", "flask", "django",
+    "visualization", "airflow", "kafka", "snowflake", "dbt", "pytorch", "redis", "go", "scala",
+    "stakeholder management", "dashboard", "feature engineering", "computer vision", "typescript",
+    "hadoop", "sas", "vba", "jquery", "perl", "llm", "mlops",
+]
+ZIPF_EXPONENT = 1.1
+SKILL_WEIGHTS = [1 / (rank ** ZIPF_EXPONENT) for rank in range(1, len(SKILLS) + 1)]
+
+# Relative popularity change per decade (log scale) for position records: >0 rising, <0 fading
+SKILL_TRENDS = {
+    "pytorch": 2.5, "kubernetes": 2.0, "snowflake": 2.5, "dbt": 3.0, "airflow": 2.0, "llm": 4.0,
+    "mlops": 3.0, "typescript": 2.0, "aws": 1.0, "docker": 1.5, "deep learning": 1.5, "go": 1.0,
+    "hadoop": -2.5, "sas": -2.0, "vba": -2.0, "jquery": -2.5, "perl": -3.0, "excel": -0.5, "java": -0.5,
+}
+# Skills a role asks for far more often than the market as a whole
+ROLE_SKILLS = {
+    "Data Analyst": ["sql", "excel", "tableau", "power bi", "statistics", "data analysis", "dashboard", "vba"],
+    "Data Scientist": ["python", "statistics", "machine learning", "pandas", "scikit-learn", "r", "sas", "deep learning"],
+    "Software Engineer": ["java", "javascript", "git", "rest", "c++", "typescript", "react", "go", "jquery"],
+    "Machine Learning Engineer": ["python", "tensorflow", "pytorch", "mlops", "docker", "kubernetes", "llm", "feature engineering"],
+    "Business Analyst": ["excel", "sql", "stakeholder management", "power bi", "visualization", "vba"],
+    "Data Engineer": ["spark", "airflow", "kafka", "snowflake", "dbt", "hadoop", "sql", "scala"],
+    "Product Manager": ["stakeholder management", "sql", "dashboard", "visualization", "excel"],
+    "DevOps Engineer": ["docker", "kubernetes", "linux", "jenkins", "aws", "gcp", "perl", "go"],
+}
+ROLE_AFFINITY = 4.0
+# Role mix (Zipf-like) and a job market that grows over the years
+ROLE_SHARES = np.array([1 / (rank ** 0.8) for rank in range(1, len(ROLES) + 1)])
+ROLE_SHARES /= ROLE_SHARES.sum()
+MARKET_GROWTH = 3.0  # postings in the last year relative to the first
+
+FIRST_NAMES = ["James", "Maria", "Wei", "Aisha", "Carlos", "Priya", "John", "Elena", "Kwame", "Sofia"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Okafor", "Novak", "Patel", "Johnson", "Rossi", "Mensah", "Kim"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Analytics", "Stark Industries", "Wayne Enterprises"]
+CITIES = ["New York", "San Francisco", "Chicago", "Austin", "Seattle", "Boston"]
+UNIVERSITIES = ["State University", "Institute of Technology", "City College"]
+FILLER = ["led", "built", "delivered", "improved", "automated", "designed", "reporting", "pipelines",
+          "models", "team", "stakeholders", "quarterly", "insights", "migration", "platform", "customers"]
+
+
+def zipf_skills(rng, count):
+    """count distinct skills drawn with Zipf popularity weights"""
+    chosen = []
+    while len(chosen) < count:
+        skill = rng.choices(SKILLS, weights=SKILL_WEIGHTS)[0]
+        if skill not in chosen:
+            chosen.append(skill)
+    return chosen
+
+
+def _sentence(rng, skills, words=14):
+    tokens = [rng.choice(FILLER) for _ in range(words)]
+    for skill in rng.sample(skills, min(2, len(skills))):
+        tokens.insert(rng.randrange(len(tokens)), skill)
+    return " ".join(tokens).capitalize() + "."
+
+
+def resume_record(rng, jobs=3, bullets=4):
+    """A plausible resume with named entities, section headings and PDF-style artefacts
+    (hyphenated line breaks, runs of spaces) for clean_text to fix, in the
+    cleaned_resumes.csv schema (resume_text, extracted_skills, positions)"""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    skills = zipf_skills(rng, rng.randint(6, 14))
+    lines = [name, f"{rng.choice(CITIES)}  |  {name.split()[0].lower()}@example.com", "",
+             "SUMMARY", _sentence(rng, skills, 24), "", "SKILLS", ", ".join(skills), "", "EXPERIENCE"]
+    titles = []
+    for _ in range(jobs):
+        titles.append(rng.choice(SENIORITY) + rng.choice(ROLES))
+        lines.append(f"{titles[-1]}, {rng.choice(COMPANIES)}, {rng.choice(CITIES)}   {rng.randint(2010, 2023)}-present")
+        for _ in range(bullets):
+            sentence = _sentence(rng, skills)
+            cut = rng.randrange(10, len(sentence) - 10)
+            if sentence[cut - 1].isalpha() and sentence[cut].isalpha() and rng.random() < 0.3:
+                sentence = sentence[:cut] + "-\n" + sentence[cut:]
+            lines.append("- " + sentence)
+    lines += ["", "EDUCATION", f"B.Sc. Computer Science, {rng.choice(UNIVERSITIES)}, {rng.randint(2005, 2018)}"]
+    return {"resume_text": "\n".join(lines), "extracted_skills": repr(skills), "positions": titles[0]}
+
+
+def resume_text(rng, jobs=3, bullets=4):
+    return resume_record(rng, jobs, bullets)["resume_text"]
+
+
+def resume_corpus(size, seed):
+    rng = random.Random(seed)
+    return [resume_text(rng) for _ in range(size)]
+
+
+def skill_log_weights(first_year, last_year):
+    """log P(skill | role, year) up to a constant, shape (roles, years, skills):
+    Zipf popularity, drifted per SKILL_TRENDS and boosted for the role's own skills"""
+    base = np.log(np.asarray(SKILL_WEIGHTS))
+    years = np.arange(first_year, last_year + 1)
+    trend = np.array([SKILL_TRENDS.get(s, 0.0) for s in SKILLS])
+    decades = (years - (first_year + last_year) / 2) / 10
+    by_year = base[None, :] + decades[:, None] * trend[None, :]
+    index = {s: i for i, s in enumerate(SKILLS)}
+    boost = np.zeros((len(ROLES), len(SKILLS)))
+    for r, role in enumerate(ROLES):
+        boost[r, [index[s] for s in ROLE_SKILLS.get(role, [])]] = np.log(ROLE_AFFINITY)
+    return (boost[:, None, :] + by_year[None, :, :]).astype(np.float32)
+
+
+def position_arrays(size, rng, log_weights, first_year, min_skills=3, max_skills=10):
+    """Vectorized draw of size position records: (role idx, seniority idx, years, skill idx lists).
+    Distinct skills per record are sampled without replacement via Gumbel top-k."""
+    roles = rng.choice(len(ROLES), size=size, p=ROLE_SHARES)
+    seniority = rng.integers(0, len(SENIORITY), size=size)
+    year_shares = np.geomspace(1, MARKET_GROWTH, log_weights.shape[1])
+    year_offsets = rng.choice(log_weights.shape[1], size=size, p=year_shares / year_shares.sum())
+    counts = rng.integers(min_skills, max_skills + 1, size=size)
+    keys = log_weights[roles, year_offsets] + rng.gumbel(size=(size, len(SKILLS))).astype(np.float32)
+    order = np.argsort(-keys, axis=1)[:, :max_skills]
+    skills = [row[:k].tolist() for row, k in zip(order, counts)]
+    return roles, seniority, year_offsets + first_year, skills
+
+
+def positions_frame(size, seed, first_year=2005, last_year=2024):
+    """Historical position records in the merged_processed.csv schema (skills as a list literal)"""
+    rng = np.random.default_rng(seed)
+    log_weights = skill_log_weights(first_year, last_year)
+    roles, seniority, years, skills = position_arrays(size, rng, log_weights, first_year)
+    return pd.DataFrame({
+        "position_title": [SENIORITY[s] + ROLES[r] for s, r in zip(seniority, roles)],
+        "year": years,
+        "extracted_skills": [repr([SKILLS[i] for i in row]) for row in skills],
+        "industry": np.asarray(INDUSTRIES)[rng.integers(0, len(INDUSTRIES), size=size)],
+        "experience_level": np.asarray(EXPERIENCE_LEVELS)[rng.integers(0, len(EXPERIENCE_LEVELS), size=size)],
+    })
+
+
+def analysis_summary(frame):
+    """The merged_analysis.json fields UnifiedCareerAnalyzer reads"""
+    counts = {}
+    for skills in frame["extracted_skills"]:
+        for skill in ast.literal_eval(skills):
+            counts[skill] = counts.get(skill, 0) + 1
+    return {
+        "year_range": [int(frame["year"].min()), int(frame["year"].max())],
+        "skill_counts": dict(sorted(counts.items(), key=lambda kv: -kv[1])),
+    }
+
+
+def llm_replies(size, seed):
+    """Analysis replies in the shapes models actually return: clean JSON, fenced with prose,
+    trailing commas, truncated mid-string"""
+    rng = random.Random(seed)
+    replies = []
+    for i in range(size):
+        skills = zipf_skills(rng, 5)
+        body = json.dumps({
+            "skill_gaps": {"technical": skills[:3], "soft_skills": ["communication"],
+                           "severity": rng.choice(["Low", "Medium", "High"]), "justification": _sentence(rng, skills)},
+            "career_path": {stage: {"role": rng.choice(ROLES), "requirements": skills[:2], "salary_range": "$90k-$120k"}
+                            for stage in ("immediate", "mid_term", "long_term")},
+            "learning_roadmap": {"courses": [{"name": f"{s} course", "platform": "Coursera", "duration": "4 weeks",
+                                              "focus": s} for s in skills[:2]],
+                                 "projects": [_sentence(rng, skills, 6)], "timeline": "6 months"},
+            "market_insights": {"demand_trend": "Growing", "emerging_tech": skills[3:], "industry_advice": _sentence(rng, skills)},
+        }, indent=2)
+        shape = i % 4
+        if shape == 1:
+            body = "Here is the analysis:\n```json\n" + body + "\n```\nLet me know if you need more."
+        elif shape == 2:
+            body = body.replace('"\n', '",\n', 3)
+        elif shape == 3:
+            body = body[:int(len(body) * 0.8)]
+        replies.append(body)
+    return replies
+
+
+# ---- Minimal PDF writer (text only, Helvetica, one content stream per page) ----
+
+def _pdf_escape(line):
+    line = line.encode("latin-1", errors="replace").decode("latin-1")
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def pdf_bytes(pages, font_size=10, leading=13):
+    """A valid PDF 1.4 document; pages is a list of strings (one per page)"""
+    objects = []  # 1-based object bodies
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(None)
+    page_tree = add(None)
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    page_ids = []
+    for text in pages:
+        ops = [f"BT /F1 {font_size} Tf {leading} TL 50 760 Td".encode()]
+        for line in text.splitlines():
+            ops.append(f"({_pdf_escape(line)}) '".encode("latin-1"))
+        ops.append(b"ET")
+        stream = b"\n".join(ops)
+        content = add(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        page_ids.append(add(
+            f"<< /Type /Page /Parent {page_tree} 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font} 0 R >> >> /Contents {content} 0 R >>".encode()))
+    objects[catalog - 1] = f"<< /Type /Catalog /Pages {page_tree} 0 R >>".encode()
+    kids = " ".join(f"{p} 0 R" for p in page_ids)
+    objects[page_tree - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+    return bytes(out)
+
+
+def paginate(text, lines_per_page=55):
+    lines = text.splitlines()
+    return ["\n".join(lines[i:i + lines_per_page]) for i in range(0, len(lines), lines_per_page)] or [""]
+
+
+def write_pdf(path, text, lines_per_page=55):
+    with open(path, "wb") as f:
+        f.write(pdf_bytes(paginate(text, lines_per_page)))
+    return path
@@ -0,0 +1,190 @@
+"""
+Deterministic synthetic dataset generator for scale testing.
+
+Writes, under --out:
+  merged_processed.csv   position records (position_title, year, extracted_skills,
+                         industry, experience_level) for UnifiedCareerAnalyzer
+  merged_analysis.json   year_range and skill_counts matching the CSV
+  merged.json            [{"year": ..., "positions": [{"position": ..., "skills": "[...]"}]}]
+                         for CareerTrendAnalyzer / DatasetCareerAnalyzer
+  cleaned_resumes.csv    resume_text, extracted_skills, positions for /career/sample-resumes
+  pdfs/                  multi-page resume PDFs for /career/upload-resume
+  manifest.json          parameters, row counts and timings
+
+Skill frequencies follow a Zipf distribution, drift over the years (rising
+and fading technologies) and depend on the role. Output is a pure function of
+(--seed, sizes): each file draws from its own seeded stream and rows are
+generated in fixed-size chunks, so the same command reproduces the same bytes.
+
+Run with:
+  cd backend
+  python benchmarks/generate_corpus.py --scale 10 --pdfs 200 --out data/synthetic_10x
+  python benchmarks/generate_corpus.py --positions 5000000 --resumes 0 --out /tmp/positions_5m
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import corpus
+
+# Current production volumes; --scale multiplies these
+BASE_POSITIONS = 207_177
+BASE_RESUMES = 54_000
+CHUNK_ROWS = 250_000
+FIRST_YEAR, LAST_YEAR = 2000, 2025
+
+# Independent random streams per output, so changing one size leaves the other files unchanged
+STREAM_POSITIONS, STREAM_MERGED_JSON, STREAM_RESUMES, STREAM_PDFS = range(4)
+# experience_level follows the title's seniority prefix (corpus.SENIORITY order)
+SENIORITY_LEVELS = np.array(["Intermediate", "Senior", "Entry", "Lead", "Lead"])
+
+
+def write_positions(path, count, seed, log_weights):
+    """Stream merged_processed.csv in chunks; returns per-skill counts for merged_analysis.json"""
+    rng = np.random.default_rng([seed, STREAM_POSITIONS])
+    skill_counts = np.zeros(len(corpus.SKILLS), dtype=np.int64)
+    years_seen = [LAST_YEAR, FIRST_YEAR]
+    first = True
+    for start in range(0, count, CHUNK_ROWS):
+        size = min(CHUNK_ROWS, count - start)
+        frame = _positions_chunk(rng, size, log_weights)
+        flat = np.fromiter((i for row in frame.pop("_skill_idx") for i in row), dtype=np.int64)
+        skill_counts += np.bincount(flat, minlength=len(corpus.SKILLS))
+        years_seen = [min(years_seen[0], int(frame["year"].min())), max(years_seen[1], int(frame["year"].max()))]
+        frame.to_csv(path, mode="w" if first else "a", header=first, index=False)
+        first = False
+        print(f"  positions: {start + size:,}/{count:,}", end="\r", flush=True)
+    print()
+    return skill_counts, years_seen
+
+
+def _positions_chunk(rng, size, log_weights):
+    import pandas as pd
+    roles, seniority, years, skills = corpus.position_arrays(size, rng, log_weights, FIRST_YEAR)
+    return pd.DataFrame({
+        "position_title": [corpus.SENIORITY[s] + corpus.ROLES[r] for s, r in zip(seniority, roles)],
+        "year": years,
+        "extracted_skills": [repr([corpus.SKILLS[i] for i in row]) for row in skills],
+        "industry": np.asarray(corpus.INDUSTRIES)[rng.integers(0, len(corpus.INDUSTRIES), size=size)],
+        "experience_level": SENIORITY_LEVELS[seniority],
+        "_skill_idx": skills,
+    })
+
+
+def write_analysis(path, skill_counts, years_seen):
+    order = np.argsort(-skill_counts, kind="stable")
+    analysis = {
+        "year_range": years_seen,
+        "skill_counts": {corpus.SKILLS[i]: int(skill_counts[i]) for i in order if skill_counts[i]},
+    }
+    with open(path, "w") as f:
+        json.dump(analysis, f, indent=2)
+
+
+def write_merged_json(path, count, seed, log_weights):
+    """merged.json: one entry per resume with 1-4 positions, streamed as a JSON array"""
+    rng = np.random.default_rng([seed, STREAM_MERGED_JSON])
+    with open(path, "w") as f:
+        f.write("[")
+        written = 0
+        for start in range(0, count, CHUNK_ROWS):
+            size = min(CHUNK_ROWS, count - start)
+            per_entry = rng.integers(1, 5, size=size)
+            roles, seniority, years, skills = corpus.position_arrays(int(per_entry.sum()), rng, log_weights, FIRST_YEAR)
+            offset = 0
+            for n in per_entry:
+                positions = [{"position": corpus.SENIORITY[seniority[j]] + corpus.ROLES[roles[j]],
+                              "skills": repr([corpus.SKILLS[i] for i in skills[j]])}
+                             for j in range(offset, offset + n)]
+                # The entry's year is its most recent position
+                entry = {"year": int(years[offset:offset + n].max()), "positions": positions}
+                f.write(("," if written else "") + "\n" + json.dumps(entry))
+                offset += n
+                written += 1
+            print(f"  merged.json entries: {written:,}/{count:,}", end="\r", flush=True)
+        f.write("\n]\n")
+    print()
+
+
+def write_resumes(path, count, seed):
+    import pandas as pd
+    rng = random.Random(f"{seed}-{STREAM_RESUMES}")
+    first = True
+    for start in range(0, count, CHUNK_ROWS // 5):
+        size = min(CHUNK_ROWS // 5, count - start)
+        rows = [corpus.resume_record(rng, jobs=rng.randint(1, 5)) for _ in range(size)]
+        pd.DataFrame(rows).to_csv(path, mode="w" if first else "a", header=first, index=False)
+        first = False
+        print(f"  resumes: {start + size:,}/{count:,}", end="\r", flush=True)
+    print()
+
+
+def write_pdfs(directory, count, seed):
+    """Resumes of 1-4 pages (longer careers, more bullets)"""
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(f"{seed}-{STREAM_PDFS}")
+    pages = 0
+    for i in range(count):
+        text = corpus.resume_record(rng, jobs=rng.randint(3, 14), bullets=rng.randint(3, 8))["resume_text"]
+        layout = corpus.paginate(text)
+        pages += len(layout)
+        with open(os.path.join(directory, f"resume_{i:06d}.pdf"), "wb") as f:
+            f.write(corpus.pdf_bytes(layout))
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset for scale testing")
+    parser.add_argument("--out", default="data/synthetic")
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help=f"multiple of current volume ({BASE_POSITIONS:,} positions, {BASE_RESUMES:,} resumes)")
+    parser.add_argument("--positions", type=int, help="position records (overrides --scale)")
+    parser.add_argument("--resumes", type=int, help="resumes in merged.json and cleaned_resumes.csv (overrides --scale)")
+    parser.add_argument("--pdfs", type=int, default=50, help="resume PDFs to write")
+    args = parser.parse_args()
+
+    positions = args.positions if args.positions is not None else int(BASE_POSITIONS * args.scale)
+    resumes = args.resumes if args.resumes is not None else int(BASE_RESUMES * args.scale)
+    os.makedirs(args.out, exist_ok=True)
+    log_weights = corpus.skill_log_weights(FIRST_YEAR, LAST_YEAR)
+    timings = {}
+
+    started = time.perf_counter()
+    if positions:
+        skill_counts, years_seen = write_positions(os.path.join(args.out, "merged_processed.csv"),
+                                                   positions, args.seed, log_weights)
+        write_analysis(os.path.join(args.out, "merged_analysis.json"), skill_counts, years_seen)
+        timings["positions_seconds"] = round(time.perf_counter() - started, 1)
+
+    if resumes:
+        started = time.perf_counter()
+        write_merged_json(os.path.join(args.out, "merged.json"), resumes, args.seed, log_weights)
+        write_resumes(os.path.join(args.out, "cleaned_resumes.csv"), resumes, args.seed)
+        timings["resumes_seconds"] = round(time.perf_counter() - started, 1)
+
+    pdf_pages = 0
+    if args.pdfs:
+        started = time.perf_counter()
+        pdf_pages = write_pdfs(os.path.join(args.out, "pdfs"), args.pdfs, args.seed)
+        timings["pdfs_seconds"] = round(time.perf_counter() - started, 1)
+
+    manifest = {
+        "seed": args.seed, "years": [FIRST_YEAR, LAST_YEAR],
+        "positions": positions, "resumes": resumes, "pdfs": args.pdfs, "pdf_pages": pdf_pages,
+        "zipf_exponent": corpus.ZIPF_EXPONENT, "timings": timings,
+    }
+    with open(os.path.join(args.out, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    print(json.dumps(manifest, indent=2))
+
+
+if __name__ == "__main__":
+    main()
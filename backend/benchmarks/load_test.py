@@ -0,0 +1,204 @@
+"""
+Open-loop load generator for the API: requests are started on a fixed schedule
+at the target rate whether or not earlier ones have finished, so a slow server
+shows up as latency and errors instead of silently lowering the offered load.
+
+Reports, per endpoint: requests sent, achieved throughput, error rate and
+p50/p95/p99 latency. Pair with benchmarks/mock_llm_server.py to size workers
+and concurrency limits without paid LLM calls:
+
+  cd backend
+  python benchmarks/mock_llm_server.py --port 9100 &
+  GEMINI_API_KEY=mock GEMINI_API_ENDPOINT=http://localhost:9100 python serve.py --workers 4 --port 8000 &
+  python benchmarks/load_test.py --url http://localhost:8000 --rps 50 --duration 60
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import corpus
+
+# Endpoint weights; the mix roughly follows the frontend's call pattern
+DEFAULT_MIX = {
+    "analyze-resume": 5,
+    "upload-resume": 2,
+    "analyze-trends": 1,
+    "sample-resumes": 1,
+    "health": 1,
+}
+TREND_ROLES = ["Data Analyst", "Data Scientist", "Software Engineer"]
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class RequestFactory:
+    """Seeded request bodies built from the synthetic corpus"""
+
+    def __init__(self, seed, pdf_share=0.5):
+        self.rng = random.Random(seed)
+        self.resumes = corpus.resume_corpus(50, seed)
+        self.pdfs = [corpus.pdf_bytes(corpus.paginate(text)) for text in self.resumes[:10]]
+        self.pdf_share = pdf_share
+
+    def build(self, name):
+        """(method, path, httpx request kwargs)"""
+        rng = self.rng
+        if name == "analyze-resume":
+            return "POST", "/career/analyze-resume", {"json": {
+                "resume_text": rng.choice(self.resumes),
+                "skills": corpus.zipf_skills(rng, rng.randint(3, 8)),
+                "target_role": rng.choice(corpus.ROLES),
+                "experience_level": rng.choice(corpus.EXPERIENCE_LEVELS),
+                "industry": rng.choice(corpus.INDUSTRIES),
+            }}
+        if name == "upload-resume":
+            if rng.random() < self.pdf_share:
+                files = {"file": ("resume.pdf", rng.choice(self.pdfs), "application/pdf")}
+            else:
+                files = {"file": ("resume.txt", rng.choice(self.resumes).encode("utf-8"), "text/plain")}
+            return "POST", "/career/upload-resume", {"files": files}
+        if name == "analyze-trends":
+            return "GET", f"/career/analyze-trends/{rng.choice(TREND_ROLES)}", {"params": {"years_back": 5}}
+        if name == "sample-resumes":
+            return "GET", "/career/sample-resumes", {"params": {"count": 10, "random": True, "seed": rng.randint(0, 999)}}
+        return "GET", "/career/health", {}
+
+
+class Results:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, name, latency, status):
+        self.statuses[name][status] += 1
+        if isinstance(status, int) and status < 400:
+            self.latencies[name].append(latency)
+        else:
+            self.errors[name] += 1
+
+    def summary(self, elapsed):
+        rows = {}
+        for name in sorted(self.statuses):
+            sent = sum(self.statuses[name].values())
+            ok = self.latencies[name]
+            rows[name] = {
+                "requests": sent,
+                "throughput_rps": round(len(ok) / elapsed, 2),
+                "error_rate": round(self.errors[name] / sent, 4) if sent else 0.0,
+                "p50_ms": _ms(_percentile(ok, 0.50)),
+                "p95_ms": _ms(_percentile(ok, 0.95)),
+                "p99_ms": _ms(_percentile(ok, 0.99)),
+                "statuses": {str(k): v for k, v in self.statuses[name].items()},
+            }
+        return rows
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+async def run_load(url, rps, duration, mix, max_in_flight, timeout, seed):
+    factory = RequestFactory(seed)
+    results = Results()
+    names, weights = zip(*mix.items())
+    pick = random.Random(seed + 1)
+    limiter = asyncio.Semaphore(max_in_flight)
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        async def one(name):
+            method, path, kwargs = factory.build(name)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                status = response.status_code
+            except httpx.TimeoutException:
+                status = "timeout"
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            finally:
+                limiter.release()
+            results.record(name, time.perf_counter() - start, status)
+
+        tasks = []
+        started = time.perf_counter()
+        total = int(rps * duration)
+        for i in range(total):
+            # Open loop: wait for the scheduled send time, not for earlier responses
+            delay = started + i / rps - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            name = pick.choices(names, weights=weights)[0]
+            if limiter.locked():
+                # Client-side cap reached: count it instead of queueing behind the schedule
+                results.record(name, 0.0, "client_overload")
+                continue
+            await limiter.acquire()
+            tasks.append(asyncio.create_task(one(name)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+    return results.summary(elapsed), elapsed
+
+
+def print_table(rows, elapsed, rps):
+    print(f"offered {rps} rps for {elapsed:.1f}s")
+    header = f"{'endpoint':<18}{'reqs':>7}{'ok rps':>9}{'err %':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, row in rows.items():
+        cells = [f"{row[k]:>10}" if row[k] is not None else f"{'-':>10}" for k in ("p50_ms", "p95_ms", "p99_ms")]
+        print(f"{name:<18}{row['requests']:>7}{row['throughput_rps']:>9}{row['error_rate'] * 100:>8.2f}" + "".join(cells))
+    for name, row in rows.items():
+        failures = {k: v for k, v in row["statuses"].items() if not (k.isdigit() and int(k) < 400)}
+        if failures:
+            print(f"  {name} failures: {failures}")
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise SystemExit(f"unknown endpoint {name!r}; choose from {', '.join(DEFAULT_MIX)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-loop load test for the career API")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--rps", type=float, default=20)
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="endpoint weights, e.g. analyze-resume=5,health=1")
+    parser.add_argument("--max-in-flight", type=int, default=500, help="client-side cap on open requests")
+    parser.add_argument("--timeout", type=float, default=90)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="also write the summary to this file")
+    args = parser.parse_args()
+
+    rows, elapsed = asyncio.run(run_load(args.url, args.rps, args.duration, args.mix,
+                                         args.max_in_flight, args.timeout, args.seed))
+    print_table(rows, elapsed, args.rps)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"rps": args.rps, "duration": elapsed, "endpoints": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
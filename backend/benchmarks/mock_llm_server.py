@@ -0,0 +1,265 @@
+"""
+Local mock LLM provider speaking the Gemini (generativelanguage v1beta REST),
+OpenAI (chat completions) and Ollama (/api/generate) wire formats, for load
+tests without paid API calls or a GPU.
+
+Latency is drawn from a log-normal distribution (median and sigma configurable);
+a fraction of requests fail with 429/500/503 or hang past the client timeout,
+and a fraction of replies are malformed JSON (fenced, trailing commas,
+truncated) to exercise local repair. All APIs support streaming: the first
+chunk arrives after the time-to-first-token share of the latency, the rest
+are spread over the remainder. Like a real Ollama server, the Ollama endpoint
+decodes at most --ollama-parallel requests at once and queues the rest.
+
+Run with:
+  cd backend
+  python benchmarks/mock_llm_server.py --port 9100 --latency-median-ms 1200 --error-rate 0.02
+
+Point the app at it:
+  GEMINI_API_KEY=mock GEMINI_API_ENDPOINT=http://localhost:9100 uvicorn server:app
+  OPENAI_API_KEY=mock OPENAI_BASE_URL=http://localhost:9100/v1 uvicorn server:app
+  OLLAMA_MODEL=llama3.1 OLLAMA_HOST=http://localhost:9100 uvicorn server:app
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import corpus
+
+STREAM_CHUNKS = 8
+ERROR_STATUSES = (429, 500, 503)
+
+
+class MockBehaviour:
+    def __init__(self, latency_median_ms=1200, latency_sigma=0.5, ttft_share=0.3, error_rate=0.0,
+                 hang_rate=0.0, hang_seconds=120, malformed_rate=0.05, seed=7, ollama_parallel=4):
+        self.latency_median = latency_median_ms / 1000
+        self.latency_sigma = latency_sigma
+        self.ttft_share = ttft_share
+        self.error_rate = error_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.malformed_rate = malformed_rate
+        self.ollama_parallel = ollama_parallel
+        self.rng = random.Random(seed)
+        # corpus.llm_replies cycles clean / fenced / trailing-comma / truncated
+        replies = corpus.llm_replies(200, seed)
+        self.clean = replies[0::4]
+        self.malformed = [r for i, r in enumerate(replies) if i % 4]
+        self.requests = 0
+
+    def latency(self):
+        return self.latency_median * math.exp(self.rng.gauss(0, self.latency_sigma))
+
+    def failure(self):
+        """None, ("hang", seconds) or ("error", status)"""
+        roll = self.rng.random()
+        if roll < self.hang_rate:
+            return "hang", self.hang_seconds
+        if roll < self.hang_rate + self.error_rate:
+            return "error", self.rng.choice(ERROR_STATUSES)
+        return None
+
+    def reply(self):
+        pool = self.malformed if self.rng.random() < self.malformed_rate else self.clean
+        return self.rng.choice(pool)
+
+
+def _chunks(text, count=STREAM_CHUNKS):
+    size = max(1, math.ceil(len(text) / count))
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _tokens(text):
+    return max(1, len(text) // 4)
+
+
+def create_app(behaviour):
+    app = FastAPI(title="Mock LLM provider")
+
+    async def simulate(stream):
+        """Wait out the first-token delay; returns (error response or None, per-chunk delay)"""
+        behaviour.requests += 1
+        failure = behaviour.failure()
+        if failure and failure[0] == "hang":
+            await asyncio.sleep(failure[1])
+        elif failure:
+            status = failure[1]
+            body = {"error": {"code": status, "message": f"mock failure {status}",
+                              "status": "RESOURCE_EXHAUSTED" if status == 429 else "UNAVAILABLE"}}
+            return JSONResponse(body, status_code=status), 0
+        total = behaviour.latency()
+        if not stream:
+            await asyncio.sleep(total)
+            return None, 0
+        ttft = total * behaviour.ttft_share
+        await asyncio.sleep(ttft)
+        return None, (total - ttft) / STREAM_CHUNKS
+
+    # ---- Gemini: POST /v1beta/models/{model}:generateContent | :streamGenerateContent ----
+
+    def gemini_chunk(text, prompt_tokens, completion_tokens, final):
+        chunk = {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}]}
+        if final:
+            chunk["candidates"][0]["finishReason"] = "STOP"
+            chunk["usageMetadata"] = {"promptTokenCount": prompt_tokens, "candidatesTokenCount": completion_tokens,
+                                      "totalTokenCount": prompt_tokens + completion_tokens}
+        return chunk
+
+    @app.post("/v1beta/models/{target}")
+    async def gemini(target: str, request: Request):
+        model, _, method = target.partition(":")
+        body = await request.json()
+        prompt = json.dumps(body.get("contents", [])) + json.dumps(body.get("systemInstruction", body.get("system_instruction", "")))
+        stream = method == "streamGenerateContent"
+        error, delay = await simulate(stream)
+        if error is not None:
+            return error
+        text = behaviour.reply()
+        prompt_tokens, completion_tokens = _tokens(prompt), _tokens(text)
+        if not stream:
+            return gemini_chunk(text, prompt_tokens, completion_tokens, True)
+
+        parts = _chunks(text)
+        sse = request.query_params.get("alt") == "sse"
+
+        async def events():
+            if not sse:
+                yield "["
+            for i, part in enumerate(parts):
+                if i:
+                    await asyncio.sleep(delay)
+                payload = json.dumps(gemini_chunk(part, prompt_tokens, completion_tokens, i == len(parts) - 1))
+                if sse:
+                    yield f"data: {payload}\r\n\r\n"
+                else:
+                    yield ("," if i else "") + payload + "\n"
+            if not sse:
+                yield "]"
+        return StreamingResponse(events(), media_type="text/event-stream" if sse else "application/json")
+
+    # ---- OpenAI: POST /v1/chat/completions ----
+
+    @app.post("/v1/chat/completions")
+    async def openai_chat(request: Request):
+        body = await request.json()
+        prompt = "".join(str(m.get("content", "")) for m in body.get("messages", []))
+        stream = bool(body.get("stream"))
+        error, delay = await simulate(stream)
+        if error is not None:
+            return error
+        text = behaviour.reply()
+        model = body.get("model", "mock")
+        usage = {"prompt_tokens": _tokens(prompt), "completion_tokens": _tokens(text),
+                 "total_tokens": _tokens(prompt) + _tokens(text)}
+        completion_id, created = f"chatcmpl-mock{behaviour.requests}", int(time.time())
+        if not stream:
+            return {"id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                                 "finish_reason": "stop"}],
+                    "usage": usage}
+
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+        def chunk(delta=None, finish=None, usage=None):
+            data = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [] if delta is None else [{"index": 0, "delta": delta, "finish_reason": finish}]}
+            if usage:
+                data["usage"] = usage  # final usage-only chunk (stream_options.include_usage)
+            return f"data: {json.dumps(data)}\n\n"
+
+        async def events():
+            yield chunk({"role": "assistant", "content": ""})
+            for i, part in enumerate(_chunks(text)):
+                if i:
+                    await asyncio.sleep(delay)
+                yield chunk({"content": part})
+            yield chunk({}, finish="stop")
+            if include_usage:
+                yield chunk(usage=usage)
+            yield "data: [DONE]\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    # ---- Ollama: POST /api/generate (NDJSON stream) ----
+
+    ollama_slots = asyncio.Semaphore(behaviour.ollama_parallel)
+
+    @app.post("/api/generate")
+    async def ollama_generate(request: Request):
+        body = await request.json()
+        stream = body.get("stream", True)
+        model = body.get("model", "mock")
+        prompt_tokens = _tokens(body.get("prompt", "") + (body.get("system") or ""))
+        await ollama_slots.acquire()
+        try:
+            error, delay = await simulate(stream)
+        except BaseException:
+            ollama_slots.release()
+            raise
+        if error is not None:
+            ollama_slots.release()
+            return error
+        text = behaviour.reply()
+
+        def chunk(part, done):
+            data = {"model": model, "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                    "response": part, "done": done}
+            if done:
+                data.update(done_reason="stop", prompt_eval_count=prompt_tokens, eval_count=_tokens(text))
+            return data
+
+        if not stream:
+            ollama_slots.release()
+            return chunk(text, True)
+
+        async def events():
+            try:
+                for i, part in enumerate(_chunks(text)):
+                    if i:
+                        await asyncio.sleep(delay)
+                    yield json.dumps(chunk(part, False)) + "\n"
+                yield json.dumps(chunk("", True)) + "\n"
+            finally:
+                ollama_slots.release()
+        return StreamingResponse(events(), media_type="application/x-ndjson")
+
+    @app.get("/mock/stats")
+    def stats():
+        return {"requests": behaviour.requests}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Gemini/OpenAI server for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-median-ms", type=float, default=1200)
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="log-normal sigma (0 = constant latency)")
+    parser.add_argument("--ttft-share", type=float, default=0.3, help="share of latency before the first streamed chunk")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction answered with 429/500/503")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="fraction that never answer in time")
+    parser.add_argument("--malformed-rate", type=float, default=0.05, help="fraction of replies with broken JSON")
+    parser.add_argument("--ollama-parallel", type=int, default=4, help="requests the Ollama endpoint decodes at once")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    behaviour = MockBehaviour(args.latency_median_ms, args.latency_sigma, args.ttft_share, args.error_rate,
+                              args.hang_rate, malformed_rate=args.malformed_rate, seed=args.seed,
+                              ollama_parallel=args.ollama_parallel)
+    uvicorn.run(create_app(behaviour), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
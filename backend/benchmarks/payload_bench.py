@@ -0,0 +1,74 @@
+"""
+Bytes-on-the-wire and serialization-time comparison for /career response modes.
+
+Run with:
+  cd backend
+  python benchmarks/payload_bench.py
+"""
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "llm"))
+
+from enhanced_analyzer import EnhancedCareerAnalyzer, RealTimeDataFetcher
+from responses import dumps_json, msgpack, shape_payload
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ITERATIONS = 2000
+
+
+def sample_payload():
+    """A realistic /career/analyze-resume body built from the deterministic analysis"""
+    market_trends = RealTimeDataFetcher().get_market_trends("Data Scientist")
+    skills = ["SQL", "Python", "Excel", "Tableau", "Statistics"]
+    # _get_fallback_analysis does not touch instance state, so skip the AI client setup
+    analysis = EnhancedCareerAnalyzer._get_fallback_analysis(None, skills, "Data Scientist", market_trends)
+    return {
+        "status": "success",
+        "analysis": analysis,
+        "role": "Data Scientist",
+        "industry": "Technology",
+        "analysis_source": analysis["analysis_source"],
+    }
+
+
+def time_it(fn):
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        fn()
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+def main():
+    payload = sample_payload()
+    modes = {
+        "full": payload,
+        "compact": shape_payload(payload, compact=True),
+        "fields=analysis.skill_gaps": shape_payload(payload, fields="analysis.skill_gaps"),
+    }
+    encoders = {
+        "json (stdlib, indent)": lambda p: json.dumps(p, indent=2).encode("utf-8"),
+        "json (compact)": dumps_json,
+    }
+    if msgpack is not None:
+        encoders["msgpack"] = lambda p: msgpack.packb(p, use_bin_type=True, default=str)
+
+    print(f"{'mode':<28}{'encoder':<24}{'raw B':>8}{'gzip B':>8}{'br B':>8}{'encode µs':>12}")
+    for mode, body in modes.items():
+        for name, encode in encoders.items():
+            raw = encode(body)
+            gz = len(gzip.compress(raw))
+            br = len(brotli.compress(raw)) if brotli is not None else "-"
+            micros = time_it(lambda: encode(body))
+            print(f"{mode:<28}{name:<24}{len(raw):>8}{gz:>8}{br:>8}{micros:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
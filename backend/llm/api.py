@@ -1,12 +1,20 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi import APIRouter, HTTPException, UploadFile, File, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware  # kept for reference, not used here
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import pandas as pd
 import sys
 import os
+import hashlib
+import base64
+import json
+import asyncio
+import time
 import pdfplumber
 import spacy
+from collections import OrderedDict
 from datetime import datetime
 
 # Add parent directory to path for imports
@@ -16,48 +24,91 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from dotenv import load_dotenv
 load_dotenv()
 
+try:
+    from llm.logger import get_logger
+except ImportError:
+    from logger import get_logger
+
+log = get_logger(__name__)
+
 # Try to import enhanced analyzer (optional)
 try:
-    from enhanced_analyzer import EnhancedCareerAnalyzer
+    try:
+        from llm.enhanced_analyzer import EnhancedCareerAnalyzer
+    except ImportError:
+        from enhanced_analyzer import EnhancedCareerAnalyzer
     analyzer = EnhancedCareerAnalyzer()
-    print("✅ Enhanced analyzer loaded successfully!")
+    log.info("enhanced analyzer loaded")
 except ImportError as e:
-    print(f"❌ Enhanced analyzer import failed: {e}")
+    log.error("enhanced analyzer import failed", error=str(e))
     analyzer = None
 except Exception as e:
-    print(f"❌ Enhanced analyzer initialization failed: {e}")
+    log.error("enhanced analyzer initialization failed", error=str(e))
     analyzer = None
 
-# Load spaCy model for NER (optional)
+# Load spaCy model for NER (optional). Only the NER component is needed for
+# redaction; in the sm pipeline it carries its own tok2vec so the rest can go.
 try:
-    nlp = spacy.load("en_core_web_sm")
-    print("✅ spaCy NER model loaded")
+    nlp = spacy.load(
+        "en_core_web_sm",
+        disable=["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer"],
+    )
+    log.info("spaCy NER model loaded")
 except Exception:
-    print("⚠️ spaCy NER model not available")
+    log.warning("spaCy NER model not available, resumes will not be anonymized")
     nlp = None
 
-router = APIRouter(prefix="/career", tags=["career"])
+try:
+    from llm.shared_data import ensure_snapshot, open_shared_store
+    from llm.prompt_builder import RESUME_TOKEN_BUDGET, fit_resume
+    from llm.responses import CareerJSONResponse, render_payload
+    from llm.tracing import traced
+    from llm.jobs import DONE, FAILED, JobQueue, public_view
+    from llm.trend_analyzer import CareerTrendAnalyzer
+    from llm.trend_snapshots import TrendSnapshotStore, build_snapshots, role_evolution
+    from llm.forecasting import MAX_HORIZON, demand_forecast
+    from llm.skill_graph import recommend_skills
+except ImportError:
+    from shared_data import ensure_snapshot, open_shared_store
+    from prompt_builder import RESUME_TOKEN_BUDGET, fit_resume
+    from responses import CareerJSONResponse, render_payload
+    from tracing import traced
+    from jobs import DONE, FAILED, JobQueue, public_view
+    from trend_analyzer import CareerTrendAnalyzer
+    from trend_snapshots import TrendSnapshotStore, build_snapshots, role_evolution
+    from forecasting import MAX_HORIZON, demand_forecast
+    from skill_graph import recommend_skills
+
+router = APIRouter(prefix="/career", tags=["career"], default_response_class=CareerJSONResponse)
+
+# Shared, memory-mapped snapshot (multi-worker launch mode, see serve.py).
+# Without one, the CSV is converted into a local columnar snapshot on first
+# start; the DataFrame is only kept if that conversion fails.
+resume_store = open_shared_store()
 
 # Optional dataset
-try:
+df = None
+if resume_store is None:
     possible_paths = [
         "data/cleaned_resumes.csv",
         "../data/cleaned_resumes.csv",
         "./data/cleaned_resumes.csv",
     ]
-    df = None
-    for path in possible_paths:
+    csv_path = next((p for p in possible_paths if os.path.exists(p)), None)
+    if csv_path is None:
+        log.warning("no resume data loaded: could not find cleaned_resumes.csv")
+    else:
         try:
-            df = pd.read_csv(path)
-            print(f"✅ API loaded {len(df)} resumes from {path}")
-            break
-        except Exception:
-            continue
-    if df is None:
-        print("⚠️ No resume data loaded: Could not find cleaned_resumes.csv")
-except Exception as e:
-    df = None
-    print(f"⚠️ No resume data loaded: {e}")
+            resume_store = ensure_snapshot(csv_path, os.path.join(os.path.dirname(csv_path), "shared", "resumes"))
+            log.info("resume snapshot mapped", resumes=len(resume_store), source=csv_path)
+        except Exception as e:
+            log.warning("columnar snapshot unavailable, loading CSV into memory", error=str(e))
+            try:
+                df = pd.read_csv(csv_path)
+                log.info("resumes loaded into memory", resumes=len(df), source=csv_path)
+            except Exception as e:
+                df = None
+                log.warning("no resume data loaded", error=str(e))
 
 # ---- Simple built-in fallback analyzer (no external deps) ----
 
@@ -117,6 +168,101 @@ def fallback_analyze(resume_text: str, skills: List[str], target_role: str,
         "notes": "Using local baseline because EnhancedCareerAnalyzer is unavailable.",
     }
 
+def dataset_insights(role: str, skills: List[str]) -> Optional[Dict[str, Any]]:
+    """How common the role's baseline skills (and the user's) are among resumes for the role"""
+    if resume_store is None:
+        return None
+    baseline = ROLE_BASELINES.get(role, ROLE_BASELINES["Data Analyst"])
+    user_skills = {s.lower() for s in skills}
+    total, counts = resume_store.skill_prevalence(sorted(set(baseline) | user_skills), position=role)
+    if not total:
+        return {"matching_resumes": 0}
+    share = {skill: round(n / total, 3) for skill, n in counts.items()}
+    missing = sorted((s for s in baseline if s not in user_skills), key=lambda s: -share[s])
+    return {
+        "matching_resumes": total,
+        "skill_share": share,
+        # Missing baseline skills, most common among people already in the role first
+        "missing_by_prevalence": missing,
+    }
+
+# ---- Speculative analysis + background LLM enrichment (see llm/jobs.py) ----
+
+JOB_EVENTS_POLL_SECONDS = 0.25
+JOB_EVENTS_MAX_SECONDS = 300
+# Trend reports only change with the dataset/model, so finished ones are reused for hours
+TREND_RESULT_TTL_SECONDS = int(os.getenv("TREND_RESULT_TTL_SECONDS", str(6 * 3600)))
+# How long trend endpoints wait for their job before answering 202 with the job id
+TREND_WAIT_SECONDS = 30
+
+job_queue = JobQueue()
+
+def _enrich_resume_analysis(payload, report):
+    """Job handler: the full (LLM) analysis for a speculative request"""
+    report(0.1, "requesting AI analysis")
+    analysis = analyzer.analyze_resume(payload["resume_text"], payload["skills"], payload["target_role"],
+                                       payload["experience_level"], payload["industry"])
+    return {"analysis": analysis, "analysis_source": analysis.get("analysis_source", "enhanced_analyzer")}
+
+def _skill_evolution(payload, report):
+    report(0.1, "requesting AI skill evolution analysis")
+    return analyzer.analyze_skill_evolution(payload["role"], payload["years_back"])
+
+trend_analyzer = CareerTrendAnalyzer(analyzer) if analyzer is not None else None
+
+def _career_evolution(payload, report):
+    return trend_analyzer.analyze_career_evolution(payload["role"], payload["years_back"], progress=report)
+
+# Precomputed statistics per (role, years_back) for the dataset on disk (llm/trend_snapshots.py)
+trend_snapshots = TrendSnapshotStore()
+
+def _build_trend_snapshots(payload, report):
+    report(0.1, "computing trend snapshots")
+    return {"path": build_snapshots()}
+
+job_queue.register("trend_snapshots", _build_trend_snapshots)
+
+if analyzer is not None:
+    job_queue.register("resume_analysis", _enrich_resume_analysis)
+    job_queue.register("skill_evolution", _skill_evolution)
+    job_queue.register("career_evolution", _career_evolution)
+
+async def wait_for_job(job, wait):
+    """Poll the store until the job finishes or `wait` seconds pass; returns the latest row"""
+    deadline = time.monotonic() + max(0.0, wait)
+    while job["status"] not in (DONE, FAILED) and time.monotonic() < deadline:
+        await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+        job = await run_in_threadpool(job_queue.store.get, job["id"])
+    return job
+
+async def trend_job_response(kind, role, years_back, wait):
+    """Run (or join) the deduplicated trend job for (role, years_back) and answer with its result,
+    or 202 with the job id if it is still running after `wait` seconds"""
+    key = f"{role.strip().lower()}:{years_back}"
+    job = await run_in_threadpool(job_queue.submit, kind, {"role": role, "years_back": years_back},
+                                  key=key, ttl=TREND_RESULT_TTL_SECONDS)
+    job = await wait_for_job(job, min(wait, TREND_WAIT_SECONDS))
+    if job["status"] == DONE:
+        return CareerJSONResponse({"status": "success", "role": role, "trends": job["result"], "job_id": job["id"]})
+    if job["status"] == FAILED:
+        raise HTTPException(status_code=500, detail=f"Trend analysis failed: {job['error']}")
+    return CareerJSONResponse({
+        "status": "pending",
+        "role": role,
+        "job": public_view(job),
+        "poll_url": f"{router.prefix}/jobs/{job['id']}",
+        "events_url": f"{router.prefix}/jobs/{job['id']}/events",
+    }, status_code=202)
+
+# ---- Anonymization settings ----
+
+# Only text that leaves the process is redacted: the upload preview and the
+# resume sections that end up in the LLM prompt.
+PREVIEW_CHARS = 500
+REDACT_LABELS = {"PERSON", "ORG", "GPE"}
+ANONYMIZE_CACHE_SIZE = 256
+_anonymize_cache: "OrderedDict[str, str]" = OrderedDict()
+
 # ---- Models ----
 
 class ResumeAnalysisRequest(BaseModel):
@@ -128,6 +274,7 @@ class ResumeAnalysisRequest(BaseModel):
 
 # ---- Helpers ----
 
+@traced("extract_text_from_pdf")
 def extract_text_from_pdf(pdf_file):
     """Extract text from PDF file"""
     try:
@@ -141,17 +288,49 @@ def extract_text_from_pdf(pdf_file):
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"PDF extraction failed: {str(e)}")
 
-def anonymize_resume(text):
-    """Anonymize resume text using NER"""
-    if not nlp or not text:
+def _text_window(text, limit):
+    """Slice text to limit chars, extended to the next whitespace so a name is not cut in half"""
+    if limit is None or len(text) <= limit:
         return text
-    doc = nlp(text)
-    anonymized_text = text
+    boundary = text.find(" ", limit, limit + 64)
+    return text[:boundary] if boundary != -1 else text[:limit]
+
+@traced("anonymize_resume")
+def anonymize_resume(text, limit=None):
+    """Anonymize resume text using NER, only over the first `limit` chars (cached by content hash)"""
+    if not nlp or not text:
+        return text[:limit] if limit is not None and text else text
+    window = _text_window(text, limit)
+    key = hashlib.sha256(window.encode("utf-8", errors="ignore")).hexdigest()
+    cached = _anonymize_cache.get(key)
+    if cached is not None:
+        _anonymize_cache.move_to_end(key)
+        return cached
+
+    doc = nlp(window)
+    parts = []
+    last = 0
     for ent in doc.ents:
-        if ent.label_ in ["PERSON", "ORG", "GPE"]:
-            anonymized_text = anonymized_text.replace(ent.text, f"[{ent.label_}_REDACTED]")
+        if ent.label_ in REDACT_LABELS:
+            parts.append(window[last:ent.start_char])
+            parts.append(f"[{ent.label_}_REDACTED]")
+            last = ent.end_char
+    parts.append(window[last:])
+    anonymized_text = "".join(parts)
+
+    _anonymize_cache[key] = anonymized_text
+    if len(_anonymize_cache) > ANONYMIZE_CACHE_SIZE:
+        _anonymize_cache.popitem(last=False)
     return anonymized_text
 
+def prompt_resume(request):
+    """The resume sections the analyzer puts in the prompt, anonymized. Sections are selected
+    first (same keywords and budget as the analyzer), so whatever part of a long resume is
+    sent has been redacted; if the analyzer trims again it only sees redacted text."""
+    keywords = list(request.skills) + request.target_role.lower().split()
+    return anonymize_resume(fit_resume(request.resume_text, keywords, RESUME_TOKEN_BUDGET))
+
+@traced("extract_skills_from_text")
 def extract_skills_from_text(text):
     """Extract skills from resume text"""
     tech_skills = [
@@ -171,60 +350,131 @@ def extract_skills_from_text(text):
             found.append(skill)
     return sorted(list(set(found)))
 
+def encode_cursor(after, position, skill):
+    """Opaque keyset cursor bound to the filters it was issued for"""
+    raw = json.dumps({"after": after, "position": position, "skill": skill}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor, position, skill):
+    """Return the row id to resume after; 400 on a malformed or mismatched cursor"""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        after = int(data["after"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if data.get("position") != position or data.get("skill") != skill:
+        raise HTTPException(status_code=400, detail="Cursor was issued for different filters")
+    return after
+
 # ---- Routes ----
 
 @router.get("/")
 async def root():
-    return {
+    return CareerJSONResponse({
         "message": "CareerCompass API",
         "version": "2.0",
         "status": "active",
         "analyzer_available": analyzer is not None,
-        "data_loaded": df is not None,
+        "data_loaded": df is not None or resume_store is not None,
         "features": ["resume_analysis", "skill_gap_analysis", "career_path", "market_insights"]
-    }
+    })
+
+def resume_file_text(contents: bytes, filename: str, content_type: Optional[str]) -> str:
+    """Text of an uploaded resume: pdfplumber for PDFs, otherwise the bytes decoded as UTF-8"""
+    if filename.lower().endswith(".pdf") or content_type == "application/pdf":
+        temp_path = f"temp_resume_{datetime.now().timestamp()}.pdf"
+        with open(temp_path, "wb") as f:
+            f.write(contents)
+        try:
+            return extract_text_from_pdf(temp_path)
+        finally:
+            os.remove(temp_path)
+    # Assume text or image with no OCR in this demo
+    return contents.decode("utf-8", errors="ignore")
 
 @router.post("/upload-resume")
-async def upload_resume(file: UploadFile = File(...)):
-    """Upload and process resume file. Returns full_text for analysis."""
+async def upload_resume(file: UploadFile = File(...), fields: Optional[str] = None,
+                        compact: bool = False, accept: Optional[str] = Header(None)):
+    """Upload and process resume file. Returns full_text for analysis.
+    Supports ?fields=, ?compact=true and Accept: application/msgpack (see responses.py)."""
     try:
         contents = await file.read()
-        if file.filename.lower().endswith(".pdf") or file.content_type == "application/pdf":
-            temp_path = f"temp_resume_{datetime.now().timestamp()}.pdf"
-            with open(temp_path, "wb") as f:
-                f.write(contents)
-            resume_text = extract_text_from_pdf(temp_path)
-            os.remove(temp_path)
-        else:
-            # Assume text or image with no OCR in this demo
-            resume_text = contents.decode("utf-8", errors="ignore")
+        # PDF parsing and NER block for tens to hundreds of ms; keep them off the event loop
+        resume_text = await run_in_threadpool(resume_file_text, contents, file.filename, file.content_type)
 
-        anonymized_text = anonymize_resume(resume_text)
+        # Only the preview is redacted here; /analyze-resume redacts its own prompt window
+        anonymized_preview = (await run_in_threadpool(anonymize_resume, resume_text, limit=PREVIEW_CHARS))[:PREVIEW_CHARS]
         extracted_skills = extract_skills_from_text(resume_text)
 
-        return {
+        payload = {
             "status": "success",
             "filename": file.filename,
-            "text_length": len(anonymized_text),
+            "text_length": len(resume_text),
             # NEW: return full text for the frontend to pass into /analyze-resume
             "full_text": resume_text,
-            "anonymized_preview": anonymized_text[:500] + "..." if len(anonymized_text) > 500 else anonymized_text,
+            "anonymized_preview": anonymized_preview + "..." if len(resume_text) > PREVIEW_CHARS else anonymized_preview,
             "extracted_skills": extracted_skills,
             "skill_count": len(extracted_skills),
         }
+        return render_payload(payload, fields, compact, accept)
     except Exception as e:
+        log.exception("resume processing failed")
         raise HTTPException(status_code=500, detail=f"Resume processing failed: {str(e)}")
 
+def speculative_analysis(request: ResumeAnalysisRequest, prompt_text: str) -> Dict[str, Any]:
+    """Deterministic answer now, LLM enrichment as a background job (or its cached result)"""
+    payload = {
+        "resume_text": prompt_text,  # only the redacted prompt window is persisted
+        "skills": request.skills,
+        "target_role": request.target_role,
+        "experience_level": request.experience_level,
+        "industry": request.industry,
+    }
+    key = hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+    job = job_queue.submit("resume_analysis", payload, key=key)
+    enrichment = {
+        "job_id": job["id"],
+        "status": job["status"],
+        "poll_url": f"{router.prefix}/jobs/{job['id']}",
+        "events_url": f"{router.prefix}/jobs/{job['id']}/events",
+    }
+    if job["status"] == DONE:
+        # Identical request already enriched: serve the cached LLM analysis directly
+        return {"analysis": job["result"]["analysis"], "analysis_source": job["result"]["analysis_source"],
+                "enrichment": enrichment}
+    analysis = analyzer.deterministic_analysis(request.skills, request.target_role, request.industry)
+    insights = dataset_insights(request.target_role, request.skills)
+    if insights is not None:
+        analysis["dataset_insights"] = insights
+    return {"analysis": analysis, "analysis_source": "deterministic", "enrichment": enrichment}
+
 @router.post("/analyze-resume")
-async def analyze_resume(request: ResumeAnalysisRequest):
+async def analyze_resume(request: ResumeAnalysisRequest, fields: Optional[str] = None,
+                         compact: bool = False, accept: Optional[str] = Header(None), mode: str = "sync"):
     """
     Analyze resume and provide career insights.
     Uses EnhancedCareerAnalyzer if available; otherwise falls back to local baseline analysis.
+    With ?mode=speculative the deterministic, data-driven analysis is returned at once together
+    with an enrichment job id; poll /career/jobs/{id} or subscribe to /career/jobs/{id}/events
+    for the LLM analysis.
+    Supports ?fields=, ?compact=true and Accept: application/msgpack (see responses.py).
     """
     try:
+        if analyzer is not None and mode == "speculative":
+            # Redaction (spaCy), job store access and the deterministic analysis block; keep them
+            # off the event loop
+            prompt_text = await run_in_threadpool(prompt_resume, request)
+            speculative = await run_in_threadpool(speculative_analysis, request, prompt_text)
+            payload = dict(status="success", role=request.target_role, industry=request.industry,
+                           **speculative)
+            return render_payload(payload, fields, compact, accept)
         if analyzer is not None:
-            analysis = analyzer.analyze_resume(
-                request.resume_text,
+            # Redact exactly the sections the analyzer will send to the LLM
+            prompt_text = await run_in_threadpool(prompt_resume, request)
+            # The LLM call blocks; run it on the threadpool so the event loop keeps serving
+            analysis = await run_in_threadpool(
+                analyzer.analyze_resume,
+                prompt_text,
                 request.skills,
                 request.target_role,
                 request.experience_level,
@@ -241,49 +491,175 @@ async def analyze_resume(request: ResumeAnalysisRequest):
             )
             source = analysis.get("analysis_source", "fallback_analyzer")
 
-        return {
+        payload = {
             "status": "success",
             "analysis": analysis,
             "role": request.target_role,
             "industry": request.industry,
             "analysis_source": source,
         }
+        return render_payload(payload, fields, compact, accept)
     except Exception as e:
+        log.exception("analysis failed")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 @router.get("/analyze-trends/{role}")
-async def analyze_trends(role: str, years_back: int = 5):
-    """Analyze skill trends for a role (only available if enhanced analyzer is present)."""
+async def analyze_trends(role: str, years_back: int = 5, wait: float = TREND_WAIT_SECONDS, live: bool = False):
+    """Analyze skill trends for a role.
+    Known roles and common years_back values are a keyed read of the precomputed snapshot for
+    the current dataset; any other role is computed by the trend engine in milliseconds.
+    live=true (or a role absent from the dataset) runs the LLM-narrated analysis as a background
+    job shared by every caller asking for the same (role, years_back); answers 202 with the job id
+    if that takes longer than `wait` seconds (wait=0 never blocks).
+    Every path answers the same `trends` shape (llm/trend_snapshots.py skill_evolution); measured
+    ones also carry the raw statistics under trends.trend_statistics."""
+    if not live:
+        trends, manifest = await run_in_threadpool(trend_snapshots.get, role, years_back)
+        if trends is not None:
+            return CareerJSONResponse({"status": "success", "role": role, "trends": trends,
+                                       "snapshot_version": manifest["dataset_version"]})
+        stale_dir = await run_in_threadpool(trend_snapshots.stale_dir)
+        if stale_dir is not None:
+            # New dataset: rebuild once in the background (deduplicated across workers)
+            await run_in_threadpool(job_queue.submit, "trend_snapshots", {}, key=os.path.basename(stale_dir))
+        trends = await run_in_threadpool(role_evolution, role, years_back)
+        if trends is not None:
+            return CareerJSONResponse({"status": "success", "role": role, "trends": trends})
     if analyzer is None:
         # graceful, not 500
-        return {
+        return CareerJSONResponse({
             "status": "success",
             "role": role,
             "trends": [],
             "analysis_source": "fallback_analyzer",
             "notes": "Trend analysis requires EnhancedCareerAnalyzer; returning empty trends.",
-        }
+        })
     try:
-        trends = analyzer.analyze_skill_evolution(role, years_back)
-        return {"status": "success", "role": role, "trends": trends}
+        return await trend_job_response("skill_evolution", role, years_back, wait)
+    except HTTPException:
+        raise
     except Exception as e:
+        log.exception("trend analysis failed")
         raise HTTPException(status_code=500, detail=f"Trend analysis failed: {str(e)}")
 
+@router.get("/forecast/{role}")
+async def forecast_demand(role: str, horizon: int = MAX_HORIZON, skills: Optional[str] = None):
+    """1-3 year forecasts, with 80% intervals, of the role's share of positions and of skill shares
+    within the role (llm/forecasting.py). skills is a comma-separated list; by default the most
+    common skills at the horizon are returned, plus the fastest risers."""
+    if not 1 <= horizon <= MAX_HORIZON:
+        raise HTTPException(status_code=400, detail=f"horizon must be between 1 and {MAX_HORIZON}")
+    requested = [s for s in skills.split(",") if s.strip()] if skills else None
+    forecast = await run_in_threadpool(demand_forecast, role, horizon, requested)
+    if forecast is None:
+        raise HTTPException(status_code=404, detail="Not enough historical data to forecast this role")
+    return CareerJSONResponse({"status": "success", "role": role, "forecast": forecast})
+
+@router.get("/next-skills/{role}")
+async def next_skills(role: str, skills: str = "", limit: int = 10, era: Optional[str] = None):
+    """Skills to learn next for a role, ranked by how often they appear alongside the given
+    (comma-separated) skills in the historical positions (llm/skill_graph.py). era is one of the
+    graph's eras, e.g. 2021-2025 (default: the latest); "*" uses all years."""
+    if not 1 <= limit <= 50:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 50")
+    # Mapping the graph and scoring its rows blocks; keep it off the event loop
+    ranked = await run_in_threadpool(recommend_skills, [s for s in skills.split(",") if s.strip()], role, limit, era)
+    if ranked is None:
+        raise HTTPException(status_code=503, detail="Skill graph is not available yet")
+    return CareerJSONResponse({"status": "success", "role": role, "next_skills": ranked})
+
+@router.get("/career-evolution/{role}")
+async def career_evolution(role: str, years_back: int = 10, wait: float = TREND_WAIT_SECONDS):
+    """Role evolution from the historical merged.json dataset plus an LLM summary, as a shared
+    background job with progress reporting (see /analyze-trends for `wait`)."""
+    if trend_analyzer is None:
+        raise HTTPException(status_code=503, detail="Career evolution requires EnhancedCareerAnalyzer")
+    try:
+        return await trend_job_response("career_evolution", role, years_back, wait)
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.exception("career evolution analysis failed")
+        raise HTTPException(status_code=500, detail=f"Career evolution analysis failed: {str(e)}")
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status, progress and (once done) result of a background job"""
+    job = await run_in_threadpool(job_queue.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return CareerJSONResponse({"status": "success", "job": public_view(job)})
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Server-sent events: a "progress" event on every change, then one "result" or "error" event.
+    Reads the shared job store, so it works whichever worker runs the job; SQLite reads run on
+    the threadpool so polling never blocks the event loop."""
+    if await run_in_threadpool(job_queue.store.get, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        last = None
+        deadline = time.monotonic() + JOB_EVENTS_MAX_SECONDS
+        while time.monotonic() < deadline:
+            job = await run_in_threadpool(job_queue.store.get, job_id)
+            view = public_view(job)
+            if job["status"] in (DONE, FAILED):
+                event = "result" if job["status"] == DONE else "error"
+                yield f"event: {event}\ndata: {json.dumps(view, default=str)}\n\n"
+                return
+            state = (job["status"], job["progress"], job["message"])
+            if state != last:
+                last = state
+                yield f"event: progress\ndata: {json.dumps(view, default=str)}\n\n"
+            await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+        yield "event: timeout\ndata: {}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {
+    return CareerJSONResponse({
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "analyzer_available": analyzer is not None,
-        "data_loaded": df is not None,
+        "data_loaded": df is not None or resume_store is not None,
+        "shared_data": resume_store is not None,
         "ner_available": nlp is not None,
         "openai_available": hasattr(analyzer, "client") and analyzer.client is not None if analyzer else False,
-    }
+        "llm_circuit": analyzer.ai_client.circuit_state() if analyzer else "unconfigured",
+        "llm_routing": analyzer.ai_client.routing_status() if analyzer else {},
+        "semantic_cache": analyzer.semantic_cache.stats() if analyzer else {},
+        "jobs": await run_in_threadpool(job_queue.status),
+    })
 
 @router.get("/sample-resumes")
-async def get_sample_resumes(count: int = 3):
-    """Get sample resumes for testing"""
+async def get_sample_resumes(count: int = 3, cursor: Optional[str] = None, position: Optional[str] = None,
+                             skill: Optional[str] = None, random: bool = False, seed: Optional[int] = None):
+    """Get sample resumes for testing.
+
+    Pages are keyset-paginated over the columnar snapshot: pass back next_cursor to continue.
+    position (substring of the title) and skill (exact, lowercase) are answered from inverted
+    indexes, and random=true draws a seeded sample, so cost tracks the page size, not the depth.
+    """
+    count = max(0, min(count, 100))
+    if resume_store is not None:
+        if random:
+            samples, total = resume_store.sample(count, seed=seed, position=position, skill=skill)
+            next_cursor = None
+        else:
+            after = decode_cursor(cursor, position, skill) if cursor else -1
+            samples, next_after, total = resume_store.page(count, after=after, position=position, skill=skill)
+            next_cursor = encode_cursor(next_after, position, skill) if next_after is not None else None
+        return CareerJSONResponse({
+            "status": "success",
+            "count": len(samples),
+            "total_matches": total,
+            "next_cursor": next_cursor,
+            "samples": samples,
+        })
     if df is None:
         mock_samples = [
             {
@@ -297,9 +673,9 @@ async def get_sample_resumes(count: int = 3):
                 "positions": "Software Engineer",
             },
         ]
-        return {"status": "success", "count": len(mock_samples), "samples": mock_samples[:count]}
+        return CareerJSONResponse({"status": "success", "count": len(mock_samples), "samples": mock_samples[:count]})
     samples = df.head(count)[["resume_text", "extracted_skills", "positions"]].fillna("").to_dict("records")
-    return {"status": "success", "count": len(samples), "samples": samples}
+    return CareerJSONResponse({"status": "success", "count": len(samples), "samples": samples})
 
 @router.get("/roles")
 async def get_available_roles():
@@ -311,4 +687,4 @@ async def get_available_roles():
         "Machine Learning Engineer",
         "Business Analyst",
     ]
-    return {"status": "success", "roles": roles}
+    return CareerJSONResponse({"status": "success", "roles": roles})
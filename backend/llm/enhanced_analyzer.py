@@ -11,6 +11,7 @@ load_dotenv(env_path)
 
 # Now continue with your existing imports...
 import json
+import logging
 from datetime import datetime
 
 # Rest of your existing code...
@@ -58,6 +59,15 @@ class RealTimeDataFetcher:
         return skill_map.get(role, ["Python", "SQL", "Cloud Computing"])
     
     def _get_growth_prediction(self, role):
+        """Forecast change in the role's share of positions (llm/forecasting.py); static
+        estimates when the dataset has no history for the role"""
+        forecast = demand_forecast(role)
+        if forecast is not None:
+            demand = forecast["role_demand"]
+            final = demand["forecast"][-1]
+            if demand["share"] > 0:
+                growth = final["share"] / demand["share"] - 1
+                return f"{abs(growth):.0%} {'growth' if growth >= 0 else 'decline'} expected by {final['year']}"
         growth_map = {
             "Data Scientist": "23% growth expected",
             "Software Engineer": "15% growth expected", 
@@ -67,23 +77,106 @@ class RealTimeDataFetcher:
         }
         return growth_map.get(role, "15% growth expected")
 
+try:
+    from llm.provider_router import GeminiProvider, OllamaProvider, OpenAIProvider, ProviderRouter
+    from llm.prompt_builder import RESUME_TOKEN_BUDGET, compact_json, fit_resume
+    from llm.structured_output import ANALYSIS_SCHEMA, parse_json_text, parse_structured
+    from llm.semantic_cache import SemanticAnalysisCache, adapt_cached_analysis
+    from llm.metrics import ANALYSES
+    from llm.tracing import span, traced
+    from llm.trend_snapshots import role_evolution
+    from llm.forecasting import demand_forecast
+    from llm.skill_graph import recommend_skills
+    from llm.logger import get_logger
+except ImportError:
+    from provider_router import GeminiProvider, OllamaProvider, OpenAIProvider, ProviderRouter
+    from prompt_builder import RESUME_TOKEN_BUDGET, compact_json, fit_resume
+    from structured_output import ANALYSIS_SCHEMA, parse_json_text, parse_structured
+    from semantic_cache import SemanticAnalysisCache, adapt_cached_analysis
+    from metrics import ANALYSES
+    from tracing import span, traced
+    from trend_snapshots import role_evolution
+    from forecasting import demand_forecast
+    from skill_graph import recommend_skills
+    from logger import get_logger
+
+log = get_logger(__name__)
+
+# Response shape the parser expects, sent once per prompt as compact JSON
+ANALYSIS_JSON_TEMPLATE = compact_json({
+    "skill_gaps": {
+        "technical": ["skill1", "skill2", "skill3"],
+        "soft_skills": ["skill1", "skill2"],
+        "severity": "Medium",
+        "justification": "Brief explanation of gap severity",
+    },
+    "career_path": {
+        "immediate": {"role": "Specific Job Title", "requirements": ["req1", "req2", "req3"], "salary_range": "$Realistic-Range"},
+        "mid_term": {"role": "Advanced Job Title", "requirements": ["req1", "req2"], "salary_range": "$Higher-Range"},
+        "long_term": {"role": "Senior/Leadership Title", "requirements": ["req1", "req2"], "salary_range": "$Senior-Range"},
+    },
+    "learning_roadmap": {
+        "courses": [{"name": "Specific Course Name", "platform": "Platform Name", "duration": "Realistic Duration", "focus": "What it covers"}],
+        "projects": ["Specific project idea 1", "Specific project idea 2"],
+        "timeline": "Realistic timeline description",
+    },
+    "market_insights": {
+        "demand_trend": "Specific trend description",
+        "emerging_tech": ["technology1", "technology2", "technology3"],
+        "industry_advice": "Specific actionable advice for this industry",
+    },
+})
+
+# Instructions and schema shared by every analysis request. Kept byte-identical
+# across calls (no per-request values) so providers can cache it as a prefix.
+ANALYSIS_PROMPT_PREFIX = f"""You are CareerCompass, an expert AI career advisor. Each request names a target role, experience level and industry, followed by the resume, the user's skills and current market trends.
+
+Give SPECIFIC, ACTIONABLE insights for that role, level and industry:
+1. Skill gaps: 3-5 critical technical skills missing for the target role, 2-3 soft skills, severity (Low/Medium/High) with justification.
+2. Career path realistic for the experience level: immediate (0-1y), mid-term (1-3y), long-term (3-5+y) with role, requirements, salary range.
+3. Learning roadmap: 2-3 courses with platforms, 1-2 projects for the target role, realistic timeline.
+4. Market insights: demand for the role in the industry, 2-3 emerging technologies, industry advice.
+
+Return ONLY valid JSON, no other text or code fences, with exactly this structure:
+{ANALYSIS_JSON_TEMPLATE}"""
+
+def _model_label(target):
+    """Display name of a routing target, e.g. "Gemini 2.5 Flash" for models/gemini-2.5-flash"""
+    name = target.model.split("/")[-1]
+    if name.startswith("gemini-"):
+        return " ".join(part if part[0].isdigit() else part.capitalize() for part in name.split("-"))
+    return name
+
 class AIClient:
     def __init__(self):
         self.client = None
         self.provider = None
         self.model_name = None
+        self.router = None
         self.setup_ai()
     
     def setup_ai(self):
-        """Setup AI client with proven working Gemini 2.5 Flash model"""
-        # Try Gemini first (free)
+        """Register every configured Gemini model, OpenAI and a local Ollama model as routing targets.
+
+        Targets are no longer probed at startup: the router ranks them by observed
+        latency and error rate, hedges slow calls and demotes failing models.
+        """
+        targets = []
+
+        # Gemini first (free)
         gemini_key = os.getenv("GEMINI_API_KEY")
         if gemini_key:
             try:
                 import google.generativeai as genai
-                genai.configure(api_key=gemini_key)
+                gemini_endpoint = os.getenv("GEMINI_API_ENDPOINT")
+                if gemini_endpoint:
+                    # Local stub / proxy: REST transport so a plain HTTP server can answer
+                    genai.configure(api_key=gemini_key, transport="rest",
+                                    client_options={"api_endpoint": gemini_endpoint})
+                else:
+                    genai.configure(api_key=gemini_key)
                 
-                # Use the proven working model from testing
+                # Proven working models from testing, in priority order
                 proven_models = [
                     'models/gemini-2.5-flash',  # Stable Flash - confirmed working!
                     'models/gemini-2.5-flash-lite',  # Backup option
@@ -93,75 +186,80 @@ class AIClient:
                 
                 for model_path in proven_models:
                     try:
-                        print(f"🔧 Testing Gemini model: {model_path}")
-                        self.client = genai.GenerativeModel(model_path)
-                        # Quick test with simple prompt
-                        test_response = self.client.generate_content(
-                            "Respond with: OK", 
-                            request_options={"timeout": 10}
-                        )
-                        self.provider = "gemini"
-                        self.model_name = model_path
-                        print(f"✅ Gemini 2.5 Flash client ready!")
-                        return
+                        targets.append(GeminiProvider(genai, model_path))
                     except Exception as e:
-                        print(f"⚠️ Gemini model {model_path} failed: {str(e)[:100]}")
-                        continue
-                        
-                print("❌ No Gemini models worked")
+                        log.warning("gemini model unavailable", model=model_path, error=str(e)[:100])
                         
             except Exception as e:
-                print(f"❌ Gemini setup failed: {e}")
+                log.error("gemini setup failed", error=str(e))
         
-        # Try OpenAI as backup
+        # OpenAI as backup (honours OPENAI_BASE_URL for stubs)
         openai_key = os.getenv("OPENAI_API_KEY")
         if openai_key:
             try:
                 from openai import OpenAI
-                self.client = OpenAI(api_key=openai_key)
-                self.provider = "openai"
-                self.model_name = "gpt-3.5-turbo"
-                print("✅ OpenAI client ready!")
-                return
+                targets.append(OpenAIProvider(OpenAI(api_key=openai_key), "gpt-3.5-turbo"))
+            except Exception as e:
+                log.error("openai setup failed", error=str(e))
+
+        # Local Ollama model (on-prem, no cloud API); enabled by naming the model
+        ollama_model = os.getenv("OLLAMA_MODEL")
+        if ollama_model:
+            try:
+                try:
+                    from llm.ollama_client import shared_client
+                except ImportError:
+                    from ollama_client import shared_client
+                targets.append(OllamaProvider(shared_client(), ollama_model))
             except Exception as e:
-                print(f"❌ OpenAI setup failed: {e}")
+                log.error("ollama setup failed", error=str(e))
         
-        print("❌ No AI providers available - using fallback mode")
-        self.client = None
+        if not targets:
+            log.warning("no AI providers available, using fallback mode")
+            self.client = None
+            return
+
+        self.router = ProviderRouter(targets)
+        self.client = self.router
+        # Primary (first configured) target; the one that answered a call comes back from generate()
+        self.provider = targets[0].provider
+        self.model_name = targets[0].model
+        log.info("AI router ready", targets=",".join(self.router.key(t) for t in targets))
     
-    def analyze_with_ai(self, prompt):
-        """Analyze using available AI provider"""
-        if not self.client:
-            return None
+    @traced("analyze_with_ai")
+    def generate(self, prompt, schema=None, prefix=None):
+        """(target, text) from the best available provider (hedged, first valid JSON wins), or
+        (None, None). With a schema the provider's JSON/response-schema mode is requested; a
+        static prefix is sent separately so providers can serve it from their prompt cache."""
+        if not self.router:
+            return None, None
             
-        try:
-            if self.provider == "gemini":
-                response = self.client.generate_content(
-                    prompt, 
-                    request_options={"timeout": 60}  # Increased timeout for complex analysis
-                )
-                return response.text
-                
-            elif self.provider == "openai":
-                response = self.client.chat.completions.create(
-                    model=self.model_name,
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.7,
-                    max_tokens=2000
-                )
-                return response.choices[0].message.content
-                
-        except Exception as e:
-            print(f"❌ AI analysis failed: {e}")
-            return None
+        target, text = self.router.generate(prompt, schema=schema, prefix=prefix)
+        if target is None:
+            log.warning("AI analysis failed on all providers")
+        return target, text
+
+    def analyze_with_ai(self, prompt, schema=None, prefix=None):
+        """Reply text from generate(), or None"""
+        return self.generate(prompt, schema, prefix)[1]
+
+    def available(self):
+        """True if a provider is configured and at least one circuit lets calls through"""
+        return self.router is not None and self.router.available()
+
+    def circuit_state(self):
+        return self.router.circuit_state() if self.router else "unconfigured"
+
+    def routing_status(self):
+        return self.router.status() if self.router else {}
 
 class EnhancedCareerAnalyzer:
     def __init__(self):
         self.ai_client = AIClient()
         self.real_time_data = RealTimeDataFetcher()
-        print("🚀 Enhanced Career Analyzer with Gemini 2.5 Flash loaded!")
-        if self.ai_client.client:
-            print(f"🤖 Using {self.ai_client.provider.upper()} with model: {self.ai_client.model_name}")
+        self.semantic_cache = SemanticAnalysisCache()
+        log.info("enhanced career analyzer loaded", provider=self.ai_client.provider,
+                 model=self.ai_client.model_name)
     
     def analyze_resume(self, resume_text, user_skills, target_role="Data Analyst", 
                       experience_level="Intermediate", industry="Technology", analysis_type="detailed"):
@@ -169,172 +267,114 @@ class EnhancedCareerAnalyzer:
         
         # Get real-time market data
         market_trends = self.real_time_data.get_market_trends(target_role, industry)
+        # Data-ranked gaps, computed once and shared by the prompt, the cache and the fallback
+        ranked = recommend_skills(user_skills, target_role)
         
-        # Try to use AI if available
-        if self.ai_client.client:
-            print(f"🤖 Using Gemini 2.5 Flash for career analysis...")
-            ai_analysis = self._analyze_with_ai(resume_text, user_skills, target_role, experience_level, industry, market_trends)
+        # Try to use AI if available; with every circuit open, skip straight to the fallback
+        if self.ai_client.client and not self.ai_client.available():
+            log.sampled("AI circuit open, returning fallback analysis", level=logging.WARNING)
+            ANALYSES.inc(source="circuit_open")
+        elif self.ai_client.client:
+            cached = self._semantic_cache_lookup(user_skills, target_role, experience_level, industry, market_trends, ranked)
+            if cached:
+                ANALYSES.inc(source="semantic_cache")
+                return cached
+            ai_analysis = self._analyze_with_ai(resume_text, user_skills, target_role, experience_level, industry, market_trends, ranked)
             if ai_analysis:
+                self.semantic_cache.store(user_skills, target_role, experience_level, industry, ai_analysis)
+                ANALYSES.inc(source="ai")
                 return ai_analysis
             else:
-                print("🔄 AI analysis failed, using enhanced fallback analysis")
+                log.warning("AI analysis failed, using fallback analysis", role=target_role)
+                ANALYSES.inc(source="ai_failed")
+        else:
+            ANALYSES.inc(source="no_ai")
         
         # Fallback to comprehensive analysis
-        return self._get_fallback_analysis(user_skills, target_role, market_trends)
+        return self._get_fallback_analysis(user_skills, target_role, market_trends, ranked)
     
-    def _analyze_with_ai(self, resume_text, user_skills, target_role, experience_level, industry, market_trends):
-        """Analyze using Gemini 2.5 Flash"""
-        prompt = self._build_analysis_prompt(resume_text, user_skills, target_role, experience_level, industry, market_trends)
+    def deterministic_analysis(self, user_skills, target_role="Data Analyst", industry="Technology"):
+        """Rule-based analysis with market data and no LLM call (the speculative answer)"""
+        market_trends = self.real_time_data.get_market_trends(target_role, industry)
+        analysis = self._get_fallback_analysis(user_skills, target_role, market_trends)
+        analysis["analysis_source"] = "deterministic"
+        return analysis
+
+    def _semantic_cache_lookup(self, user_skills, target_role, experience_level, industry, market_trends, ranked):
+        """Reuse the analysis of a near-identical profile, with the gap list recomputed for this user"""
+        entry, similarity = self.semantic_cache.lookup(user_skills, target_role, experience_level, industry)
+        if entry is None:
+            return None
+        relevant = self._get_fallback_analysis([], target_role, market_trends)["skill_gaps"]["technical"]
+        relevant = list(relevant) + market_trends.get("trending_skills", [])
+        analysis = adapt_cached_analysis(entry, user_skills, relevant, similarity)
+        _apply_ranked_gaps(analysis, ranked)
+        analysis["real_time_insights"] = market_trends
+        analysis["analysis_timestamp"] = datetime.now().isoformat()
+        log.sampled("semantic cache hit", similarity=round(similarity, 3), role=target_role)
+        return analysis
+
+    def _analyze_with_ai(self, resume_text, user_skills, target_role, experience_level, industry, market_trends, ranked):
+        """Analyze with the routed LLM in structured-output mode, labelled with the model that answered"""
+        suffix = self._build_analysis_suffix(resume_text, user_skills, target_role, experience_level, industry, market_trends, ranked)
         
-        print("📊 Generating AI-powered career analysis...")
-        analysis_text = self.ai_client.analyze_with_ai(prompt)
+        log.debug("requesting AI career analysis", role=target_role)
+        target, analysis_text = self.ai_client.generate(suffix, schema=ANALYSIS_SCHEMA, prefix=ANALYSIS_PROMPT_PREFIX)
         
         if not analysis_text:
             return None
-            
-        try:
-            # Clean the response - handle JSON code blocks
-            analysis_text = analysis_text.strip()
-            if analysis_text.startswith('```json'):
-                analysis_text = analysis_text[7:]
-            elif analysis_text.startswith('```'):
-                analysis_text = analysis_text[3:]
-            if analysis_text.endswith('```'):
-                analysis_text = analysis_text[:-3]
-            analysis_text = analysis_text.strip()
-
-            # Parse JSON response
-            analysis_data = json.loads(analysis_text)
-            
-            # Enhance with real-time data and metadata
-            analysis_data["real_time_insights"] = market_trends
-            analysis_data["analysis_timestamp"] = datetime.now().isoformat()
-            analysis_data["analysis_source"] = f"Gemini 2.5 Flash"
-            analysis_data["model_used"] = self.ai_client.model_name
-            
-            print("✅ Gemini 2.5 Flash analysis successful!")
-            return analysis_data
-            
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON parsing failed: {e}")
-            print(f"📄 Raw response preview: {analysis_text[:300]}...")
-            # Try to extract JSON if it's wrapped in other text
-            return self._extract_json_from_text(analysis_text, market_trends)
-        except Exception as e:
-            print(f"❌ AI response processing failed: {e}")
-            return None
 
-    def _extract_json_from_text(self, text, market_trends):
-        """Extract JSON from text response if parsing fails"""
-        try:
-            # Look for JSON pattern in the text
-            start_idx = text.find('{')
-            end_idx = text.rfind('}') + 1
+        # Repair and schema-check locally; gaps are filled from the deterministic analysis
+        fallback = self._get_fallback_analysis(user_skills, target_role, market_trends, ranked)
+        with span("parse_analysis_json") as parse_span:
+            analysis_data, outcome = parse_structured(analysis_text, ANALYSIS_SCHEMA, fallback, target)
+            if parse_span:
+                parse_span.set(outcome=outcome)
+        if analysis_data is None:
+            log.warning("analysis JSON parsing failed", preview=analysis_text[:300])
+            return None
             
-            if start_idx != -1 and end_idx != -1:
-                json_text = text[start_idx:end_idx]
-                analysis_data = json.loads(json_text)
-                
-                # Add metadata
-                analysis_data["real_time_insights"] = market_trends
-                analysis_data["analysis_timestamp"] = datetime.now().isoformat()
-                analysis_data["analysis_source"] = "Gemini 2.5 Flash (extracted)"
-                analysis_data["model_used"] = self.ai_client.model_name
-                
-                print("✅ Successfully extracted JSON from response!")
-                return analysis_data
-        except Exception as e:
-            print(f"❌ JSON extraction also failed: {e}")
+        # Technical gaps are ranked from the dataset, not by the model
+        _apply_ranked_gaps(analysis_data, ranked)
+        # Enhance with real-time data and metadata
+        analysis_data["real_time_insights"] = market_trends
+        analysis_data["analysis_timestamp"] = datetime.now().isoformat()
+        label = _model_label(target)
+        analysis_data["analysis_source"] = label if outcome == "clean" else f"{label} ({outcome})"
+        analysis_data["model_used"] = target.model
         
-        return None
+        log.sampled("AI analysis succeeded", outcome=outcome, model=target.model)
+        return analysis_data
     
-    def _build_analysis_prompt(self, resume_text, user_skills, target_role, experience_level, industry, market_trends):
-        """Build the analysis prompt for Gemini 2.5 Flash"""
-        return f"""You are CareerCompass, an expert AI career advisor specializing in {industry} industry. 
-
-ANALYSIS REQUEST:
-- Target Role: {target_role}
-- Experience Level: {experience_level}
-- Industry: {industry}
-
-RESUME CONTENT (first 2000 chars):
-{resume_text[:2000]}
-
-USER'S CURRENT SKILLS:
-{', '.join(user_skills)}
-
-CURRENT MARKET TRENDS:
-{json.dumps(market_trends, indent=2)}
-
-Provide a comprehensive career analysis with SPECIFIC, ACTIONABLE insights. Focus on:
+    def _build_analysis_prompt(self, resume_text, user_skills, target_role, experience_level, industry, market_trends, ranked=None):
+        """Build the full analysis prompt (static prefix + per-request suffix)"""
+        return ANALYSIS_PROMPT_PREFIX + "\n\n" + self._build_analysis_suffix(
+            resume_text, user_skills, target_role, experience_level, industry, market_trends, ranked)
 
-1. SKILL GAP ANALYSIS:
-   - 3-5 CRITICAL technical skills missing for {target_role}
-   - 2-3 essential soft skills needed
-   - Gap severity assessment (Low/Medium/High) with justification
+    @traced("build_analysis_prompt")
+    def _build_analysis_suffix(self, resume_text, user_skills, target_role, experience_level, industry, market_trends, ranked=None):
+        """Per-request part of the analysis prompt (token-budgeted, compact JSON context); ranked is
+        the recommend_skills result listed as the data-ranked gaps"""
+        keywords = list(user_skills) + target_role.lower().split()
+        resume_excerpt = fit_resume(resume_text, keywords, RESUME_TOKEN_BUDGET)
+        # last_updated is a timestamp the model has no use for
+        market_context = {k: v for k, v in market_trends.items() if k != "last_updated"}
+        ranked_gaps = ""
+        if ranked and ranked["recommendations"]:
+            ranked_gaps = (f"\n\nDATA-RANKED TECHNICAL GAPS (most common alongside the user's skills in {ranked['positions']} "
+                           f"positions; use these as skill_gaps.technical): {', '.join(r['skill'] for r in ranked['recommendations'])}")
+        return f"""ANALYSIS REQUEST: target role {target_role}; experience level {experience_level}; industry {industry}
 
-2. CAREER PROGRESSION PATH (realistic for {experience_level} level):
-   - Immediate (0-1 year): Role title, key requirements, realistic salary
-   - Mid-term (1-3 years): Role title, advanced requirements, salary progression
-   - Long-term (3-5+ years): Senior role, leadership requirements, salary potential
+RESUME (most relevant sections):
+{resume_excerpt}
 
-3. LEARNING ROADMAP:
-   - 2-3 specific courses with platforms (Coursera, edX, Udemy, etc.)
-   - 1-2 hands-on project ideas relevant to {target_role}
-   - Realistic timeline for skill development
+USER'S CURRENT SKILLS: {', '.join(user_skills)}
 
-4. MARKET INSIGHTS:
-   - Current demand analysis for {target_role} in {industry}
-   - 2-3 emerging technologies to focus on
-   - Specific industry advice for career growth
-
-IMPORTANT: Return ONLY valid JSON with this exact structure - no additional text, no code formatting:
-
-{{
-    "skill_gaps": {{
-        "technical": ["skill1", "skill2", "skill3"],
-        "soft_skills": ["skill1", "skill2"],
-        "severity": "Medium",
-        "justification": "Brief explanation of gap severity"
-    }},
-    "career_path": {{
-        "immediate": {{
-            "role": "Specific Job Title",
-            "requirements": ["requirement1", "requirement2", "requirement3"],
-            "salary_range": "$Realistic-Range"
-        }},
-        "mid_term": {{
-            "role": "Advanced Job Title", 
-            "requirements": ["advanced_req1", "advanced_req2"],
-            "salary_range": "$Higher-Range"
-        }},
-        "long_term": {{
-            "role": "Senior/Leadership Title",
-            "requirements": ["leadership_req1", "strategic_req2"],
-            "salary_range": "$Senior-Range"
-        }}
-    }},
-    "learning_roadmap": {{
-        "courses": [
-            {{
-                "name": "Specific Course Name",
-                "platform": "Platform Name",
-                "duration": "Realistic Duration",
-                "focus": "What it covers"
-            }}
-        ],
-        "projects": ["Specific project idea 1", "Specific project idea 2"],
-        "timeline": "Realistic timeline description"
-    }},
-    "market_insights": {{
-        "demand_trend": "Specific trend description",
-        "emerging_tech": ["technology1", "technology2", "technology3"],
-        "industry_advice": "Specific actionable advice for this industry"
-    }}
-}}"""
+CURRENT MARKET TRENDS: {compact_json(market_context)}{ranked_gaps}"""
     
-    def _get_fallback_analysis(self, user_skills, target_role, market_trends):
-        """Provide enhanced fallback analysis when AI is not available"""
+    def _get_fallback_analysis(self, user_skills, target_role, market_trends, ranked=None):
+        """Provide enhanced fallback analysis when AI is not available; ranked is the caller's
+        recommend_skills result (looked up here when not given)"""
         # Enhanced role-specific analysis
         role_analysis = {
             "Data Analyst": {
@@ -441,11 +481,46 @@ IMPORTANT: Return ONLY valid JSON with this exact structure - no additional text
             "analysis_source": "enhanced_fallback",
             "model_used": "fallback"
         }
+        # Data-ranked gaps replace the template ones when the dataset is available
+        if ranked is None:
+            ranked = recommend_skills(user_skills, target_role)
+        _apply_ranked_gaps(analysis, ranked)
+        ranking = analysis["skill_gaps"].get("technical_ranking")
+        if ranking:
+            analysis["skill_gaps"]["justification"] = _ranked_justification(ranking)
         
         return analysis
 
     def analyze_skill_evolution(self, role, years_back=5):
-        """Analyze skill evolution trends using Gemini 2.5 Flash if available"""
+        """Skill evolution for a role. Emerging, declining and stable skills are measured from the
+        historical dataset (llm/trend_engine.py) and future predictions are demand forecasts
+        (llm/forecasting.py); the LLM, if available, only narrates salary impact."""
+        evolution = role_evolution(role, years_back)
+        if evolution is None:
+            return self._unmeasured_skill_evolution(role, years_back)
+        evolution["role"] = role
+        stats = evolution["trend_statistics"]
+        if self.ai_client.client:
+            measured = {key: [item["skill"] for item in stats[key]]
+                        for key in ("emerging_skills", "declining_skills", "stable_skills")}
+            measured["forecast_rising"] = [item["skill"] for item in evolution["future_predictions"]]
+            measured = compact_json(measured)
+            prompt = f"""Measured skill trends for {role} job postings, {stats["years"][0]}-{stats["years"][1]} ({stats["positions"]} postings; treat as fact):
+{measured}
+
+Do not re-rank or add to these lists. Based on them, describe the salary impact of the
+emerging and forecast-rising skills vs the declining ones.
+
+Return as JSON with: salary_impact"""
+            target, text = self.ai_client.generate(prompt)
+            narration, _ = parse_json_text(text)
+            if isinstance(narration, dict) and narration.get("salary_impact"):
+                evolution["salary_impact"] = narration["salary_impact"]
+                evolution["analysis_source"] = f"dataset_statistics + {_model_label(target)}"
+        return evolution
+
+    def _unmeasured_skill_evolution(self, role, years_back):
+        """No historical data for the role: Gemini's own estimate, else a static fallback"""
         if self.ai_client.client:
             prompt = f"""Analyze skill evolution trends for {role} over the past {years_back} years.
             
@@ -458,11 +533,9 @@ IMPORTANT: Return ONLY valid JSON with this exact structure - no additional text
             Return as JSON with: emerging_skills, declining_skills, future_predictions, salary_impact"""
             
             ai_analysis = self.ai_client.analyze_with_ai(prompt)
-            if ai_analysis:
-                try:
-                    return json.loads(ai_analysis)
-                except:
-                    pass
+            evolution, _ = parse_json_text(ai_analysis)
+            if isinstance(evolution, dict):
+                return evolution
         
         # Fallback skill evolution analysis
         return {
@@ -485,6 +558,21 @@ IMPORTANT: Return ONLY valid JSON with this exact structure - no additional text
             "analysis_source": "Gemini 2.5 Flash" if self.ai_client.client else "fallback"
         }
 
+
+def _apply_ranked_gaps(analysis, ranked):
+    """Set skill_gaps.technical from a co-occurrence ranking (llm/skill_graph.py recommend_skills),
+    so the same skills and role always give the same gaps"""
+    gaps = analysis.get("skill_gaps")
+    if not ranked or not ranked["recommendations"] or not isinstance(gaps, dict):
+        return
+    gaps["technical"] = [r["skill"] for r in ranked["recommendations"]]
+    gaps["technical_ranking"] = ranked
+
+def _ranked_justification(ranked):
+    scope = f"{ranked['positions']} positions" if ranked["role"] == "*" else f"{ranked['positions']} {ranked['role']} positions"
+    era = "" if ranked["era"] == "*" else f" from {ranked['era']}"
+    return f"Skills most often listed alongside yours on {scope}{era}"
+
 # Example usage
 if __name__ == "__main__":
     analyzer = EnhancedCareerAnalyzer()
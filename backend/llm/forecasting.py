@@ -0,0 +1,315 @@
+# llm/forecasting.py
+"""
+Demand forecasts for roles and skills from the yearly counts in merged.json.
+
+For a role (any title substring, as in llm/trend_engine.py) the series are
+the role's share of all positions per year and, for every skill it mentions
+often enough, the share of the role's positions listing that skill. All of a
+role's series are fitted at once with Holt's linear exponential smoothing:
+the recursion runs over the years with every series (and every candidate
+(alpha, beta) pair of a small grid) as a column of one array, and each series
+keeps the pair with the lowest one-step-ahead squared error.
+
+Fitted parameters and the end state (level, trend, error sums) are cached in
+memory (least recently used roles beyond FORECAST_CACHE_ROLES are dropped) and
+in FORECAST_DIR; roles too short to fit are neither stored nor cached. When a new year of data arrives and the earlier
+years are unchanged, only the new year is run through the recursion with the
+stored parameters; skills that newly qualify are fitted from scratch, and a
+change to past years (their position counts or any stored series' shares,
+compared by digest) triggers a full refit.
+
+Forecasts cover 1-MAX_HORIZON years after the last fitted year, with 80%
+prediction intervals from the Holt variance formula, clipped to [0, 1].
+
+Configuration:
+  FORECAST_DIR=data/forecasts  FORECAST_CACHE_ROLES=512
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    from llm.trend_engine import MERGED_JSON_PATH, MIN_SKILL_MENTIONS, MIN_YEAR_POSITIONS, TOP_SKILLS, get_engine
+    from llm.logger import get_logger
+except ImportError:
+    from trend_engine import MERGED_JSON_PATH, MIN_SKILL_MENTIONS, MIN_YEAR_POSITIONS, TOP_SKILLS, get_engine
+    from logger import get_logger
+
+log = get_logger(__name__)
+
+FORECAST_DIR = os.getenv("FORECAST_DIR", "data/forecasts")
+FORECAST_CACHE_ROLES = int(os.getenv("FORECAST_CACHE_ROLES", "512"))
+# Fits for different roles run in parallel; a role always maps to the same lock
+LOCK_STRIPES = 64
+# Bump when the model or the stored parameters change
+FORECAST_MODEL_VERSION = 2
+MAX_HORIZON = 3
+ALPHAS = np.linspace(0.1, 0.9, 9)
+BETAS = np.array([0.05, 0.1, 0.2, 0.3, 0.5])
+INTERVAL = 0.8
+INTERVAL_Z = 1.2816
+# Two years initialise level and trend; the rest give the errors parameters are chosen on
+MIN_FIT_YEARS = 4
+ROLE_SERIES = "__role_share__"
+
+_STATE = ("alpha", "beta", "level", "trend", "sse", "n")
+
+
+def _observations(engine, role):
+    """Fitted years, series names and the (years x series) share matrix for a role, plus the
+    role and overall position counts of those years (used to detect changed history)"""
+    positions, counts = engine.role_counts(role)
+    keep = positions >= MIN_YEAR_POSITIONS
+    years = np.arange(engine.first_year, engine.last_year + 1)[keep]
+    n, totals, counts = positions[keep], engine.year_positions[keep], counts[keep]
+    skills = np.flatnonzero(counts.sum(axis=0) >= MIN_SKILL_MENTIONS)
+    shares = np.column_stack([n / totals, counts[:, skills] / n[:, None].astype(np.float64)])
+    names = np.array([ROLE_SERIES] + [engine.skills[i] for i in skills])
+    return years, names, shares, n, totals
+
+
+def _history_digest(Y):
+    """Digest of a (years x series) share matrix, kept instead of the matrix itself"""
+    return hashlib.blake2b(np.ascontiguousarray(Y, dtype=np.float64).tobytes(), digest_size=16).hexdigest()
+
+
+def _holt(years, Y, alpha, beta, level, trend, last_year):
+    """Holt's recursion over the rows of Y (years after last_year), vectorized over columns.
+    alpha, beta, level and trend broadcast against a row (a leading grid axis is allowed).
+    Returns (level, trend, sum of squared one-step errors)."""
+    sse = np.zeros(np.broadcast(alpha, level).shape)
+    for year, y in zip(years, Y):
+        gap = year - last_year
+        forecast = level + gap * trend
+        error = y - forecast
+        sse += error * error
+        new_level = forecast + alpha * error
+        trend = beta * (new_level - level) / gap + (1 - beta) * trend
+        level, last_year = new_level, year
+    return level, trend, sse
+
+
+def _fit(years, Y):
+    """Grid-searched Holt parameters and end state for every column of Y"""
+    level0 = Y[1]
+    trend0 = (Y[1] - Y[0]) / (years[1] - years[0])
+    alpha = np.repeat(ALPHAS, len(BETAS))[:, None]
+    beta = np.tile(BETAS, len(ALPHAS))[:, None]
+    level, trend, sse = _holt(years[2:], Y[2:], alpha, beta, level0, trend0, years[1])
+    best = np.argmin(sse, axis=0)
+    columns = np.arange(Y.shape[1])
+    return {
+        "alpha": alpha[best, 0], "beta": beta[best, 0],
+        "level": level[best, columns], "trend": trend[best, columns],
+        "sse": sse[best, columns], "n": np.full(Y.shape[1], len(years) - 2),
+    }
+
+
+class DemandModel:
+    """Fitted parameters and end state of one role's series"""
+
+    def __init__(self, names, years, positions, totals, history, state):
+        self.names = names
+        self.years = years          # fitted years, for detecting changed history
+        self.positions = positions
+        self.totals = totals
+        self.history = history      # _history_digest of the fitted shares, columns in names order
+        self.state = state
+        self.index = {name: i for i, name in enumerate(names)}
+
+    @property
+    def last_year(self):
+        return int(self.years[-1])
+
+    @classmethod
+    def fit(cls, years, names, Y, positions, totals):
+        if len(years) < MIN_FIT_YEARS:
+            return None
+        return cls(names, years, positions, totals, _history_digest(Y), _fit(years, Y))
+
+    def update(self, years, names, Y, positions, totals):
+        """Model for the new observations: incremental when they only add years, else a refit"""
+        known = len(self.years)
+        new_index = {name: i for i, name in enumerate(names)}
+        columns = [new_index.get(name, -1) for name in self.names]
+        if (len(years) < known or not np.array_equal(years[:known], self.years)
+                or not np.array_equal(positions[:known], self.positions)
+                or not np.array_equal(totals[:known], self.totals)
+                or -1 in columns or _history_digest(Y[:known, columns]) != self.history):
+            log.info("forecast history changed, refitting", series=len(names))
+            return DemandModel.fit(years, names, Y, positions, totals)
+        if len(years) == known and np.array_equal(names, self.names):
+            return self
+        old = np.array([self.index.get(name, -1) for name in names])
+        carried = old >= 0
+        state = {field: np.zeros(len(names), dtype=self.state[field].dtype) for field in _STATE}
+        if carried.any():
+            previous = {field: self.state[field][old[carried]] for field in _STATE}
+            level, trend, sse = _holt(years[known:], Y[known:, carried], previous["alpha"], previous["beta"],
+                                      previous["level"], previous["trend"], self.last_year)
+            previous.update(level=level, trend=trend, sse=previous["sse"] + sse,
+                            n=previous["n"] + len(years) - known)
+            for field in _STATE:
+                state[field][carried] = previous[field]
+        if (~carried).any():
+            fresh = _fit(years, Y[:, ~carried])
+            for field in _STATE:
+                state[field][~carried] = fresh[field]
+        log.info("forecast updated incrementally", new_years=len(years) - known,
+                 carried=int(carried.sum()), fitted=int((~carried).sum()))
+        return DemandModel(names, years, positions, totals, _history_digest(Y), state)
+
+    def forecast(self, horizon=MAX_HORIZON, columns=None):
+        """(mean, lower, upper), each (horizon x series), for the years after the last fitted one"""
+        s = {field: values if columns is None else values[columns] for field, values in self.state.items()}
+        h = np.arange(1, horizon + 1)[:, None]
+        mean = s["level"] + h * s["trend"]
+        # Error-correction form of the trend update: b_t = b_{t-1} + alpha * beta * e_t
+        b = s["alpha"] * s["beta"]
+        sigma2 = s["sse"] / np.maximum(s["n"] - 1, 1)
+        variance = sigma2 * (1 + (h - 1) * (s["alpha"] ** 2 + s["alpha"] * b * h + b * b * h * (2 * h - 1) / 6))
+        half = INTERVAL_Z * np.sqrt(variance)
+        return np.clip(mean, 0, 1), np.clip(mean - half, 0, 1), np.clip(mean + half, 0, 1)
+
+    # ---- persistence ----
+
+    def save(self, path):
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(suffix=".npz", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, version=FORECAST_MODEL_VERSION, names=self.names, years=self.years,
+                         positions=self.positions, totals=self.totals, history=self.history, **self.state)
+            os.replace(tmp, path)
+        except Exception:
+            os.unlink(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data["version"]) != FORECAST_MODEL_VERSION:
+                    return None
+                return cls(data["names"], data["years"], data["positions"], data["totals"], str(data["history"]),
+                           {field: data[field] for field in _STATE})
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+def _point(year, mean, lower, upper):
+    return {"year": int(year), "share": round(float(mean), 4),
+            "lower": round(float(lower), 4), "upper": round(float(upper), 4)}
+
+
+class ForecastStore:
+    """Fitted models per role for the dataset on disk, kept current as it changes"""
+
+    def __init__(self, path=MERGED_JSON_PATH, root=FORECAST_DIR, capacity=FORECAST_CACHE_ROLES):
+        self.path = path
+        self.root = root
+        self.capacity = capacity
+        self.models = OrderedDict()  # role -> (engine the model was checked against, model), LRU order
+        self.lock = threading.Lock()  # guards self.models only
+        self.role_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+    def _file(self, role):
+        return os.path.join(self.root, self._digest(role) + ".npz")
+
+    @staticmethod
+    def _digest(role):
+        return hashlib.blake2b(role.encode(), digest_size=8).hexdigest()
+
+    def _cached(self, role):
+        with self.lock:
+            cached = self.models.get(role)
+            if cached is not None:
+                self.models.move_to_end(role)
+            return cached
+
+    def model(self, role):
+        """Current model for role; None without a dataset or with too few years of data"""
+        engine = get_engine(self.path)
+        if engine is None:
+            return None
+        role = role.strip().lower()
+        cached = self._cached(role)
+        if cached is not None and cached[0] is engine:
+            return cached[1]
+        # One fit per role at a time; other roles are fitted concurrently
+        with self.role_locks[int(self._digest(role), 16) % LOCK_STRIPES]:
+            cached = self._cached(role)
+            if cached is not None and cached[0] is engine:
+                return cached[1]
+            model = cached[1] if cached is not None else DemandModel.load(self._file(role))
+            observations = _observations(engine, role)
+            updated = model.update(*observations) if model is not None else DemandModel.fit(*observations)
+            if updated is None:
+                # Too little history: nothing to keep (and a stored model no longer applies)
+                with self.lock:
+                    self.models.pop(role, None)
+                if model is not None:
+                    try:
+                        os.unlink(self._file(role))
+                    except FileNotFoundError:
+                        pass
+                return None
+            if updated is not model:
+                updated.save(self._file(role))
+            with self.lock:
+                self.models[role] = (engine, updated)
+                self.models.move_to_end(role)
+                while len(self.models) > self.capacity:
+                    self.models.popitem(last=False)
+            return updated
+
+    def forecast(self, role, horizon=MAX_HORIZON, skills=None, top=TOP_SKILLS):
+        """Role demand and skill share forecasts, or None when the role has too little history.
+        skills picks the skills to report; by default the most common ones at the horizon,
+        plus the fastest risers."""
+        model = self.model(role)
+        if model is None:
+            return None
+        horizon = max(1, min(int(horizon), MAX_HORIZON))
+        mean, lower, upper = model.forecast(horizon)
+        years = model.last_year + np.arange(1, horizon + 1)
+
+        def series(column):
+            return {
+                "share": round(float(np.clip(model.state["level"][column], 0, 1)), 4),
+                "forecast": [_point(*values) for values in zip(years, mean[:, column], lower[:, column], upper[:, column])],
+            }
+
+        change = mean[-1, 1:] - np.clip(model.state["level"][1:], 0, 1)
+        if skills:
+            columns = [model.index[s.strip().lower()] for s in skills if s.strip().lower() in model.index]
+        else:
+            columns = list(1 + np.argsort(-mean[-1, 1:], kind="stable")[:top])
+        rising = 1 + np.argsort(-change, kind="stable")[:top]
+        return {
+            "role": role,
+            "method": "holt_linear",
+            "fitted_years": [int(model.years[0]), model.last_year],
+            "interval": INTERVAL,
+            "role_demand": series(0),
+            "skills": [dict(skill=str(model.names[c]), **series(c)) for c in columns],
+            "rising_skills": [dict(skill=str(model.names[c]), change=round(float(change[c - 1]), 4), **series(c))
+                              for c in rising if change[c - 1] > 0],
+        }
+
+
+_store = ForecastStore()
+
+
+def demand_forecast(role, horizon=MAX_HORIZON, skills=None):
+    """Forecast for role from the shared store, or None when no dataset/history is available"""
+    try:
+        return _store.forecast(role, horizon, skills)
+    except (OSError, ValueError, KeyError) as e:
+        log.warning("demand forecast unavailable", role=role, error=str(e))
+        return None
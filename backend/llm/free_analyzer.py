@@ -1,18 +1,31 @@
-import json
-import requests
+import os
+
+try:
+    from llm.ollama_client import shared_client
+    from llm.provider_router import OllamaProvider, ProviderRouter
+    from llm.structured_output import ANALYSIS_SCHEMA, parse_structured
+    from llm.logger import get_logger
+except ImportError:
+    from ollama_client import shared_client
+    from provider_router import OllamaProvider, ProviderRouter
+    from structured_output import ANALYSIS_SCHEMA, parse_structured
+    from logger import get_logger
+
+log = get_logger(__name__)
+
+OLLAMA_TIMEOUT_SECONDS = float(os.getenv("OLLAMA_TIMEOUT_SECONDS", "120"))
 
 class FreeCareerAnalyzer:
     def __init__(self):
-        self.model = "llama2"  # Free local model
+        self.model = os.getenv("OLLAMA_MODEL", "llama2")  # Free local model
+        # Routed like the cloud providers: pooled client, slot limit, circuit breaker
+        self.router = ProviderRouter([OllamaProvider(shared_client(), self.model)])
     
     def analyze_resume(self, resume_text, user_skills, target_role="Data Analyst"):
         """Analyze resume using free local LLM"""
-        try:
-            # Try using Ollama (free local LLM)
-            return self._analyze_with_ollama(resume_text, user_skills, target_role)
-        except:
-            # Fallback to our predefined analysis
+        if not self.router.available():
             return self._get_fallback_analysis(user_skills, target_role)
+        return self._analyze_with_ollama(resume_text, user_skills, target_role)
     
     def _analyze_with_ollama(self, resume_text, user_skills, target_role):
         """Use Ollama local LLM"""
@@ -26,21 +39,14 @@ class FreeCareerAnalyzer:
         Provide career advice in JSON format with skill gaps, career path, and learning recommendations.
         """
         
-        try:
-            response = requests.post(
-                'http://localhost:11434/api/generate',
-                json={
-                    'model': 'llama2',
-                    'prompt': prompt,
-                    'stream': False
-                }
-            )
-            if response.status_code == 200:
-                return json.loads(response.json()['response'])
-        except:
-            pass
-        
-        return self._get_fallback_analysis(user_skills, target_role)
+        fallback = self._get_fallback_analysis(user_skills, target_role)
+        target, text = self.router.generate(prompt, timeout=OLLAMA_TIMEOUT_SECONDS, schema=ANALYSIS_SCHEMA)
+        if target is None:
+            log.warning("ollama analysis failed, using fallback", model=self.model)
+            return fallback
+        # Repair and fill the reply from the fallback instead of trusting it blindly
+        analysis, _ = parse_structured(text, ANALYSIS_SCHEMA, fallback, target)
+        return analysis if analysis is not None else fallback
     
     def _get_fallback_analysis(self, user_skills, target_role):
         """Enhanced fallback analysis"""
@@ -0,0 +1,263 @@
+# llm/jobs.py
+"""
+Background job queue with a SQLite-backed job store.
+
+Work that is too slow for the request path (LLM enrichment of an analysis,
+trend reports) is submitted as a job: the caller gets a job id immediately,
+a worker thread runs the registered handler, and the result is written to the
+store, where any server worker process can read it. Clients poll
+GET /career/jobs/{id} or subscribe to GET /career/jobs/{id}/events (SSE).
+
+Jobs carry an optional dedup key: while a job with the same (kind, key) is
+queued or running, submitting again returns the existing id, and a finished
+result is served from the store until its TTL expires. The lookup and insert
+run in one write transaction, so concurrent submitters in any worker process
+share a single job. Jobs still queued or
+running when the process stopped are requeued on start.
+
+Configuration:
+  JOB_DB_PATH=data/jobs.sqlite3  JOB_WORKERS=4  JOB_RESULT_TTL_SECONDS=86400
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from llm.tracing import propagate
+    from llm.logger import get_logger
+except ImportError:
+    from tracing import propagate
+    from logger import get_logger
+
+log = get_logger(__name__)
+
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", "data/jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_RESULT_TTL_SECONDS = int(os.getenv("JOB_RESULT_TTL_SECONDS", str(24 * 3600)))
+# Finished jobs older than this are deleted on start
+JOB_RETENTION_SECONDS = 7 * 24 * 3600
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+ACTIVE = (QUEUED, RUNNING)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    payload TEXT,
+    result TEXT,
+    error TEXT,
+    worker INTEGER,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_kind_key ON jobs (kind, key, status);
+"""
+
+
+def _process_alive(pid):
+    if not pid or pid == os.getpid():
+        return False  # our own pid here means a previous process that had the same id
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass  # exists but belongs to someone else
+    return True
+
+
+class JobStore:
+    """Job rows in SQLite (WAL mode, so readers in other workers never block the writer)"""
+
+    def __init__(self, path=JOB_DB_PATH):
+        self.path = path
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.local = threading.local()
+        with self._connect() as db:
+            db.executescript(_SCHEMA)
+
+    def _connect(self):
+        """One connection per thread, reopened after a fork (connections must not cross processes)"""
+        db = getattr(self.local, "db", None)
+        if db is None or self.local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self.local.db, self.local.pid = db, os.getpid()
+        return db
+
+    def create(self, kind, key, payload):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._connect().execute(
+            "INSERT INTO jobs (id, kind, key, status, payload, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, kind, key, QUEUED, json.dumps(payload), now, now))
+        return job_id
+
+    def find_or_create(self, kind, key, payload):
+        """The job find() returns for (kind, key), else a new queued one; returns (job, created).
+        BEGIN IMMEDIATE takes the database write lock before the lookup, so two submitters
+        (threads or processes) cannot both miss and insert."""
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            job = self.find(kind, key)
+            job_id = self.create(kind, key, payload) if job is None else None
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return (job, False) if job_id is None else (self.get(job_id), True)
+
+    def get(self, job_id):
+        row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._as_dict(row)
+
+    def find(self, kind, key):
+        """Newest active job for (kind, key), else the newest unexpired finished one"""
+        row = self._connect().execute(
+            """SELECT * FROM jobs WHERE kind = ? AND key = ?
+               AND (status IN (?, ?) OR (status = ? AND expires_at > ?))
+               ORDER BY status = ? DESC, created_at DESC LIMIT 1""",
+            (kind, key, *ACTIVE, DONE, time.time(), DONE)).fetchone()
+        return self._as_dict(row)
+
+    def claim(self, job_id):
+        """Move a queued job to running; False if another worker got there first"""
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = ?, worker = ?, updated_at = ? WHERE id = ? AND status = ?",
+            (RUNNING, os.getpid(), time.time(), job_id, QUEUED))
+        return cursor.rowcount == 1
+
+    def progress(self, job_id, fraction, message=None):
+        self._connect().execute(
+            "UPDATE jobs SET progress = ?, message = ?, updated_at = ? WHERE id = ?",
+            (max(0.0, min(1.0, fraction)), message, time.time(), job_id))
+
+    def finish(self, job_id, result, ttl=JOB_RESULT_TTL_SECONDS):
+        now = time.time()
+        self._connect().execute(
+            "UPDATE jobs SET status = ?, progress = 1, result = ?, updated_at = ?, expires_at = ? WHERE id = ?",
+            (DONE, json.dumps(result, default=str), now, now + ttl, job_id))
+
+    def fail(self, job_id, error):
+        self._connect().execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+            (FAILED, error, time.time(), job_id))
+
+    def requeue_interrupted(self):
+        """Jobs left running by a process that no longer exists go back to queued
+        (siblings' running jobs are left alone); returns the queued jobs"""
+        db = self._connect()
+        for row in db.execute("SELECT id, worker FROM jobs WHERE status = ?", (RUNNING,)).fetchall():
+            if not _process_alive(row["worker"]):
+                db.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                           (QUEUED, time.time(), row["id"], RUNNING))
+        rows = db.execute("SELECT * FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,)).fetchall()
+        return [self._as_dict(row) for row in rows]
+
+    def prune(self, older_than=JOB_RETENTION_SECONDS):
+        self._connect().execute("DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                                (DONE, FAILED, time.time() - older_than))
+
+    def counts(self):
+        rows = self._connect().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    @staticmethod
+    def _as_dict(row):
+        if row is None:
+            return None
+        job = dict(row)
+        for field in ("payload", "result"):
+            if job[field] is not None:
+                job[field] = json.loads(job[field])
+        return job
+
+
+class JobQueue:
+    """Worker pool running registered handlers: handler(payload, report) -> JSON-able result,
+    where report(fraction, message=None) records progress"""
+
+    def __init__(self, store=None, workers=JOB_WORKERS):
+        self.store = store or JobStore()
+        self.workers = workers
+        self.handlers = {}
+        self.executor = None
+        self.pid = None
+        self.lock = threading.Lock()
+
+    def register(self, kind, handler):
+        self.handlers[kind] = handler
+
+    def _pool(self):
+        # Created on first use in each process: threads do not survive the fork from a preloading master
+        with self.lock:
+            if self.executor is None or self.pid != os.getpid():
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job-worker")
+                self.pid = os.getpid()
+            return self.executor
+
+    def submit(self, kind, payload, key=None, ttl=JOB_RESULT_TTL_SECONDS):
+        """Queue a job (or join an identical one); returns the job row"""
+        if kind not in self.handlers:
+            raise ValueError(f"no handler registered for job kind {kind!r}")
+        if key is None:
+            job, created = self.store.get(self.store.create(kind, key, payload)), True
+        else:
+            job, created = self.store.find_or_create(kind, key, payload)
+        if created:
+            # propagate() keeps the job's spans and logs under the submitting request's trace
+            self._pool().submit(propagate(self._run), job["id"], kind, payload, ttl)
+        return job
+
+    def resume(self):
+        """Requeue jobs interrupted by a restart (call once at startup)"""
+        self.store.prune()
+        pending = [job for job in self.store.requeue_interrupted() if job["kind"] in self.handlers]
+        for job in pending:
+            self._pool().submit(self._run, job["id"], job["kind"], job["payload"], JOB_RESULT_TTL_SECONDS)
+        if pending:
+            log.info("requeued interrupted jobs", jobs=len(pending))
+
+    def _run(self, job_id, kind, payload, ttl):
+        if not self.store.claim(job_id):
+            return
+        started = time.perf_counter()
+
+        def report(fraction, message=None):
+            self.store.progress(job_id, fraction, message)
+
+        try:
+            result = self.handlers[kind](payload, report)
+        except Exception as e:
+            log.exception("job failed", job_id=job_id, kind=kind)
+            self.store.fail(job_id, str(e)[:500])
+            return
+        self.store.finish(job_id, result, ttl)
+        log.sampled("job finished", job_id=job_id, kind=kind, seconds=round(time.perf_counter() - started, 3))
+
+    def status(self):
+        return {"workers": self.workers, "jobs": self.store.counts()}
+
+
+def public_view(job):
+    """The job fields returned to API clients"""
+    view = {key: job[key] for key in ("id", "kind", "status", "progress", "message", "created_at", "updated_at")}
+    if job["status"] == DONE:
+        view["result"] = job["result"]
+    elif job["status"] == FAILED:
+        view["error"] = job["error"]
+    return view
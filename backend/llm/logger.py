@@ -0,0 +1,150 @@
+# llm/logger.py
+"""
+Structured, leveled logging for the backend.
+
+    log = get_logger(__name__)
+    log.info("analysis served", source="semantic_cache", similarity=0.91)
+    log.sampled("request handled", route="/career/analyze-resume")   # 1-in-N on hot paths
+
+Records are put on an in-memory queue by a QueueHandler (a non-blocking append)
+and formatted/written by a single QueueListener thread, so request threads never
+wait on the stdout lock. Keyword arguments become structured fields; the current
+trace id (llm/tracing.py) is attached automatically.
+
+Environment:
+  LOG_LEVEL         DEBUG / INFO / WARNING / ERROR       (default INFO)
+  LOG_FORMAT        json or text                         (default text)
+  LOG_SAMPLE_RATE   fraction of sampled() records kept   (default 0.1)
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.1"))
+ROOT_LOGGER = "careercompass"
+
+_configure_lock = threading.Lock()
+_handler = None
+_listener = None
+_current_trace_id = None
+
+
+def _trace_id():
+    global _current_trace_id
+    if _current_trace_id is None:
+        try:
+            from llm.tracing import current_trace_id
+        except ImportError:
+            from tracing import current_trace_id
+        _current_trace_id = current_trace_id
+    return _current_trace_id()
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg and structured fields"""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable line with fields appended as key=value"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def format(self, record):
+        line = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+class _ContextQueueHandler(logging.handlers.QueueHandler):
+    """Captures the trace id on the request thread; formatting happens on the listener thread"""
+
+    def prepare(self, record):
+        trace_id = _trace_id()
+        if trace_id:
+            record.fields = dict(getattr(record, "fields", {}), trace_id=trace_id)
+        # Keep the record as-is (QueueHandler.prepare would format it here)
+        return record
+
+
+class StructuredLogger(logging.LoggerAdapter):
+    """Logger taking structured fields as keyword arguments"""
+
+    def process(self, msg, kwargs):
+        fields = {k: kwargs.pop(k) for k in list(kwargs) if k not in ("exc_info", "stack_info", "stacklevel", "extra")}
+        if fields:
+            extra = dict(kwargs.get("extra") or {})
+            extra["fields"] = fields
+            kwargs["extra"] = extra
+        return msg, kwargs
+
+    def sampled(self, msg, rate=None, level=logging.INFO, **fields):
+        """Log only a fraction of calls (LOG_SAMPLE_RATE by default) for high-frequency events"""
+        rate = LOG_SAMPLE_RATE if rate is None else rate
+        if self.isEnabledFor(level) and random.random() < rate:
+            self.log(level, msg, sample_rate=rate, **fields)
+
+
+def _start_listener(output):
+    """Fresh queue + listener thread feeding output; the queue handler is pointed at it"""
+    global _listener
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=False)
+    _listener.start()
+    _handler.queue = log_queue
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()  # drains queued records
+
+
+def configure_logging(level=LOG_LEVEL, fmt=LOG_FORMAT, stream=None):
+    """Install the queue handler on the package root logger (idempotent)"""
+    global _handler
+    with _configure_lock:
+        if _handler is not None:
+            return
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JSONFormatter() if fmt == "json" else TextFormatter())
+        _handler = _ContextQueueHandler(queue.SimpleQueue())
+        _start_listener(output)
+        atexit.register(_stop_listener)
+        # serve.py preloads the app and forks workers; threads do not survive fork
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=lambda: _start_listener(output))
+
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(level)
+        root.addHandler(_handler)
+        root.propagate = False
+
+
+def get_logger(name):
+    """Structured logger under the package root; module paths like 'llm.api' are shortened"""
+    configure_logging()
+    short = name.rsplit(".", 1)[-1]
+    return StructuredLogger(logging.getLogger(f"{ROOT_LOGGER}.{short}"), {})
+
@@ -0,0 +1,116 @@
+# llm/metrics.py
+"""
+In-process metrics with Prometheus text exposition (served at GET /metrics).
+
+Dependency-free counters and histograms, labelled like their Prometheus
+counterparts. Each worker process keeps its own registry, so with several
+workers scrape them individually (or aggregate in Prometheus with sum by()).
+"""
+import bisect
+import threading
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + (list(extra.items()) if extra else [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.series = {}  # key -> [bucket counts..., +Inf count, sum]
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for key, series in sorted(self.series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                    cumulative += count
+                    labels = _format_labels(self.labelnames, key, {"le": bound})
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                base = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{base} {series[-1]}")
+                lines.append(f"{self.name}_count{base} {cumulative}")
+        return lines
+
+
+REGISTRY = []
+
+
+def counter(name, documentation, labelnames=()):
+    metric = Counter(name, documentation, labelnames)
+    REGISTRY.append(metric)
+    return metric
+
+
+def histogram(name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+    metric = Histogram(name, documentation, labelnames, buckets)
+    REGISTRY.append(metric)
+    return metric
+
+
+def render_prometheus():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---- Metrics used across the backend ----
+
+LLM_CALLS = counter("llm_calls_total", "LLM calls by provider, model and outcome (ok/error/invalid)",
+                    ("provider", "model", "outcome"))
+LLM_LATENCY = histogram("llm_call_duration_seconds", "Wall time of LLM calls", ("provider", "model"))
+LLM_TTFT = histogram("llm_time_to_first_token_seconds", "Time to the first streamed chunk", ("provider", "model"))
+LLM_PROMPT_TOKENS = histogram("llm_prompt_tokens", "Prompt tokens per LLM call", ("provider", "model"), TOKEN_BUCKETS)
+LLM_COMPLETION_TOKENS = histogram("llm_completion_tokens", "Completion tokens per LLM call",
+                                  ("provider", "model"), TOKEN_BUCKETS)
+LLM_CACHED_TOKENS = counter("llm_cached_prompt_tokens_total", "Prompt tokens served from provider caches",
+                            ("provider", "model"))
+LLM_PARSE_OUTCOMES = counter("llm_parse_outcomes_total",
+                             "Parsed LLM replies by provider, model and outcome (clean/repaired/filled/failed)",
+                             ("provider", "model", "outcome"))
+ANALYSES = counter("career_analyses_total", "Resume analyses by how they were produced", ("source",))
+HTTP_LATENCY = histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route", "status"))
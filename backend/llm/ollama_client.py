@@ -0,0 +1,247 @@
+# llm/ollama_client.py
+"""
+Pooled, async client for a local Ollama server (on-prem deployments, no cloud API).
+
+One asyncio loop runs in a daemon thread per process and owns a keep-alive
+httpx.AsyncClient, so calls reuse a small pool of connections instead of
+opening one per request. Generation is streamed (NDJSON from /api/generate) in
+JSON-format mode, which gives time-to-first-token and token counts from the
+final chunk.
+
+Ollama decodes at most OLLAMA_NUM_PARALLEL requests per loaded model at once
+and queues the rest server-side. Requests are therefore micro-batched here:
+calls arriving within OLLAMA_BATCH_WINDOW_MS are collected, identical
+prompts are coalesced into one upstream generation, and at most
+OLLAMA_NUM_PARALLEL generations are in flight, so the slots fill together
+(one decode batch) and excess load waits here where the caller's timeout
+still applies.
+
+Each generation is bounded by the latest deadline among the callers waiting
+for it (read and total time), and is cancelled, freeing its slot, as soon as
+every one of those callers has timed out or gone away.
+
+Sync callers (ProviderRouter worker threads) use generate(); async code can
+await generate_async() from any loop.
+
+Configuration:
+  OLLAMA_HOST=http://localhost:11434  OLLAMA_MODEL=llama3.1  OLLAMA_NUM_PARALLEL=4
+  OLLAMA_KEEP_ALIVE=30m  OLLAMA_BATCH_WINDOW_MS=5
+"""
+import asyncio
+import concurrent.futures
+import json
+import os
+import threading
+import time
+
+import httpx
+
+try:
+    from llm.logger import get_logger
+except ImportError:
+    from logger import get_logger
+
+log = get_logger(__name__)
+
+OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL")
+# Match the server's own OLLAMA_NUM_PARALLEL so requests beyond its slots wait client-side
+OLLAMA_NUM_PARALLEL = int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_BATCH_WINDOW_MS = float(os.getenv("OLLAMA_BATCH_WINDOW_MS", "5"))
+CONNECT_TIMEOUT_SECONDS = 5
+MAX_OUTPUT_TOKENS = 2000
+
+
+def _base_url(host):
+    """OLLAMA_HOST may be given as host:port, like the Ollama CLI accepts"""
+    return host if host.startswith(("http://", "https://")) else f"http://{host}"
+
+
+class OllamaError(Exception):
+    pass
+
+
+class OllamaClient:
+    def __init__(self, host=OLLAMA_HOST, num_parallel=OLLAMA_NUM_PARALLEL,
+                 batch_window_ms=OLLAMA_BATCH_WINDOW_MS, keep_alive=OLLAMA_KEEP_ALIVE):
+        self.base_url = _base_url(host)
+        self.num_parallel = max(1, num_parallel)
+        self.batch_window = batch_window_ms / 1000
+        self.keep_alive = keep_alive
+        self.stats = {"requests": 0, "generations": 0, "coalesced": 0, "batches": 0, "abandoned": 0}
+        self._loop = None
+        self._client = None
+        self._queue = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    # ---- event loop thread (started lazily, so forked workers each get their own) ----
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is not None:
+                return self._loop
+            ready = threading.Event()
+
+            def run():
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+                self._client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    timeout=httpx.Timeout(None, connect=CONNECT_TIMEOUT_SECONDS),
+                    limits=httpx.Limits(max_connections=self.num_parallel,
+                                        max_keepalive_connections=self.num_parallel))
+                self._queue = asyncio.Queue()
+                self._slots = asyncio.Semaphore(self.num_parallel)
+                loop.create_task(self._dispatch())
+                self._loop = loop
+                ready.set()
+                loop.run_forever()
+
+            threading.Thread(target=run, name="ollama-client", daemon=True).start()
+            ready.wait()
+            return self._loop
+
+    # ---- public API ----
+
+    def generate(self, model, prompt, timeout, system=None, format="json"):
+        """Blocking call for worker threads; returns the same dict as generate_async"""
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._submit(model, prompt, system, format, timeout), loop)
+        try:
+            return future.result(timeout + CONNECT_TIMEOUT_SECONDS)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    async def generate_async(self, model, prompt, timeout, system=None, format="json"):
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._submit(model, prompt, system, format, timeout), loop)
+        return await asyncio.wrap_future(future)
+
+    def status(self):
+        return dict(self.stats, host=self.base_url, num_parallel=self.num_parallel,
+                    queued=self._queue.qsize() if self._queue is not None else 0)
+
+    # ---- batching ----
+
+    async def _submit(self, model, prompt, system, format, timeout):
+        loop = asyncio.get_running_loop()
+        result = loop.create_future()
+        key = json.dumps([model, prompt, system, format], sort_keys=True)
+        await self._queue.put((key, (model, prompt, system, format), result, loop.time() + timeout))
+        self.stats["requests"] += 1
+        # Each caller waits on its own future: a timeout cancels only that caller's wait,
+        # not a generation shared with coalesced callers
+        return await asyncio.wait_for(result, timeout)
+
+    async def _dispatch(self):
+        """Collect requests for one batch window, coalesce duplicates, launch up to the slot count"""
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.num_parallel:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            groups = {}
+            for key, request, result, deadline in batch:
+                if not result.done():  # skip callers that already timed out in the queue
+                    groups.setdefault(key, (request, [], []))[1].append(result)
+                    groups[key][2].append(deadline)
+            self.stats["batches"] += 1
+            self.stats["coalesced"] += len(batch) - len(groups)
+            log.debug("ollama batch", requests=len(batch), generations=len(groups))
+            for request, waiters, deadlines in groups.values():
+                # Taking the slot here keeps dispatch in step with the server's parallel slots
+                await self._slots.acquire()
+                if all(waiter.done() for waiter in waiters):
+                    self._slots.release()  # everyone gave up while waiting for a slot
+                    continue
+                asyncio.get_running_loop().create_task(self._run(request, waiters, max(deadlines)))
+
+    async def _run(self, request, waiters, deadline):
+        loop = asyncio.get_running_loop()
+        stream = loop.create_task(self._stream(*request, max(deadline - loop.time(), 0.1)))
+
+        def abandon(_):
+            # Cancel once: a second cancel would interrupt httpx's connection cleanup
+            if not stream.done() and not stream.cancelling() and all(waiter.done() for waiter in waiters):
+                stream.cancel()
+
+        for waiter in waiters:
+            waiter.add_done_callback(abandon)
+        try:
+            self.stats["generations"] += 1
+            outcome = await stream
+        except asyncio.CancelledError:
+            # Every waiter timed out or was cancelled: the generation was dropped to free the slot
+            self.stats["abandoned"] += 1
+            outcome = OllamaError("generation abandoned by all callers")
+        except Exception as e:
+            outcome = e
+        finally:
+            self._slots.release()
+        for waiter in waiters:
+            if waiter.done():
+                continue
+            if isinstance(outcome, Exception):
+                waiter.set_exception(outcome)
+            else:
+                waiter.set_result(outcome)
+
+    async def _stream(self, model, prompt, system, format, timeout):
+        body = {
+            "model": model,
+            "prompt": prompt,
+            "stream": True,
+            "format": format,
+            "keep_alive": self.keep_alive,
+            "options": {"temperature": 0.7, "num_predict": MAX_OUTPUT_TOKENS},
+        }
+        if system:
+            # Ollama reuses the KV cache for an unchanged system prompt between calls
+            body["system"] = system
+        start = time.perf_counter()
+        parts, ttft, final = [], None, {}
+        read_timeout = httpx.Timeout(timeout, connect=CONNECT_TIMEOUT_SECONDS)
+        async with self._client.stream("POST", "/api/generate", json=body, timeout=read_timeout) as response:
+            if response.status_code != 200:
+                detail = (await response.aread()).decode("utf-8", "replace")[:200]
+                raise OllamaError(f"ollama returned {response.status_code}: {detail}")
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise OllamaError(chunk["error"])
+                if chunk.get("response"):
+                    if ttft is None:
+                        ttft = time.perf_counter() - start
+                    parts.append(chunk["response"])
+                if chunk.get("done"):
+                    final = chunk
+        return {
+            "text": "".join(parts),
+            "prompt_tokens": final.get("prompt_eval_count"),
+            "completion_tokens": final.get("eval_count"),
+            "ttft": ttft,
+        }
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_client():
+    """Process-wide client, so every caller shares one connection pool and one slot limit"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = OllamaClient()
+        return _shared
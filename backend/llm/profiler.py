@@ -0,0 +1,155 @@
+# llm/profiler.py
+"""
+On-demand sampling profiler producing flamegraph-compatible collapsed stacks.
+
+A background thread snapshots the stacks of the profiled threads every
+interval and counts identical stacks; the output is one line per stack,
+"frame;frame;frame count", which flamegraph.pl, speedscope and inferno read
+directly. Nothing runs unless a session is started, so the normal request path
+pays only for a dictionary lookup in the middleware.
+
+Used by the admin endpoints in server.py:
+  - whole-process sessions for N seconds or N requests
+  - per-request profiles, sampling the threads that work for that request: the
+    event loop thread plus every thread that opens a span or runs a propagate()d
+    call under the request's trace (llm/tracing.py). A thread joins when it first
+    does so, and pooled threads stay in the set after moving on to other work.
+"""
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+
+DEFAULT_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+MAX_STACK_DEPTH = 128
+RECENT_PROFILES = 32
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """Samples the given thread ids (all threads when None) until stop(). The set is read on
+    every sample, so threads added to it while sampling are picked up."""
+
+    def __init__(self, thread_ids=None, interval_ms=DEFAULT_INTERVAL_MS):
+        self.thread_ids = thread_ids
+        self.interval = max(interval_ms, 0.5) / 1000
+        self.counts = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self.started_at
+        return self
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, f"thread-{thread_id}"))
+                self.counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+            if self._stop.wait(self.interval):
+                break
+
+    def collapsed(self):
+        """Collapsed-stack text, heaviest stacks first"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+
+class ProfileSession:
+    """A whole-process session ending after max_seconds or max_requests, whichever comes first"""
+
+    def __init__(self, max_seconds, max_requests=None, interval_ms=DEFAULT_INTERVAL_MS):
+        self.max_seconds = max_seconds
+        self.max_requests = max_requests
+        self.requests = 0
+        self.done = threading.Event()
+        self.profiler = SamplingProfiler(interval_ms=interval_ms).start()
+
+    def request_finished(self):
+        self.requests += 1
+        if self.max_requests and self.requests >= self.max_requests:
+            self.done.set()
+
+    def finish(self):
+        self.done.set()
+        self.profiler.stop()
+        return self.profiler.collapsed()
+
+
+class ProfileManager:
+    """At most one whole-process session at a time, plus a ring of recent per-request profiles"""
+
+    def __init__(self):
+        self.session = None
+        self.recent = OrderedDict()
+        self.lock = threading.Lock()
+
+    def start_session(self, max_seconds, max_requests=None, interval_ms=DEFAULT_INTERVAL_MS):
+        with self.lock:
+            if self.session is not None:
+                return None
+            self.session = ProfileSession(max_seconds, max_requests, interval_ms)
+            return self.session
+
+    def end_session(self, session):
+        with self.lock:
+            if self.session is session:
+                self.session = None
+        return session.finish()
+
+    def request_finished(self):
+        session = self.session
+        if session is not None:
+            session.request_finished()
+
+    def profile_request(self, trace=None, interval_ms=DEFAULT_INTERVAL_MS):
+        """Start sampling the request's threads (trace.threads, which grows as work moves to other
+        threads; just the calling thread without a trace). Returns the profiler to stop at the
+        end of the request."""
+        threads = trace.threads if trace is not None else {threading.get_ident()}
+        return SamplingProfiler(threads, interval_ms).start()
+
+    def store(self, profiler, label):
+        """Keep a finished per-request profile; returns its id. Metadata is kept apart from the
+        collapsed text, which must contain only "stack count" lines."""
+        profile_id = uuid.uuid4().hex[:12]
+        meta = {"label": label, "samples": profiler.samples, "elapsed_ms": round(profiler.elapsed * 1000, 1)}
+        with self.lock:
+            self.recent[profile_id] = (profiler.collapsed(), meta)
+            while len(self.recent) > RECENT_PROFILES:
+                self.recent.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id):
+        """(collapsed text, metadata) or None"""
+        with self.lock:
+            return self.recent.get(profile_id)
+
+
+profiles = ProfileManager()
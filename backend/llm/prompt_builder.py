@@ -0,0 +1,124 @@
+# llm/prompt_builder.py
+"""
+Shared, token-budgeted prompt assembly.
+
+Instead of hard-truncating the resume to 2000 characters and pasting
+indented JSON into every prompt, builders:
+  - estimate tokens (tiktoken when installed, ~4 chars/token otherwise)
+  - split the resume into sections, rank them by relevance to the user's
+    skills and target role, and keep the best ones that fit the budget
+  - emit context as compact, non-indented JSON
+"""
+import json
+import math
+import os
+import re
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+# Per-request budgets (tokens) for the variable parts of the prompts
+RESUME_TOKEN_BUDGET = int(os.getenv("PROMPT_RESUME_TOKENS", "450"))
+CONTEXT_TOKEN_BUDGET = int(os.getenv("PROMPT_CONTEXT_TOKENS", "350"))
+
+# Section headings commonly found in resumes, with a base relevance weight
+SECTION_WEIGHTS = {
+    "summary": 2.0, "profile": 2.0, "objective": 1.0,
+    "skills": 3.0, "technical skills": 3.0,
+    "experience": 2.5, "work experience": 2.5, "employment": 2.5,
+    "projects": 2.0, "certifications": 1.5, "education": 1.0,
+    "awards": 0.5, "interests": 0.2, "references": 0.0,
+}
+_HEADING = re.compile(r"^\s*([A-Za-z][A-Za-z &/]{2,40}?)\s*:?\s*$")
+_WHITESPACE = re.compile(r"[ \t]+")
+
+
+def estimate_tokens(text):
+    """Token count of text (exact with tiktoken, otherwise a chars/4 estimate)"""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def compact_json(obj):
+    """JSON without indentation or spaces after separators"""
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def truncate_to_tokens(text, budget):
+    """Cut text to roughly budget tokens, preferring a sentence or line boundary"""
+    if estimate_tokens(text) <= budget:
+        return text
+    cut = text[:max(budget, 0) * 4]
+    boundary = max(cut.rfind(". "), cut.rfind("\n"))
+    if boundary > len(cut) // 2:
+        cut = cut[:boundary + 1]
+    return cut.rstrip()
+
+
+def split_sections(resume_text):
+    """Split a resume into (heading, body) sections; text before the first heading is 'summary'"""
+    sections = []
+    heading, lines = "summary", []
+    for line in resume_text.splitlines():
+        match = _HEADING.match(line)
+        if match and match.group(1).strip().lower() in SECTION_WEIGHTS:
+            if any(l.strip() for l in lines):
+                sections.append((heading, "\n".join(lines).strip()))
+            heading, lines = match.group(1).strip().lower(), []
+        else:
+            lines.append(_WHITESPACE.sub(" ", line).strip())
+    if any(l.strip() for l in lines):
+        sections.append((heading, "\n".join(l for l in lines if l)))
+    return sections
+
+
+def _section_score(heading, body, keywords):
+    """Base weight by heading, boosted by keyword hits per 100 tokens"""
+    body_lower = body.lower()
+    hits = sum(1 for k in keywords if k and k in body_lower)
+    density = hits / max(estimate_tokens(body) / 100, 1)
+    return SECTION_WEIGHTS.get(heading, 1.0) + density
+
+
+def fit_resume(resume_text, keywords=(), budget=RESUME_TOKEN_BUDGET):
+    """Keep the most relevant resume sections within budget tokens, in their original order"""
+    resume_text = resume_text or ""
+    if estimate_tokens(resume_text) <= budget:
+        return resume_text.strip()
+    keywords = [k.lower() for k in keywords if k]
+    sections = split_sections(resume_text)
+    ranked = sorted(range(len(sections)), key=lambda i: -_section_score(*sections[i], keywords))
+
+    kept, remaining = {}, budget
+    for i in ranked:
+        heading, body = sections[i]
+        block = body if heading == "summary" and i == 0 else f"{heading.upper()}:\n{body}"
+        cost = estimate_tokens(block)
+        if cost <= remaining:
+            kept[i] = block
+            remaining -= cost
+        elif remaining > 40:
+            # Partially include the best section that does not fit whole
+            kept[i] = truncate_to_tokens(block, remaining)
+            remaining = 0
+        if remaining <= 0:
+            break
+    return "\n".join(kept[i] for i in sorted(kept))
+
+
+def fit_records(records, budget=CONTEXT_TOKEN_BUDGET):
+    """Longest prefix of records whose compact JSON fits budget tokens"""
+    kept, used = [], 2  # brackets
+    for record in records:
+        cost = estimate_tokens(compact_json(record)) + 1
+        if used + cost > budget:
+            break
+        kept.append(record)
+        used += cost
+    return kept
@@ -0,0 +1,549 @@
+# llm/provider_router.py
+"""
+Latency-aware routing across LLM providers/models with hedged requests.
+
+Every (provider, model) pair keeps a rolling window of call latencies and
+outcomes. Calls go to the healthiest, fastest target first; if it has not
+answered after the hedge delay, a duplicate request is sent to the next
+target and whichever returns valid output first wins. Targets that often
+fail or answer with unusable output are demoted for a cooldown period and
+re-promoted with a clean window once it expires.
+
+Each target also sits behind a circuit breaker: after repeated consecutive
+transport failures (exceptions, timeouts) it opens and the target is skipped entirely, so a provider outage
+fails fast instead of burning the full timeout. After a cool-off one half-open
+probe is let through; success closes the circuit, failure re-opens it with a
+longer cool-off. A reply that arrives but fails validation ("invalid") proves
+the target is reachable, so it counts as a breaker success; invalid replies
+are tracked apart from errors and only lower the target's rank and, when
+frequent, demote it. Per-call timeouts adapt to the target's observed p95.
+
+Providers stream their replies and return a Completion carrying token usage
+and time-to-first-token; every call is recorded in llm/metrics.py.
+
+OllamaProvider serves a local model (on-prem, no cloud API) through the pooled,
+slot-limited client in llm/ollama_client.py.
+
+Endpoints can be pointed at local stub servers for testing:
+  GEMINI_API_ENDPOINT=http://localhost:9100   OPENAI_BASE_URL=http://localhost:9100/v1   OLLAMA_HOST=http://localhost:9100
+(benchmarks/mock_llm_server.py serves all three wire formats)
+"""
+import datetime
+import hashlib
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+try:
+    from llm import metrics
+    from llm.prompt_builder import estimate_tokens
+    from llm.structured_output import has_required_sections, parse_json_text, to_gemini_schema
+    from llm.tracing import propagate, span
+    from llm.logger import get_logger
+except ImportError:
+    import metrics
+    from prompt_builder import estimate_tokens
+    from structured_output import has_required_sections, parse_json_text, to_gemini_schema
+    from tracing import propagate, span
+    from logger import get_logger
+
+log = get_logger(__name__)
+
+STATS_WINDOW = 50
+MIN_SAMPLES = 5
+# Demote when errors plus invalid replies reach this share of the window
+DEMOTE_ERROR_RATE = 0.5
+DEMOTE_COOLDOWN_SECONDS = 60
+DEFAULT_HEDGE_AFTER_SECONDS = float(os.getenv("LLM_HEDGE_AFTER_SECONDS", "8"))
+DEFAULT_TIMEOUT_SECONDS = 60
+# Router worker threads. Every request thread (Starlette's threadpool, 40 by default) can have
+# max_parallel calls in flight, so the default covers that many; LLM_ROUTER_WORKERS overrides.
+REQUEST_THREADS = int(os.getenv("REQUEST_THREADS", "40"))
+ROUTER_WORKERS = int(os.getenv("LLM_ROUTER_WORKERS", "0"))
+
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_RESET_SECONDS = 30
+BREAKER_MAX_RESET_SECONDS = 300
+# Adaptive timeout = p95 * multiplier, clamped; the fixed default is used until enough samples exist
+TIMEOUT_P95_MULTIPLIER = 2.5
+MIN_TIMEOUT_SECONDS = 5
+
+# Gemini explicit context caching rejects short contents; below this the prefix is
+# sent as a plain system instruction
+GEMINI_CACHE_MIN_TOKENS = int(os.getenv("GEMINI_CACHE_MIN_TOKENS", "1024"))
+GEMINI_CACHE_TTL_SECONDS = 3600
+
+
+def looks_like_json(text, schema=None):
+    """Accept a non-empty JSON object after local repair (no need to re-query for it); with a
+    schema it must also carry most of the required sections. Bare arrays, scalars and {} are
+    invalid so the next target is tried."""
+    data = parse_json_text(text)[0]
+    if schema is not None:
+        return has_required_sections(data, schema)
+    return isinstance(data, dict) and bool(data)
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class ProviderStats:
+    """Rolling latency/outcome window for one provider+model"""
+
+    def __init__(self, window=STATS_WINDOW):
+        self.window = window
+        self.calls = deque(maxlen=window)  # (latency_seconds, outcome: ok/invalid/error)
+        self.demoted_until = 0.0
+        self.lock = threading.Lock()
+
+    def record(self, latency, outcome):
+        with self.lock:
+            self.calls.append((latency, outcome))
+
+    def latencies(self):
+        """Latencies of calls that got a reply (valid or not); errors and timeouts are excluded"""
+        with self.lock:
+            return [latency for latency, outcome in self.calls if outcome != "error"]
+
+    def _rate(self, outcome):
+        with self.lock:
+            if not self.calls:
+                return 0.0
+            return sum(1 for _, o in self.calls if o == outcome) / len(self.calls)
+
+    @property
+    def p50(self):
+        return _percentile(self.latencies(), 0.5)
+
+    @property
+    def p95(self):
+        return _percentile(self.latencies(), 0.95)
+
+    @property
+    def error_rate(self):
+        return self._rate("error")
+
+    @property
+    def invalid_rate(self):
+        return self._rate("invalid")
+
+    @property
+    def samples(self):
+        return len(self.calls)
+
+    def reset(self):
+        with self.lock:
+            self.calls.clear()
+
+    def snapshot(self):
+        return {
+            "p50_seconds": self.p50,
+            "p95_seconds": self.p95,
+            "error_rate": round(self.error_rate, 3),
+            "invalid_rate": round(self.invalid_rate, 3),
+            "samples": self.samples,
+            "demoted": self.demoted_until > time.time(),
+        }
+
+
+class CircuitBreaker:
+    """closed -> open after consecutive failures -> half_open probe -> closed/open"""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_seconds=BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.base_reset_seconds = reset_seconds
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """May a call go through now? Claims the half-open probe slot if it is free."""
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.time() - self.opened_at >= self.reset_seconds:
+                self.state = self.HALF_OPEN
+                self.probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+            return False
+
+    def would_allow(self):
+        """Like allow() but without claiming the probe slot"""
+        with self.lock:
+            if self.state == self.OPEN:
+                return time.time() - self.opened_at >= self.reset_seconds
+            return self.state == self.CLOSED or not self.probe_in_flight
+
+    def record_success(self):
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.probe_in_flight = False
+            self.reset_seconds = self.base_reset_seconds
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN:
+                # Failed probe: back off before the next one
+                self.reset_seconds = min(self.reset_seconds * 2, BREAKER_MAX_RESET_SECONDS)
+                self._open()
+            elif self.state == self.CLOSED and self.failures >= self.failure_threshold:
+                self._open()
+
+    def release(self):
+        """Give back a claimed probe slot whose call never ran"""
+        with self.lock:
+            self.probe_in_flight = False
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.time()
+        self.probe_in_flight = False
+
+    def snapshot(self):
+        with self.lock:
+            return {"state": self.state, "consecutive_failures": self.failures}
+
+
+class Completion:
+    """A provider reply with usage; token counts are None when the API did not report them"""
+
+    def __init__(self, text, prompt_tokens=None, completion_tokens=None, cached_tokens=0, ttft=None):
+        self.text = text
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.cached_tokens = cached_tokens or 0
+        self.ttft = ttft
+
+
+class GeminiProvider:
+    """Gemini model. A static prompt prefix becomes the system instruction, served from
+    explicit context caching when it is long enough for the API to accept it."""
+
+    provider = "gemini"
+
+    def __init__(self, genai, model_path):
+        self.genai = genai
+        self.model = model_path
+        self.client = genai.GenerativeModel(model_path)
+        self.prefixed = {}  # prefix hash -> (model, created_at)
+        self.lock = threading.Lock()
+
+    def _prefixed_model(self, prefix):
+        key = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        with self.lock:
+            entry = self.prefixed.get(key)
+            if entry and time.time() - entry[1] < GEMINI_CACHE_TTL_SECONDS:
+                return entry[0]
+            model = None
+            if estimate_tokens(prefix) >= GEMINI_CACHE_MIN_TOKENS:
+                try:
+                    cached = self.genai.caching.CachedContent.create(
+                        model=self.model, system_instruction=prefix,
+                        ttl=datetime.timedelta(seconds=GEMINI_CACHE_TTL_SECONDS))
+                    model = self.genai.GenerativeModel.from_cached_content(cached_content=cached)
+                except Exception as e:
+                    log.warning("gemini context cache unavailable", model=self.model, error=str(e)[:100])
+            if model is None:
+                # Below the caching minimum: still a stable system instruction, sent per call
+                model = self.genai.GenerativeModel(self.model, system_instruction=prefix)
+            self.prefixed[key] = (model, time.time())
+            return model
+
+    def generate(self, prompt, timeout, schema=None, prefix=None):
+        generation_config = None
+        if schema is not None:
+            generation_config = {"response_mime_type": "application/json",
+                                 "response_schema": to_gemini_schema(schema)}
+        client = self._prefixed_model(prefix) if prefix else self.client
+        start = time.perf_counter()
+        response = client.generate_content(prompt, generation_config=generation_config,
+                                           request_options={"timeout": timeout}, stream=True)
+        parts, ttft = [], None
+        for chunk in response:
+            if ttft is None:
+                ttft = time.perf_counter() - start
+            try:
+                parts.append(chunk.text)
+            except ValueError:
+                pass  # chunk without text parts (e.g. finish metadata)
+        usage = getattr(response, "usage_metadata", None)
+        return Completion("".join(parts),
+                          prompt_tokens=getattr(usage, "prompt_token_count", None),
+                          completion_tokens=getattr(usage, "candidates_token_count", None),
+                          cached_tokens=getattr(usage, "cached_content_token_count", 0),
+                          ttft=ttft)
+
+
+class OpenAIProvider:
+    """OpenAI chat model. The static prefix goes first as the system message so the
+    API's automatic prompt caching (identical prefixes >= 1024 tokens) applies."""
+
+    provider = "openai"
+
+    def __init__(self, client, model):
+        self.model = model
+        self.client = client
+
+    def generate(self, prompt, timeout, schema=None, prefix=None):
+        extra = {}
+        if schema is not None:
+            # JSON mode; the prompt itself carries the expected shape
+            extra["response_format"] = {"type": "json_object"}
+        messages = [{"role": "user", "content": prompt}]
+        if prefix:
+            messages.insert(0, {"role": "system", "content": prefix})
+        start = time.perf_counter()
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=0.7,
+            max_tokens=2000,
+            timeout=timeout,
+            stream=True,
+            stream_options={"include_usage": True},
+            **extra,
+        )
+        parts, ttft, usage = [], None, None
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                parts.append(chunk.choices[0].delta.content)
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+        details = getattr(usage, "prompt_tokens_details", None)
+        return Completion("".join(parts),
+                          prompt_tokens=getattr(usage, "prompt_tokens", None),
+                          completion_tokens=getattr(usage, "completion_tokens", None),
+                          cached_tokens=getattr(details, "cached_tokens", 0),
+                          ttft=ttft)
+
+
+class OllamaProvider:
+    """Local Ollama model in JSON-format mode (a schema is passed as Ollama's structured
+    output format). The static prefix is the system prompt, whose KV cache Ollama reuses."""
+
+    provider = "ollama"
+
+    def __init__(self, client, model):
+        self.client = client
+        self.model = model
+        # Worker threads the router should keep for this target: one per server slot
+        self.concurrency = client.num_parallel
+
+    def generate(self, prompt, timeout, schema=None, prefix=None):
+        reply = self.client.generate(self.model, prompt, timeout, system=prefix,
+                                     format=schema if schema is not None else "json")
+        return Completion(reply["text"], prompt_tokens=reply["prompt_tokens"],
+                          completion_tokens=reply["completion_tokens"], ttft=reply["ttft"])
+
+
+class _Deadline:
+    """Time budget of one generate() call. It starts running when the first call gets a worker,
+    so time spent queued behind other requests in the executor is not charged to it."""
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.started = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.started is None:
+                self.started = time.monotonic()
+
+    def remaining(self):
+        if self.started is None:
+            return self.timeout
+        return self.started + self.timeout - time.monotonic()
+
+
+class ProviderRouter:
+    """Routes prompts to the best available target, hedging slow calls"""
+
+    def __init__(self, targets, hedge_after=DEFAULT_HEDGE_AFTER_SECONDS, max_parallel=2):
+        self.targets = list(targets)
+        self.stats = {self.key(t): ProviderStats() for t in self.targets}
+        self.breakers = {self.key(t): CircuitBreaker() for t in self.targets}
+        self.hedge_after = hedge_after
+        self.max_parallel = max_parallel
+        workers = ROUTER_WORKERS or max(REQUEST_THREADS * max_parallel,
+                                        sum(getattr(t, "concurrency", 0) for t in self.targets))
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-router")
+
+    @staticmethod
+    def key(target):
+        return f"{target.provider}:{target.model}"
+
+    def _score(self, target):
+        """Lower is better: p50 latency inflated by the error and invalid-reply rates. Unknown targets
+        keep list order."""
+        stats = self.stats[self.key(target)]
+        if stats.samples < MIN_SAMPLES:
+            return 0.0
+        return (stats.p50 or DEFAULT_TIMEOUT_SECONDS) * (1 + 4 * (stats.error_rate + stats.invalid_rate))
+
+    def ranked(self):
+        """Healthy targets by score, then demoted ones (re-promoted once their cooldown ends)"""
+        now = time.time()
+        healthy, demoted = [], []
+        for target in self.targets:
+            stats = self.stats[self.key(target)]
+            if stats.demoted_until and stats.demoted_until <= now:
+                stats.demoted_until = 0.0
+                stats.reset()
+                log.info("re-promoting target", target=self.key(target))
+            (demoted if stats.demoted_until else healthy).append(target)
+        healthy.sort(key=self._score)  # stable: ties keep configured priority
+        demoted.sort(key=lambda t: self.stats[self.key(t)].demoted_until)
+        return healthy + demoted
+
+    def _hedge_delay(self, target):
+        p95 = self.stats[self.key(target)].p95
+        if p95 is None:
+            return self.hedge_after
+        return min(self.hedge_after, p95)
+
+    def timeout_for(self, target):
+        """Per-call timeout derived from the target's observed p95 latency"""
+        stats = self.stats[self.key(target)]
+        if stats.samples < MIN_SAMPLES or stats.p95 is None:
+            return DEFAULT_TIMEOUT_SECONDS
+        return max(MIN_TIMEOUT_SECONDS, min(DEFAULT_TIMEOUT_SECONDS, stats.p95 * TIMEOUT_P95_MULTIPLIER))
+
+    def available(self):
+        """False when every target's circuit is open (callers should fall back immediately)"""
+        return any(b.would_allow() for b in self.breakers.values())
+
+    def _record(self, target, latency, outcome):
+        """Update the stats window and breaker. Only transport errors count against the breaker:
+        an invalid reply came back from a reachable target, so retrying it is not futile."""
+        stats = self.stats[self.key(target)]
+        stats.record(latency, outcome)
+        breaker = self.breakers[self.key(target)]
+        if outcome == "error":
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        if (not stats.demoted_until and stats.samples >= MIN_SAMPLES
+                and stats.error_rate + stats.invalid_rate >= DEMOTE_ERROR_RATE):
+            stats.demoted_until = time.time() + DEMOTE_COOLDOWN_SECONDS
+            log.warning("demoting target", target=self.key(target), error_rate=round(stats.error_rate, 3),
+                        invalid_rate=round(stats.invalid_rate, 3))
+
+    def _call(self, target, prompt, deadline, validate, schema, prefix):
+        deadline.start()
+        timeout = min(self.timeout_for(target), max(deadline.remaining(), 0.1))
+        start = time.perf_counter()
+        completion, outcome = None, "error"
+        with span("llm_call", target=self.key(target), timeout=round(timeout, 2)) as call_span:
+            try:
+                result = target.generate(prompt, timeout, schema, prefix)
+                completion = result if isinstance(result, Completion) else Completion(result)
+                text = completion.text
+                ok = bool(text) and (validate is None or validate(text, schema))
+                outcome = "ok" if ok else "invalid"
+            except Exception as e:
+                log.warning("LLM call failed", target=self.key(target), error=str(e)[:100])
+                text, ok = None, False
+            if call_span:
+                call_span.set(outcome=outcome)
+        latency = time.perf_counter() - start
+        self._record(target, latency, outcome)
+        self._observe(target, prompt, prefix, completion, latency, outcome)
+        return target, text if ok else None
+
+    @staticmethod
+    def _observe(target, prompt, prefix, completion, latency, outcome):
+        """Export one call's latency and token usage (estimated when the API reports none)"""
+        labels = {"provider": target.provider, "model": target.model}
+        metrics.LLM_CALLS.inc(outcome=outcome, **labels)
+        metrics.LLM_LATENCY.observe(latency, **labels)
+        if completion is None:
+            return
+        metrics.LLM_TTFT.observe(completion.ttft if completion.ttft is not None else latency, **labels)
+        prompt_tokens = completion.prompt_tokens
+        if prompt_tokens is None:
+            prompt_tokens = estimate_tokens(prompt) + estimate_tokens(prefix)
+        completion_tokens = completion.completion_tokens
+        if completion_tokens is None:
+            completion_tokens = estimate_tokens(completion.text)
+        metrics.LLM_PROMPT_TOKENS.observe(prompt_tokens, **labels)
+        metrics.LLM_COMPLETION_TOKENS.observe(completion_tokens, **labels)
+        if completion.cached_tokens:
+            metrics.LLM_CACHED_TOKENS.inc(completion.cached_tokens, **labels)
+
+    def generate(self, prompt, timeout=DEFAULT_TIMEOUT_SECONDS, validate=looks_like_json, schema=None, prefix=None):
+        """Return (target, text) from the first target producing valid output, or (None, None).
+        With a schema, targets use their native structured-output mode; prefix is a static
+        instruction block each target may cache provider-side. validate(text, schema) decides
+        whether a reply is usable."""
+        queue = self.ranked()
+        pending = set()
+        deadline = _Deadline(timeout)
+        try:
+            return self._race(queue, pending, deadline, prompt, validate, schema, prefix)
+        finally:
+            # Calls still queued for a worker are dropped; running ones end at their own timeout
+            for future in pending:
+                if future.cancel():
+                    self.breakers[self.key(future.target)].release()
+
+    def _race(self, queue, pending, deadline, prompt, validate, schema, prefix):
+        while queue or pending:
+            if queue and len(pending) < self.max_parallel:
+                target = queue.pop(0)
+                if not self.breakers[self.key(target)].allow():
+                    continue
+                # propagate() keeps the call's span under the caller's request trace; the call's
+                # timeout is taken from the deadline when it starts running
+                future = self.executor.submit(propagate(self._call), target, prompt, deadline,
+                                              validate, schema, prefix)
+                future.target = target
+                pending.add(future)
+                # If this call outlives its usual p95 (capped by hedge_after), hedge to the next target
+                wait_for = self._hedge_delay(target) if queue else None
+            else:
+                wait_for = None
+            remaining = deadline.remaining()
+            if remaining <= 0:
+                break
+            wait_for = remaining if wait_for is None else min(wait_for, remaining)
+            done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            pending.difference_update(done)
+            for future in done:
+                target, text = future.result()
+                if text is not None:
+                    return target, text
+        return None, None
+
+    def circuit_state(self):
+        """Overall state: closed if any target is closed, open if all are open, else half_open"""
+        states = [b.snapshot()["state"] for b in self.breakers.values()]
+        if CircuitBreaker.CLOSED in states:
+            return CircuitBreaker.CLOSED
+        return CircuitBreaker.HALF_OPEN if self.available() else CircuitBreaker.OPEN
+
+    def status(self):
+        status = {}
+        for t in self.targets:
+            key = self.key(t)
+            status[key] = dict(self.stats[key].snapshot(), circuit=self.breakers[key].snapshot(),
+                               timeout_seconds=round(self.timeout_for(t), 2))
+        return status
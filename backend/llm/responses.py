@@ -0,0 +1,134 @@
+# llm/responses.py
+"""
+Payload shaping and serializer negotiation for the /career routes.
+
+Clients can trim responses three ways:
+  - ?fields=status,analysis.skill_gaps  keep only the listed (dotted) paths
+  - ?compact=true                        drop bulky/duplicated blocks (see COMPACT_DROP)
+  - Accept: application/msgpack          binary encoding instead of JSON
+Transport compression (gzip/brotli) is handled by middleware in server.py.
+
+Routes return Response objects directly (CareerJSONResponse or render_payload)
+so FastAPI skips its jsonable_encoder walk over the nested analysis dicts.
+"""
+import json
+
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+if orjson is not None:
+    # NumPy scalars/arrays (pandas aggregates) and int dict keys are encoded natively
+    ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# Dotted paths removed in compact mode. real_time_insights repeats the market
+# data already summarised in market_insights, and the timestamps are only
+# useful for debugging.
+COMPACT_DROP = [
+    "analysis.real_time_insights",
+    "analysis.analysis_timestamp",
+    "analysis.model_used",
+    "analysis_source",
+    "anonymized_preview",
+    "text_length",
+    "skill_count",
+    "timestamp",
+]
+
+
+def parse_fields(fields):
+    """Turn 'a,b.c' into [['a'], ['b', 'c']]"""
+    if not fields:
+        return []
+    return [f.strip().split(".") for f in fields.split(",") if f.strip()]
+
+
+def select_fields(payload, fields):
+    """Keep only the requested dotted paths; 'status' is always kept"""
+    paths = parse_fields(fields)
+    if not paths:
+        return payload
+    selected = {}
+    if "status" in payload:
+        selected["status"] = payload["status"]
+    for path in paths:
+        value = payload
+        for key in path:
+            if not isinstance(value, dict) or key not in value:
+                break
+            value = value[key]
+        else:
+            target = selected
+            for key in path[:-1]:
+                target = target.setdefault(key, {})
+            target[path[-1]] = value
+    return selected
+
+
+def drop_paths(payload, paths):
+    """Return a copy of payload without the given dotted paths (only touched dicts are copied)"""
+    result = dict(payload)
+    for dotted in paths:
+        keys = dotted.split(".")
+        node = result
+        for key in keys[:-1]:
+            child = node.get(key)
+            if not isinstance(child, dict):
+                node = None
+                break
+            node[key] = dict(child)
+            node = node[key]
+        if node is not None:
+            node.pop(keys[-1], None)
+    return result
+
+
+def shape_payload(payload, fields=None, compact=False):
+    """Apply compact mode and field selection"""
+    if compact:
+        payload = drop_paths(payload, COMPACT_DROP)
+    return select_fields(payload, fields)
+
+
+def _json_default(obj):
+    """json.dumps fallback for NumPy values when orjson is unavailable"""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    return str(obj)
+
+
+def dumps_json(payload):
+    """Serialize to compact JSON bytes (orjson when installed)"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=ORJSON_OPTIONS, default=str)
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=_json_default).encode("utf-8")
+
+
+class CareerJSONResponse(JSONResponse):
+    """App-wide JSON response backed by orjson with native NumPy support"""
+
+    def render(self, content):
+        return dumps_json(content)
+
+
+def wants_msgpack(accept):
+    return msgpack is not None and bool(accept) and MSGPACK_MEDIA_TYPE in accept
+
+
+def render_payload(payload, fields=None, compact=False, accept=None, status_code=200):
+    """Shape the payload and encode it with the serializer the client asked for"""
+    payload = shape_payload(payload, fields, compact)
+    if wants_msgpack(accept):
+        body = msgpack.packb(payload, use_bin_type=True, default=_json_default)
+        return Response(content=body, status_code=status_code, media_type=MSGPACK_MEDIA_TYPE)
+    return CareerJSONResponse(content=payload, status_code=status_code)
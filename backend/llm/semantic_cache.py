@@ -0,0 +1,138 @@
+# llm/semantic_cache.py
+"""
+Semantic cache for LLM career analyses.
+
+Two users with nearly the same skills, target role, experience level and
+industry get nearly the same advice, so an exact-hash cache misses most of the
+reuse. Profiles are embedded locally (canonical skills feature-hashed into a
+unit vector) and bucketed by (role, experience, industry); a lookup is one
+matrix-vector product per bucket. On a hit the cached analysis is reused and
+only the skill-gap list is recomputed deterministically for the new user.
+"""
+import copy
+import hashlib
+import os
+import threading
+import time
+
+import numpy as np
+
+EMBEDDING_DIM = 256
+SIMILARITY_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.85"))
+MAX_ENTRIES_PER_BUCKET = 512
+ENTRY_TTL_SECONDS = 24 * 3600
+
+SKILL_ALIASES = {
+    "js": "javascript", "ts": "typescript", "ml": "machine learning", "dl": "deep learning",
+    "sklearn": "scikit-learn", "scikit learn": "scikit-learn", "postgres": "postgresql",
+    "k8s": "kubernetes", "powerbi": "power bi", "nodejs": "node.js", "node": "node.js",
+    "gcp": "google cloud", "amazon web services": "aws", "tableau/power bi": "tableau",
+}
+
+
+def canonical_skill(skill):
+    skill = " ".join(str(skill).lower().replace("_", " ").split())
+    return SKILL_ALIASES.get(skill, skill)
+
+
+def canonical_skills(skills):
+    return sorted({canonical_skill(s) for s in skills if str(s).strip()})
+
+
+def embed_skills(skills):
+    """Feature-hash canonical skills into a unit vector (stable across processes)"""
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    for skill in skills:
+        digest = hashlib.blake2b(skill.encode("utf-8"), digest_size=8).digest()
+        index = int.from_bytes(digest[:4], "little") % EMBEDDING_DIM
+        sign = 1.0 if digest[4] & 1 else -1.0
+        vector[index] += sign
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class _Bucket:
+    def __init__(self):
+        self.vectors = np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        self.entries = []  # dicts: skills, analysis, stored_at, last_hit
+
+
+class SemanticAnalysisCache:
+    """Similarity cache keyed on (role, experience, industry) + canonical skill vector"""
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, max_entries=MAX_ENTRIES_PER_BUCKET, ttl=ENTRY_TTL_SECONDS):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.buckets = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _bucket_key(target_role, experience_level, industry):
+        return (target_role.strip().lower(), experience_level.strip().lower(), industry.strip().lower())
+
+    def lookup(self, user_skills, target_role, experience_level, industry):
+        """Return (entry, similarity) of the closest live entry above threshold, else (None, score)"""
+        skills = canonical_skills(user_skills)
+        vector = embed_skills(skills)
+        with self.lock:
+            bucket = self.buckets.get(self._bucket_key(target_role, experience_level, industry))
+            if bucket is None or not bucket.entries:
+                self.misses += 1
+                return None, 0.0
+            scores = bucket.vectors @ vector
+            best = int(np.argmax(scores))
+            entry, score = bucket.entries[best], float(scores[best])
+            if score < self.threshold or time.time() - entry["stored_at"] > self.ttl:
+                self.misses += 1
+                return None, score
+            entry["last_hit"] = time.time()
+            self.hits += 1
+            return entry, score
+
+    def store(self, user_skills, target_role, experience_level, industry, analysis):
+        skills = canonical_skills(user_skills)
+        key = self._bucket_key(target_role, experience_level, industry)
+        entry = {"skills": skills, "analysis": copy.deepcopy(analysis), "stored_at": time.time(), "last_hit": 0.0}
+        with self.lock:
+            bucket = self.buckets.setdefault(key, _Bucket())
+            if len(bucket.entries) >= self.max_entries:
+                # Evict the least recently useful entry
+                victim = min(range(len(bucket.entries)),
+                             key=lambda i: max(bucket.entries[i]["last_hit"], bucket.entries[i]["stored_at"]))
+                bucket.entries.pop(victim)
+                bucket.vectors = np.delete(bucket.vectors, victim, axis=0)
+            bucket.entries.append(entry)
+            bucket.vectors = np.vstack([bucket.vectors, embed_skills(skills)[None, :]])
+
+    def stats(self):
+        with self.lock:
+            size = sum(len(b.entries) for b in self.buckets.values())
+        total = self.hits + self.misses
+        return {"entries": size, "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0}
+
+
+def adapt_cached_analysis(entry, user_skills, relevant_skills, similarity):
+    """Reuse a cached analysis for a new user, recomputing the technical gap list:
+    drop gaps the user already has, add role-relevant skills the cached user had but this one lacks."""
+    analysis = copy.deepcopy(entry["analysis"])
+    user = set(canonical_skills(user_skills))
+    relevant = {canonical_skill(s) for s in relevant_skills}
+
+    gaps = analysis.get("skill_gaps", {})
+    cached_gaps = gaps.get("technical", []) if isinstance(gaps, dict) else []
+    technical = [g for g in cached_gaps if canonical_skill(g) not in user]
+    seen = {canonical_skill(g) for g in technical}
+    for skill in entry["skills"]:
+        if skill not in user and skill in relevant and skill not in seen:
+            technical.append(skill)
+            seen.add(skill)
+    if isinstance(gaps, dict):
+        gaps["technical"] = technical
+
+    analysis["analysis_source"] = f"{analysis.get('analysis_source', 'cached')} (semantic cache)"
+    analysis["cache_similarity"] = round(similarity, 3)
+    return analysis
@@ -0,0 +1,336 @@
+# llm/shared_data.py
+"""
+Read-only resume dataset shared between server workers.
+
+The CSV is converted once into a snapshot directory of flat files: for every
+text column a UTF-8 blob (<col>.bin) plus an int64 offsets array
+(<col>.offsets.npy). Workers open those files with mmap, so the OS page cache
+holds a single copy no matter how many workers run on the host.
+
+The snapshot also carries inverted indexes (position title and skill -> sorted
+row ids, CSR layout) so filtered pages and samples touch only matching rows.
+Substring filters find candidate keys through a trigram index over the
+vocabulary and only check those, instead of scanning every key.
+
+Building is serialized with a file lock next to the snapshot directory, so
+workers started together (uvicorn --workers without serve.py) build it once.
+"""
+import ast
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+try:
+    from llm.logger import get_logger
+except ImportError:
+    from logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock; serve.py builds the snapshot before workers start
+    fcntl = None
+
+log = get_logger(__name__)
+
+SNAPSHOT_VERSION = 2
+NGRAM = 3
+RESUME_COLUMNS = ["resume_text", "extracted_skills", "positions"]
+MANIFEST_FILE = "manifest.json"
+
+
+def _source_fingerprint(csv_path):
+    """Cheap identity of the source file (size + mtime) used to detect stale snapshots"""
+    stat = os.stat(csv_path)
+    return {"path": os.path.abspath(csv_path), "size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+
+def snapshot_is_fresh(csv_path, out_dir):
+    """True if out_dir holds a snapshot built from the current csv_path"""
+    manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return False
+    try:
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return (
+        manifest.get("version") == SNAPSHOT_VERSION
+        and manifest.get("source") == _source_fingerprint(csv_path)
+    )
+
+
+def _write_text_column(values, out_dir, name):
+    """Write a column as one UTF-8 blob plus row offsets"""
+    encoded = [str(v).encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    with open(os.path.join(out_dir, f"{name}.bin"), "wb") as f:
+        for chunk in encoded:
+            f.write(chunk)
+    np.save(os.path.join(out_dir, f"{name}.offsets.npy"), offsets)
+
+
+def parse_skill_list(value):
+    """Parse the "['python', 'sql']" strings stored in extracted_skills"""
+    value = str(value).strip()
+    if not value:
+        return []
+    if value.startswith("["):
+        try:
+            parsed = ast.literal_eval(value)
+            if isinstance(parsed, (list, tuple)):
+                return [str(s) for s in parsed]
+        except (ValueError, SyntaxError):
+            pass
+        value = value.strip("[]")
+    return [s.strip(" '\"") for s in value.split(",")]
+
+
+def _write_index(row_ids, keys, out_dir, name):
+    """Write an inverted index: vocab (json) + CSR postings of sorted row ids per key"""
+    codes, vocab = pd.factorize(pd.Series(keys, dtype=object))
+    row_ids = np.asarray(row_ids, dtype=np.int64)
+    keep = codes >= 0
+    codes, row_ids = codes[keep], row_ids[keep]
+    # Stable sort keeps row ids ascending inside every posting list
+    order = np.argsort(codes, kind="stable")
+    offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codes, minlength=len(vocab)), out=offsets[1:])
+    np.save(os.path.join(out_dir, f"{name}.postings.npy"), row_ids[order])
+    np.save(os.path.join(out_dir, f"{name}.postings_offsets.npy"), offsets)
+    with open(os.path.join(out_dir, f"{name}.vocab.json"), "w") as f:
+        json.dump([str(v) for v in vocab], f)
+
+
+def _write_indexes(df, out_dir):
+    positions = df["positions"].astype(str).str.strip().str.lower()
+    has_position = positions != ""
+    _write_index(np.flatnonzero(has_position.values), positions[has_position].tolist(), out_dir, "position")
+
+    skill_rows, skill_keys = [], []
+    for row_id, value in enumerate(df["extracted_skills"].tolist()):
+        for skill in set(s.strip().lower() for s in parse_skill_list(value)):
+            if skill:
+                skill_rows.append(row_id)
+                skill_keys.append(skill)
+    _write_index(skill_rows, skill_keys, out_dir, "skill")
+
+
+def build_snapshot(csv_path, out_dir, columns=RESUME_COLUMNS):
+    """Convert the resume CSV into a memory-mappable snapshot (atomic replace of out_dir)"""
+    df = pd.read_csv(csv_path, usecols=lambda c: c in columns)
+    missing = [c for c in columns if c not in df.columns]
+    for column in missing:
+        df[column] = ""
+    df = df[columns].fillna("")
+
+    parent = os.path.dirname(os.path.abspath(out_dir))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=".snapshot-", dir=parent)
+    try:
+        for column in columns:
+            _write_text_column(df[column].tolist(), tmp_dir, column)
+        _write_indexes(df, tmp_dir)
+        manifest = {
+            "version": SNAPSHOT_VERSION,
+            "source": _source_fingerprint(csv_path),
+            "rows": len(df),
+            "columns": list(columns),
+        }
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), "w") as f:
+            json.dump(manifest, f, indent=2)
+        if os.path.exists(out_dir):
+            shutil.rmtree(out_dir)
+        os.replace(tmp_dir, out_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    log.info("built shared snapshot", resumes=len(df), path=out_dir)
+    return manifest
+
+
+class _MappedTextColumn:
+    """A text column backed by a mmapped blob and offsets array"""
+
+    def __init__(self, out_dir, name):
+        self.offsets = np.load(os.path.join(out_dir, f"{name}.offsets.npy"), mmap_mode="r")
+        blob_path = os.path.join(out_dir, f"{name}.bin")
+        # np.memmap refuses zero-length files
+        if os.path.getsize(blob_path):
+            self.blob = np.memmap(blob_path, dtype=np.uint8, mode="r")
+        else:
+            self.blob = np.zeros(0, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        return self.blob[start:end].tobytes().decode("utf-8")
+
+
+class _MappedIndex:
+    """Inverted index (key -> sorted row ids) backed by mmapped CSR arrays"""
+
+    def __init__(self, out_dir, name):
+        with open(os.path.join(out_dir, f"{name}.vocab.json"), "r") as f:
+            self.vocab = json.load(f)
+        self.codes = {key: code for code, key in enumerate(self.vocab)}
+        self.postings = np.load(os.path.join(out_dir, f"{name}.postings.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(out_dir, f"{name}.postings_offsets.npy"), mmap_mode="r")
+        self.grams = None
+        # Resolved posting lists are cached per needle, so a repeated filter costs
+        # one dict lookup instead of a key lookup plus a merge
+        self.rows = lru_cache(maxsize=256)(self._rows)
+
+    def _gram_index(self):
+        """Trigram -> vocab codes of keys containing it (built on the first substring query)"""
+        if self.grams is None:
+            grams = {}
+            for code, key in enumerate(self.vocab):
+                for gram in {key[i:i + NGRAM] for i in range(len(key) - NGRAM + 1)}:
+                    grams.setdefault(gram, []).append(code)
+            self.grams = grams
+        return self.grams
+
+    def _containing(self, needle):
+        """Vocab codes whose key contains needle, in code order"""
+        if len(needle) < NGRAM:
+            return [code for code, key in enumerate(self.vocab) if needle in key]
+        grams = self._gram_index()
+        candidates = sorted((grams.get(needle[i:i + NGRAM], []) for i in range(len(needle) - NGRAM + 1)), key=len)
+        if not candidates[0]:
+            return []
+        codes = set(candidates[0]).intersection(*candidates[1:])
+        return [code for code in sorted(codes) if needle in self.vocab[code]]
+
+    def _rows(self, needle, substring=True):
+        """Sorted row ids for keys equal to (or, with substring, containing) needle"""
+        needle = needle.strip().lower()
+        if substring:
+            codes = self._containing(needle)
+        else:
+            codes = [self.codes[needle]] if needle in self.codes else []
+        lists = [self.postings[self.offsets[c]:self.offsets[c + 1]] for c in codes]
+        if not lists:
+            return np.zeros(0, dtype=np.int64)
+        if len(lists) == 1:
+            return lists[0]
+        return np.unique(np.concatenate(lists))
+
+
+class SharedResumeStore:
+    """Read-only, memory-mapped view of the resume dataset"""
+
+    def __init__(self, out_dir):
+        with open(os.path.join(out_dir, MANIFEST_FILE), "r") as f:
+            self.manifest = json.load(f)
+        self.path = out_dir
+        self.columns = {name: _MappedTextColumn(out_dir, name) for name in self.manifest["columns"]}
+        self.position_index = _MappedIndex(out_dir, "position")
+        self.skill_index = _MappedIndex(out_dir, "skill")
+
+    def __len__(self):
+        return self.manifest["rows"]
+
+    def record(self, i):
+        return {name: column[i] for name, column in self.columns.items()}
+
+    def records(self, indices):
+        return [self.record(int(i)) for i in indices]
+
+    def head(self, count):
+        return self.records(range(min(count, len(self))))
+
+    def matching_rows(self, position=None, skill=None):
+        """Sorted row ids matching the filters, or None when unfiltered (all rows)"""
+        rows = None
+        if position:
+            rows = self.position_index.rows(position)
+        if skill:
+            skill_rows = self.skill_index.rows(skill, substring=False)
+            rows = skill_rows if rows is None else np.intersect1d(rows, skill_rows, assume_unique=True)
+        return rows
+
+    def skill_prevalence(self, skills, position=None):
+        """(rows matching position, {skill: rows that also list it}) from the inverted indexes"""
+        rows = self.matching_rows(position)
+        total = len(self) if rows is None else len(rows)
+        counts = {}
+        for skill in skills:
+            skill_rows = self.skill_index.rows(skill, substring=False)
+            counts[skill] = len(skill_rows) if rows is None else len(
+                np.intersect1d(rows, skill_rows, assume_unique=True))
+        return total, counts
+
+    def page(self, count, after=-1, position=None, skill=None):
+        """Keyset page: up to count rows with id > after. Returns (records, next_after, total)"""
+        rows = self.matching_rows(position, skill)
+        if rows is None:
+            total = len(self)
+            start = after + 1
+            ids = np.arange(start, min(start + count, total))
+            has_more = start + count < total
+        else:
+            total = len(rows)
+            start = int(np.searchsorted(rows, after, side="right"))
+            ids = rows[start:start + count]
+            has_more = start + count < total
+        next_after = int(ids[-1]) if has_more and len(ids) else None
+        return self.records(ids), next_after, total
+
+    def sample(self, count, seed=None, position=None, skill=None):
+        """Seeded random sample without replacement. Returns (records, total)"""
+        rows = self.matching_rows(position, skill)
+        total = len(self) if rows is None else len(rows)
+        rng = np.random.default_rng(seed)
+        picks = rng.choice(total, size=min(count, total), replace=False)
+        ids = picks if rows is None else rows[picks]
+        return self.records(ids), total
+
+
+@contextmanager
+def _build_lock(out_dir):
+    """Exclusive lock on a file beside out_dir, held while the snapshot is (re)built"""
+    if fcntl is None:
+        yield
+        return
+    parent = os.path.dirname(os.path.abspath(out_dir))
+    os.makedirs(parent, exist_ok=True)
+    with open(os.path.join(parent, f".{os.path.basename(out_dir)}.lock"), "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def ensure_snapshot(csv_path, out_dir):
+    """Build the snapshot for csv_path unless an up-to-date one exists, then open it.
+    Processes racing here build it once: the others wait on the lock and find it fresh."""
+    if not snapshot_is_fresh(csv_path, out_dir):
+        with _build_lock(out_dir):
+            if not snapshot_is_fresh(csv_path, out_dir):
+                build_snapshot(csv_path, out_dir)
+    return SharedResumeStore(out_dir)
+
+
+def open_shared_store(out_dir=None):
+    """Open the snapshot named by CAREER_SHARED_DATA_DIR (or out_dir); None if unavailable"""
+    out_dir = out_dir or os.getenv("CAREER_SHARED_DATA_DIR")
+    if not out_dir or not os.path.exists(os.path.join(out_dir, MANIFEST_FILE)):
+        return None
+    try:
+        store = SharedResumeStore(out_dir)
+        log.info("mapped shared snapshot", resumes=len(store), path=out_dir)
+        return store
+    except Exception as e:
+        log.warning("shared snapshot unusable", path=out_dir, error=str(e))
+        return None
@@ -0,0 +1,357 @@
+# llm/skill_graph.py
+"""
+Skill co-occurrence graph and "next skill" recommender.
+
+Counts how often two skills are listed on the same position in merged.json,
+per scope: every known role (title substring, as in llm/trend_engine.py) and
+all roles, each over every era (ERA_YEARS-year windows ending at the dataset's
+latest year) and over all years. The counts are built with vectorized numpy
+ops (skill pairs of each position expanded with repeat/offset arithmetic,
+aggregated with unique, in chunks of positions) and stored as one CSR matrix
+whose rows are (scope, skill):
+
+  data/skill_graph/<dataset version>-g<graph version>/
+      manifest.json          scopes, eras, build info
+      vocab.json             skills, sorted (the column order)
+      indptr.npy indices.npy data.npy   co-occurrence counts, CSR
+      skill_counts.npy       (scopes x skills) positions listing each skill
+      scope_positions.npy    positions per scope
+
+Readers mmap the arrays, so every worker shares one copy. A query reads the
+user's skill rows of the target scope and scores each skill they lack by its
+conditional probability given their skills,
+  P(c | user skills) = sum_u co(u, c) / sum_u count(u),
+reporting PMI-style lift against the skill's base rate in the scope. Ties
+break on the sorted vocab, so the same input always gives the same list.
+
+Builds hold an flock on data/skill_graph/.build.lock, so workers that find
+the graph missing at the same time build it once.
+
+Build ahead of time (serve.py does this before forking workers):
+  cd backend
+  python llm/skill_graph.py
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from llm.trend_engine import MERGED_JSON_PATH, MIN_SKILL_MENTIONS, load_positions, split_skills
+    from llm.trend_snapshots import KNOWN_ROLES, dataset_version
+    from llm.logger import get_logger
+except ImportError:
+    from trend_engine import MERGED_JSON_PATH, MIN_SKILL_MENTIONS, load_positions, split_skills
+    from trend_snapshots import KNOWN_ROLES, dataset_version
+    from logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock; serve.py builds the graph before workers start
+    fcntl = None
+
+log = get_logger(__name__)
+
+GRAPH_ROOT = os.getenv("SKILL_GRAPH_DIR", "data/skill_graph")
+# Bump when the stored layout or scopes change
+SKILL_GRAPH_VERSION = 1
+ERA_YEARS = 5
+ALL = "*"
+# Positions built per chunk (bounds the memory of the expanded skill pairs)
+CHUNK_POSITIONS = 50_000
+# Scopes with fewer positions fall back to a wider one (all years, then all roles)
+MIN_SCOPE_POSITIONS = 50
+RECOMMENDATIONS = 5
+
+
+def graph_dir(version, root=GRAPH_ROOT):
+    return os.path.join(root, f"{version}-g{SKILL_GRAPH_VERSION}")
+
+
+def _eras(first_year, last_year):
+    """[(first, last)] windows of ERA_YEARS ending at last_year, newest first"""
+    eras, end = [], last_year
+    while end >= first_year:
+        eras.append((max(first_year, end - ERA_YEARS + 1), end))
+        end -= ERA_YEARS
+    return eras
+
+
+def _pairs(position, skill, offsets):
+    """Ordered skill pairs (left, right) of every position, without the diagonal.
+    position must be sorted; offsets[p] is the first mention of position p."""
+    per_position = np.diff(offsets)
+    repeats = per_position[position]
+    left = np.repeat(np.arange(len(position)), repeats)
+    block_start = np.repeat(np.cumsum(repeats) - repeats, repeats)
+    right = offsets[position[left]] + (np.arange(len(left)) - block_start)
+    off_diagonal = left != right
+    return left[off_diagonal], right[off_diagonal]
+
+
+def _merge(parts):
+    """Sum (keys, counts) chunks into unique sorted keys"""
+    if not parts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    keys = np.concatenate([k for k, _ in parts])
+    counts = np.concatenate([c for _, c in parts])
+    keys, inverse = np.unique(keys, return_inverse=True)
+    return keys, np.bincount(inverse, weights=counts).astype(np.int64)
+
+
+def build_graph(path=MERGED_JSON_PATH, root=GRAPH_ROOT, roles=KNOWN_ROLES):
+    """Compute and atomically publish the co-occurrence graph for the current dataset"""
+    version = dataset_version(path)
+    out_dir = graph_dir(version, root)
+    started = time.perf_counter()
+    positions = load_positions(path)
+
+    # Vocab: skills with enough mentions overall, sorted for a deterministic column order
+    parsed = [{s.strip().lower() for s in split_skills(raw)} - {""} for _, _, _, raw in positions]
+    mentions = {}
+    for skills in parsed:
+        for skill in skills:
+            mentions[skill] = mentions.get(skill, 0) + 1
+    vocab = sorted(skill for skill, n in mentions.items() if n >= MIN_SKILL_MENTIONS)
+    codes = {skill: i for i, skill in enumerate(vocab)}
+    n_skills = len(vocab)
+
+    years = np.array([p[0] for p in positions], dtype=np.int64)
+    eras = _eras(int(years.min()), int(years.max())) if len(years) else []
+    role_masks = [np.ones(len(positions), dtype=bool)] + [
+        np.array([role.lower() in p[1] for p in positions], dtype=bool) for role in roles]
+    era_masks = [np.ones(len(positions), dtype=bool)] + [(years >= a) & (years <= b) for a, b in eras]
+    scopes = [{"role": role, "era": era} for role in [ALL] + list(roles)
+              for era in [ALL] + [f"{a}-{b}" for a, b in eras]]
+    scope_masks = [r & e for r in role_masks for e in era_masks]
+
+    # Mentions as (position, skill code) sorted by position
+    position = np.fromiter((i for i, skills in enumerate(parsed) for s in skills if s in codes), dtype=np.int64)
+    skill = np.fromiter((codes[s] for skills in parsed for s in skills if s in codes), dtype=np.int64)
+    offsets = np.searchsorted(position, np.arange(len(positions) + 1))
+
+    parts = [[] for _ in scopes]
+    for start in range(0, len(positions), CHUNK_POSITIONS):
+        lo, hi = offsets[start], offsets[min(start + CHUNK_POSITIONS, len(positions))]
+        left, right = _pairs(position[lo:hi] - start, skill[lo:hi], offsets[start:start + CHUNK_POSITIONS + 1] - lo)
+        pair_position = position[lo:hi][left]
+        keys = skill[lo:hi][left] * n_skills + skill[lo:hi][right]
+        for s, mask in enumerate(scope_masks):
+            selected = mask[pair_position]
+            if selected.any():
+                parts[s].append(np.unique(keys[selected], return_counts=True))
+
+    indptr = np.zeros(len(scopes) * n_skills + 1, dtype=np.int64)
+    indices, data = [], []
+    for s, scope_parts in enumerate(parts):
+        keys, counts = _merge(scope_parts)
+        rows = keys // n_skills
+        indices.append((keys % n_skills).astype(np.int32))
+        data.append(counts.astype(np.int32))
+        row_ends = np.searchsorted(rows, np.arange(1, n_skills + 1))
+        base = indptr[s * n_skills]
+        indptr[s * n_skills + 1:(s + 1) * n_skills + 1] = base + row_ends
+    skill_counts = np.stack([np.bincount(skill[mask[position]], minlength=n_skills) for mask in scope_masks]) \
+        if scopes else np.zeros((0, n_skills), dtype=np.int64)
+    scope_positions = np.array([mask.sum() for mask in scope_masks], dtype=np.int64)
+
+    os.makedirs(root, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=".building-", dir=root)
+    try:
+        np.save(os.path.join(tmp_dir, "indptr.npy"), indptr)
+        np.save(os.path.join(tmp_dir, "indices.npy"), np.concatenate(indices) if indices else np.zeros(0, np.int32))
+        np.save(os.path.join(tmp_dir, "data.npy"), np.concatenate(data) if data else np.zeros(0, np.int32))
+        np.save(os.path.join(tmp_dir, "skill_counts.npy"), skill_counts.astype(np.int32))
+        np.save(os.path.join(tmp_dir, "scope_positions.npy"), scope_positions)
+        with open(os.path.join(tmp_dir, "vocab.json"), "w") as f:
+            json.dump(vocab, f)
+        manifest = {
+            "dataset_version": version,
+            "graph_version": SKILL_GRAPH_VERSION,
+            "source": os.path.abspath(path),
+            "scopes": scopes,
+            "eras": [f"{a}-{b}" for a, b in eras],
+            "skills": n_skills,
+            "pairs": int(indptr[-1]),
+            "built_at": time.time(),
+        }
+        with open(os.path.join(tmp_dir, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+        if os.path.exists(out_dir):
+            shutil.rmtree(out_dir)
+        os.replace(tmp_dir, out_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    for name in os.listdir(root):
+        # Readers only open the current dataset's graph
+        if name != os.path.basename(out_dir) and not name.startswith("."):
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    log.info("built skill graph", version=version, skills=n_skills, scopes=len(scopes), pairs=int(indptr[-1]),
+             path=out_dir, seconds=round(time.perf_counter() - started, 2))
+    return out_dir
+
+
+@contextmanager
+def _build_lock(root):
+    """Exclusive lock on a file in root, held while a graph is built"""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, ".build.lock"), "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def ensure_graph(path=MERGED_JSON_PATH, root=GRAPH_ROOT):
+    """Build the graph for the current dataset unless it already exists.
+    Processes racing here build it once: the others wait on the lock and find it built."""
+    out_dir = graph_dir(dataset_version(path), root)
+    if not os.path.exists(os.path.join(out_dir, "manifest.json")):
+        with _build_lock(root):
+            if not os.path.exists(os.path.join(out_dir, "manifest.json")):
+                return build_graph(path, root)
+    return out_dir
+
+
+class _MappedGraph:
+    """One built graph, with its arrays memory-mapped"""
+
+    def __init__(self, out_dir):
+        with open(os.path.join(out_dir, "manifest.json"), "r") as f:
+            self.manifest = json.load(f)
+        with open(os.path.join(out_dir, "vocab.json"), "r") as f:
+            self.vocab = json.load(f)
+        self.path = out_dir
+        self.codes = {skill: i for i, skill in enumerate(self.vocab)}
+        self.scopes = {(s["role"].lower(), s["era"]): i for i, s in enumerate(self.manifest["scopes"])}
+        self.roles = [s["role"] for s in self.manifest["scopes"] if s["era"] == ALL and s["role"] != ALL]
+        for name in ("indptr", "indices", "data", "skill_counts", "scope_positions"):
+            setattr(self, name, np.load(os.path.join(out_dir, f"{name}.npy"), mmap_mode="r"))
+
+    def scope(self, target_role, era=None):
+        """Scope id for the target role: the known role it names (else all roles), in the
+        requested era (default: the latest), widened until it has enough positions"""
+        target = (target_role or "").strip().lower()
+        role = next((r.lower() for r in self.roles if r.lower() == target), None) or \
+            next((r.lower() for r in self.roles if r.lower() in target), ALL)
+        era = era or (self.manifest["eras"][0] if self.manifest["eras"] else ALL)
+        for candidate in ((role, era), (role, ALL), (ALL, era), (ALL, ALL)):
+            scope = self.scopes.get(candidate)
+            if scope is not None and self.scope_positions[scope] >= MIN_SCOPE_POSITIONS:
+                return scope
+        return self.scopes[(ALL, ALL)]
+
+    def recommend(self, user_skills, target_role, limit=RECOMMENDATIONS, era=None):
+        scope = self.scope(target_role, era)
+        n_skills = len(self.vocab)
+        known = sorted({self.codes[s] for s in (k.strip().lower() for k in user_skills) if s in self.codes})
+        counts = np.asarray(self.skill_counts[scope], dtype=np.float64)
+        total = float(self.scope_positions[scope])
+        base = counts / max(total, 1.0)
+        if known:
+            rows = scope * n_skills + np.asarray(known)
+            starts, ends = self.indptr[rows], self.indptr[rows + 1]
+            columns = np.concatenate([self.indices[a:b] for a, b in zip(starts, ends)])
+            weights = np.concatenate([self.data[a:b] for a, b in zip(starts, ends)])
+            probability = np.bincount(columns, weights=weights, minlength=n_skills) / max(counts[known].sum(), 1.0)
+        else:
+            probability = base.copy()
+        probability[known] = 0.0
+        candidates = np.flatnonzero(probability > 0)
+        top = candidates[np.lexsort((candidates, -probability[candidates]))[:limit]]
+        return {
+            "role": self.manifest["scopes"][scope]["role"],
+            "era": self.manifest["scopes"][scope]["era"],
+            "positions": int(total),
+            "matched_skills": [self.vocab[i] for i in known],
+            "recommendations": [{
+                "skill": self.vocab[i],
+                "probability": round(float(probability[i]), 4),
+                "share": round(float(base[i]), 4),
+                "lift": round(float(probability[i] / base[i]), 2) if base[i] > 0 else None,
+            } for i in top],
+        }
+
+
+class SkillGraphStore:
+    """Queries against the graph of the dataset currently on disk; a missing graph is built
+    in a background thread (answers are None until it is ready)"""
+
+    def __init__(self, path=MERGED_JSON_PATH, root=GRAPH_ROOT):
+        self.path = path
+        self.root = root
+        self.graph = None
+        self.building = False
+        self.lock = threading.Lock()
+
+    def _current(self):
+        if not os.path.exists(self.path):
+            return None
+        out_dir = graph_dir(dataset_version(self.path), self.root)
+        with self.lock:
+            if self.graph is not None and self.graph.path == out_dir:
+                return self.graph
+            if os.path.exists(os.path.join(out_dir, "manifest.json")):
+                self.graph = _MappedGraph(out_dir)
+                log.info("skill graph mapped", version=self.graph.manifest["dataset_version"],
+                         skills=len(self.graph.vocab))
+                return self.graph
+            if not self.building:
+                self.building = True
+                threading.Thread(target=self._build, name="skill-graph-build", daemon=True).start()
+            return None
+
+    def _build(self):
+        try:
+            ensure_graph(self.path, self.root)
+        except Exception:
+            log.exception("skill graph build failed")
+        finally:
+            with self.lock:
+                self.building = False
+
+    def recommend(self, user_skills, target_role, limit=RECOMMENDATIONS, era=None):
+        """Ranked skills the user lacks for target_role, or None while no graph is available"""
+        graph = self._current()
+        if graph is None:
+            return None
+        return graph.recommend(user_skills, target_role, limit, era)
+
+
+_store = SkillGraphStore()
+
+
+def recommend_skills(user_skills, target_role, limit=RECOMMENDATIONS, era=None):
+    """Next-skill recommendations from the shared store, or None without a dataset/graph"""
+    try:
+        return _store.recommend(user_skills, target_role, limit, era)
+    except (OSError, ValueError, KeyError) as e:
+        log.warning("skill recommendations unavailable", role=target_role, error=str(e))
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the skill co-occurrence graph")
+    parser.add_argument("--data", default=MERGED_JSON_PATH)
+    parser.add_argument("--out", default=GRAPH_ROOT)
+    args = parser.parse_args()
+    with _build_lock(args.out):
+        print(build_graph(args.data, args.out))
+
+
+if __name__ == "__main__":
+    main()
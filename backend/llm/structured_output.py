@@ -0,0 +1,200 @@
+# llm/structured_output.py
+"""
+Structured (JSON) output for LLM calls: declared schemas, local repair and validation.
+
+Providers are asked for JSON directly (Gemini response_schema, OpenAI JSON
+mode). Whatever comes back goes through one incremental pass that strips
+fences/prose, drops trailing commas and closes unterminated strings and
+brackets, then is validated against the schema. Missing or mistyped fields
+are filled from the deterministic fallback so a slightly malformed reply is
+fixed locally instead of costing another round trip. A reply that is not an
+object, or lacks most of the schema's required sections, is rejected instead:
+filling it would return the fallback dressed up as a model answer.
+"""
+import json
+
+try:
+    from llm import metrics
+except ImportError:
+    import metrics
+
+OUTCOMES = ("clean", "repaired", "filled", "failed")
+# Share of the schema's required top-level sections a reply must carry to be repaired and filled
+MIN_REQUIRED_SECTIONS = 0.5
+
+
+def _obj(properties, required=None):
+    return {"type": "object", "properties": properties, "required": required or list(properties)}
+
+
+def _arr(items):
+    return {"type": "array", "items": items}
+
+
+_STR = {"type": "string"}
+_STAGE = _obj({"role": _STR, "requirements": _arr(_STR), "salary_range": _STR})
+
+ANALYSIS_SCHEMA = _obj({
+    "skill_gaps": _obj({
+        "technical": _arr(_STR),
+        "soft_skills": _arr(_STR),
+        "severity": _STR,
+        "justification": _STR,
+    }),
+    "career_path": _obj({"immediate": _STAGE, "mid_term": _STAGE, "long_term": _STAGE}),
+    "learning_roadmap": _obj({
+        "courses": _arr(_obj({"name": _STR, "platform": _STR, "duration": _STR, "focus": _STR})),
+        "projects": _arr(_STR),
+        "timeline": _STR,
+    }),
+    "market_insights": _obj({
+        "demand_trend": _STR,
+        "emerging_tech": _arr(_STR),
+        "industry_advice": _STR,
+    }),
+})
+
+
+def to_gemini_schema(schema):
+    """Gemini's response_schema uses the OpenAPI subset with upper-case type names"""
+    converted = {}
+    for key, value in schema.items():
+        if key == "type":
+            converted[key] = value.upper()
+        elif key == "properties":
+            converted[key] = {name: to_gemini_schema(sub) for name, sub in value.items()}
+        elif key == "items":
+            converted[key] = to_gemini_schema(value)
+        else:
+            converted[key] = value
+    return converted
+
+
+def repair_json_text(text):
+    """One pass over text: isolate the outermost JSON object, drop trailing commas,
+    close an unterminated string and any open brackets. Returns the candidate text."""
+    if not text:
+        return text
+    start = text.find("{")
+    if start == -1:
+        return text
+    out, stack = [], []
+    in_string = escaped = False
+    for ch in text[start:]:
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            # Trailing comma before a closer
+            while out and out[-1] in " \n\r\t":
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            if not stack or stack[-1] != ch:
+                break  # unbalanced closer: stop at the last good point
+            stack.pop()
+            out.append(ch)
+            if not stack:
+                break  # end of the outermost object; ignore trailing prose/fences
+            continue
+        out.append(ch)
+    if in_string:
+        out.append('"')
+    while out and out[-1] in " \n\r\t,:":
+        out.pop()
+    out.extend(reversed(stack))
+    return "".join(out)
+
+
+def parse_json_text(text):
+    """Parse a model reply as JSON, repairing it locally if needed. Returns (data, repaired) or (None, False)."""
+    if not text:
+        return None, False
+    stripped = text.strip()
+    try:
+        return json.loads(stripped), False
+    except ValueError:
+        pass
+    try:
+        return json.loads(repair_json_text(stripped)), True
+    except ValueError:
+        return None, False
+
+
+def conform(value, schema, default, path="", problems=None):
+    """Coerce value to schema, taking missing/mistyped parts from default. Returns (value, problems)."""
+    problems = [] if problems is None else problems
+    kind = schema.get("type")
+    if kind == "object":
+        if not isinstance(value, dict):
+            problems.append(f"{path or '$'}: expected object")
+            return default, problems
+        result = dict(value)
+        default = default if isinstance(default, dict) else {}
+        for name, sub in schema.get("properties", {}).items():
+            child_path = f"{path}.{name}" if path else name
+            if name not in value:
+                if name in schema.get("required", []):
+                    problems.append(f"{child_path}: missing")
+                    if name in default:
+                        result[name] = default[name]
+                continue
+            result[name], _ = conform(value[name], sub, default.get(name), child_path, problems)
+        return result, problems
+    if kind == "array":
+        if isinstance(value, str):
+            problems.append(f"{path}: string coerced to list")
+            value = [v.strip() for v in value.split(",") if v.strip()]
+        if not isinstance(value, list):
+            problems.append(f"{path}: expected array")
+            return default if default is not None else [], problems
+        item_schema = schema.get("items", {})
+        item_default = default[0] if isinstance(default, list) and default else None
+        return [conform(v, item_schema, item_default, f"{path}[]", problems)[0] for v in value], problems
+    if kind == "string":
+        if isinstance(value, str):
+            return value, problems
+        if isinstance(value, list):
+            problems.append(f"{path}: list joined to string")
+            return ", ".join(str(v) for v in value), problems
+        if value is None:
+            problems.append(f"{path}: null")
+            return default if default is not None else "", problems
+        return str(value), problems
+    return value, problems
+
+
+def has_required_sections(data, schema):
+    """Is data an object holding at least MIN_REQUIRED_SECTIONS of schema's required sections?
+    Empty values ({}, [], "", null) do not count as present."""
+    if not isinstance(data, dict):
+        return False
+    required = schema.get("required", [])
+    if not required:
+        return bool(data)
+    present = sum(1 for name in required if data.get(name) not in (None, "", [], {}))
+    return present >= max(1, MIN_REQUIRED_SECTIONS * len(required))
+
+
+def parse_structured(text, schema, default, target=None):
+    """Parse, repair and conform a reply. Returns (data, outcome) with outcome one of OUTCOMES.
+    target is the routing target that produced the reply, for the metric's provider/model labels."""
+    labels = {"provider": getattr(target, "provider", "unknown"), "model": getattr(target, "model", "unknown")}
+    data, repaired = parse_json_text(text)
+    if not has_required_sections(data, schema):
+        metrics.LLM_PARSE_OUTCOMES.inc(outcome="failed", **labels)
+        return None, "failed"
+    data, problems = conform(data, schema, default)
+    outcome = "filled" if problems else ("repaired" if repaired else "clean")
+    metrics.LLM_PARSE_OUTCOMES.inc(outcome=outcome, **labels)
+    return data, outcome
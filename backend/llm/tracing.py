@@ -0,0 +1,276 @@
+# llm/tracing.py
+"""
+Lightweight request tracing with context-propagated spans.
+
+    with span("anonymize_resume", chars=len(text)):
+        ...
+
+    @traced("extract_skills_from_text")
+    def extract_skills_from_text(text): ...
+
+The HTTP middleware in server.py opens a trace per request; spans nest through
+a contextvar, so helpers need no extra arguments. Finished traces are returned
+as a Server-Timing header and optionally exported off the request path:
+  TRACE_EXPORT=json   JSON lines appended to TRACE_LOG_PATH (default data/traces.jsonl)
+  TRACE_EXPORT=otlp   OTLP/HTTP JSON posted to OTEL_EXPORTER_OTLP_ENDPOINT
+                      (default http://localhost:4318, path /v1/traces)
+Spans outside a request trace are no-ops.
+"""
+import contextvars
+import functools
+import inspect
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+import urllib.request
+
+TRACE_EXPORT = os.getenv("TRACE_EXPORT", "").lower()
+TRACE_LOG_PATH = os.getenv("TRACE_LOG_PATH", "data/traces.jsonl")
+OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318").rstrip("/")
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "careercompass-api")
+EXPORT_QUEUE_SIZE = 1000
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    def __init__(self, trace, name, parent_id, attributes):
+        self.trace = trace
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    @property
+    def duration_ms(self):
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace.trace_id, "span_id": self.span_id, "parent_id": self.parent_id,
+            "name": self.name, "start_ns": self.start_ns, "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3), "attributes": self.attributes, "error": self.error,
+        }
+
+
+class Trace:
+    def __init__(self, name, attributes=None):
+        self.trace_id = secrets.token_hex(16)
+        self.spans = []
+        # Threads that did work for this trace (opened a span or ran a propagate()d call)
+        self.threads = {threading.get_ident()}
+        self.lock = threading.Lock()
+        self.root = Span(self, name, None, attributes or {})
+
+    def add(self, span):
+        with self.lock:
+            self.spans.append(span)
+
+    def server_timing(self):
+        """Server-Timing header value: total plus one entry per span, in start order"""
+        entries = [f"total;dur={self.root.duration_ms:.1f}"]
+        with self.lock:
+            spans = sorted(self.spans, key=lambda s: s.start_ns)
+        for index, s in enumerate(spans):
+            # Metric names must be tokens; suffix repeats so each span stays visible
+            token = "".join(c if c.isalnum() or c in "_-." else "_" for c in s.name)
+            entries.append(f'{token}.{index};dur={s.duration_ms:.1f};desc="{s.name}"')
+        return ", ".join(entries)
+
+
+class span:
+    """Context manager for a child span of the current span (no-op outside a trace)"""
+
+    def __init__(self, name, **attributes):
+        self.name = name
+        self.attributes = attributes
+        self.span = None
+        self.token = None
+
+    def __enter__(self):
+        trace = _current_trace.get()
+        if trace is None:
+            return None
+        parent = _current_span.get() or trace.root
+        trace.threads.add(threading.get_ident())
+        self.span = Span(trace, self.name, parent.span_id, self.attributes)
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.span is None:
+            return False
+        self.span.end_ns = time.time_ns()
+        if exc is not None:
+            self.span.error = f"{exc_type.__name__}: {str(exc)[:200]}"
+        _current_span.reset(self.token)
+        self.span.trace.add(self.span)
+        return False
+
+
+def traced(name=None):
+    """Decorator wrapping a sync or async function in a span"""
+    def decorate(func):
+        span_name = name or func.__name__
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def current_span():
+    return _current_span.get()
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def current_trace_id():
+    trace = _current_trace.get()
+    return trace.trace_id if trace is not None else None
+
+
+def start_trace(name, **attributes):
+    """Begin a request trace in the current context. Returns (trace, token) for finish_trace."""
+    trace = Trace(name, attributes)
+    return trace, _current_trace.set(trace)
+
+
+def finish_trace(trace, token, **attributes):
+    trace.root.end_ns = time.time_ns()
+    trace.root.set(**attributes)
+    _current_trace.reset(token)
+    if _exporter is not None:
+        _exporter.submit(trace)
+
+
+def propagate(func):
+    """Bind func to a copy of the current context, for running it on another thread"""
+    context = contextvars.copy_context()
+    return functools.partial(context.run, _joined, func)
+
+
+def _joined(func, *args, **kwargs):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.threads.add(threading.get_ident())
+    return func(*args, **kwargs)
+
+
+# ---- Export ----
+
+def _log():
+    # Imported lazily: logger.py reads the current trace id from this module
+    try:
+        from llm.logger import get_logger
+    except ImportError:
+        from logger import get_logger
+    return get_logger(__name__)
+
+
+def _otlp_attributes(attributes):
+    converted = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            converted.append({"key": key, "value": {"boolValue": value}})
+        elif isinstance(value, int):
+            converted.append({"key": key, "value": {"intValue": str(value)}})
+        elif isinstance(value, float):
+            converted.append({"key": key, "value": {"doubleValue": value}})
+        else:
+            converted.append({"key": key, "value": {"stringValue": str(value)}})
+    return converted
+
+
+def to_otlp(traces):
+    """OTLP/HTTP JSON body (ExportTraceServiceRequest) for a batch of traces"""
+    spans = []
+    for trace in traces:
+        for s in [trace.root] + trace.spans:
+            item = {
+                "traceId": trace.trace_id, "spanId": s.span_id, "name": s.name,
+                "kind": 2 if s is trace.root else 1,  # SERVER / INTERNAL
+                "startTimeUnixNano": str(s.start_ns), "endTimeUnixNano": str(s.end_ns or s.start_ns),
+                "attributes": _otlp_attributes(s.attributes),
+                "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+            }
+            if s.parent_id:
+                item["parentSpanId"] = s.parent_id
+            spans.append(item)
+    return {"resourceSpans": [{
+        "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+        "scopeSpans": [{"scope": {"name": "llm.tracing"}, "spans": spans}],
+    }]}
+
+
+class _Exporter:
+    """Background thread draining finished traces; drops when the queue is full"""
+
+    def __init__(self, mode):
+        self.mode = mode
+        self.dropped = 0
+        self._start()
+        # serve.py preloads the app and forks workers; threads do not survive fork, so each
+        # worker starts its own (with a fresh queue: the parent's lock state is not inherited safely)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._start)
+
+    def _start(self):
+        self.queue = queue.Queue(maxsize=EXPORT_QUEUE_SIZE)
+        threading.Thread(target=self._run, name="trace-exporter", daemon=True).start()
+
+    def submit(self, trace):
+        try:
+            self.queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _drain(self):
+        batch = [self.queue.get()]
+        while len(batch) < 100:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._drain()
+            try:
+                if self.mode == "otlp":
+                    request = urllib.request.Request(
+                        f"{OTLP_ENDPOINT}/v1/traces", data=json.dumps(to_otlp(batch)).encode("utf-8"),
+                        headers={"Content-Type": "application/json"}, method="POST")
+                    urllib.request.urlopen(request, timeout=5).close()
+                else:
+                    os.makedirs(os.path.dirname(TRACE_LOG_PATH) or ".", exist_ok=True)
+                    with open(TRACE_LOG_PATH, "a", encoding="utf-8") as f:
+                        for trace in batch:
+                            for s in [trace.root] + trace.spans:
+                                f.write(json.dumps(s.to_dict(), default=str) + "\n")
+            except Exception as e:
+                _log().warning("trace export failed", mode=self.mode, error=str(e)[:100])
+
+
+_exporter = _Exporter(TRACE_EXPORT) if TRACE_EXPORT in ("json", "otlp") else None
@@ -10,53 +10,65 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 try:
     from llm.enhanced_analyzer import EnhancedCareerAnalyzer
+    from llm.prompt_builder import CONTEXT_TOKEN_BUDGET, compact_json, fit_records
+    from llm.structured_output import parse_json_text
+    from llm.trend_engine import load_positions, role_trends
+    from llm.forecasting import demand_forecast
+    from llm.logger import get_logger
 except ImportError:
     # Try relative import
     from enhanced_analyzer import EnhancedCareerAnalyzer
+    from prompt_builder import CONTEXT_TOKEN_BUDGET, compact_json, fit_records
+    from structured_output import parse_json_text
+    from trend_engine import load_positions, role_trends
+    from forecasting import demand_forecast
+    from logger import get_logger
 
-class CareerTrendAnalyzer:
-    def __init__(self):
-        self.analyzer = EnhancedCareerAnalyzer()
-        
-    # ... rest of your existing code remains the same ...
+log = get_logger(__name__)
 
 class CareerTrendAnalyzer:
-    def __init__(self):
-        self.analyzer = EnhancedCareerAnalyzer()
+    def __init__(self, analyzer=None):
+        # Pass the server's analyzer to share its AI client instead of building another
+        self.analyzer = analyzer or EnhancedCareerAnalyzer()
         
-    def analyze_career_evolution(self, target_role, years_back=10):
-        """Analyze career evolution using your merged.json dataset"""
+    def analyze_career_evolution(self, target_role, years_back=10, progress=None):
+        """Analyze career evolution using your merged.json dataset.
+        Emerging/declining skills come from the trend engine's statistics and crucial future skills
+        from the demand forecasts; the LLM narrates them.
+        progress(fraction, message) is called between stages when given (background jobs)."""
+        report = progress or (lambda fraction, message=None: None)
+        stats = forecast = None
         try:
-            # Load your merged.json dataset
-            with open('data/merged.json', 'r') as f:
-                historical_data = json.load(f)
+            report(0.05, "loading historical dataset")
+            positions = load_positions()
             
-            # Filter data for the target role and time period
-            current_year = datetime.now().year
-            relevant_data = []
+            report(0.2, "computing skill trend statistics")
+            stats = role_trends(target_role, years_back)
+            forecast = demand_forecast(target_role)
             
-            for entry in historical_data:
-                if entry['year'] >= (current_year - years_back):
-                    for position in entry['positions']:
-                        if target_role.lower() in position['position'].lower():
-                            relevant_data.append({
-                                'year': entry['year'],
-                                'position': position['position'],
-                                'skills': self._parse_skills(position['skills'])
-                            })
+            # Filter data for the target role and time period
+            report(0.3, "filtering positions")
+            min_year = datetime.now().year - years_back
+            needle = target_role.lower()
+            relevant_data = [
+                {'year': year, 'position': title, 'skills': self._parse_skills(skills)}
+                for year, title_lower, title, skills in positions
+                if year >= min_year and needle in title_lower
+            ]
             
             # Build prompt for Gemini
-            prompt = self._build_trend_prompt(target_role, relevant_data, years_back)
+            prompt = self._build_trend_prompt(target_role, relevant_data, years_back, stats)
             
             if self.analyzer.ai_client.client:
+                report(0.5, "requesting AI trend analysis")
                 analysis = self.analyzer.ai_client.analyze_with_ai(prompt)
-                return self._parse_trend_analysis(analysis, target_role)
+                return self._parse_trend_analysis(analysis, target_role, stats, forecast)
             else:
-                return self._get_fallback_trends(target_role)
+                return self._get_fallback_trends(target_role, stats, forecast)
                 
         except Exception as e:
-            print(f"❌ Trend analysis failed: {e}")
-            return self._get_fallback_trends(target_role)
+            log.error("trend analysis failed", role=target_role, error=str(e))
+            return self._get_fallback_trends(target_role, stats, forecast)
     
     def _parse_skills(self, skills_str):
         """Parse skills from string format to list"""
@@ -67,83 +79,77 @@ class CareerTrendAnalyzer:
         except:
             return []
     
-    def _build_trend_prompt(self, target_role, historical_data, years_back):
-        """Build prompt for career trend analysis"""
-        return f"""
-        Analyze the evolution of {target_role} roles over the past {years_back} years using this historical data:
-
-        HISTORICAL POSITION DATA:
-        {json.dumps(historical_data[:10], indent=2)}  # Sample of data
-
-        Provide insights on:
+    def _build_trend_prompt(self, target_role, historical_data, years_back, stats=None):
+        """Build prompt for career trend analysis (measured trend statistics when available, then
+        the newest positions within the context budget)"""
+        stats_block = ""
+        if stats and stats.get("positions"):
+            measured = {key: {item["skill"]: [item["share"], item["slope_per_year"]] for item in stats[key]}
+                        for key in ("emerging_skills", "declining_skills", "stable_skills")}
+            stats_block = f"""
+MEASURED SKILL TRENDS {stats["years"][0]}-{stats["years"][1]}, {stats["positions"]} positions
+(skill: [latest share of positions, share change per year]; treat as fact):
+{compact_json(measured)}
+"""
+        newest_first = sorted(historical_data, key=lambda r: r.get('year', 0), reverse=True)
+        sample = fit_records(newest_first, CONTEXT_TOKEN_BUDGET)
+        schema = compact_json({
+            "skill_evolution": {"emerging_skills": ["skill1", "skill2"], "declining_skills": ["skill1", "skill2"], "new_categories": ["category1", "category2"]},
+            "role_transformation": {"added_responsibilities": ["resp1", "resp2"], "obsolete_tasks": ["task1", "task2"], "evolution_summary": "Brief description"},
+            "future_predictions": {"crucial_skills": ["skill1", "skill2"], "emerging_tech": ["tech1", "tech2"], "ai_impact": "How AI is changing this role"},
+            "career_advice": {"top_skills": ["skill1", "skill2", "skill3"], "learning_path": "Recommended approach", "project_ideas": ["idea1", "idea2"]},
+        })
+        return f"""Analyze the evolution of {target_role} roles over the past {years_back} years.
+{stats_block}
+HISTORICAL POSITION DATA ({len(sample)} of {len(historical_data)} positions, newest first):
+{compact_json(sample)}
 
-        1. SKILL EVOLUTION:
-           - Which technical skills have emerged as most important?
-           - Which skills have declined in importance?
-           - New skill categories that didn't exist {years_back} years ago
+Cover: 1) skill evolution - emerged, declined (use the measured trends when given), and categories that did not exist {years_back} years ago;
+2) role transformation - how {target_role} evolved, added and obsolete responsibilities;
+3) future predictions - crucial skills for the next 2-3 years, technologies to watch, AI/automation impact;
+4) career advice - most valuable skills now, certifications/education, portfolio project ideas.
 
-        2. ROLE TRANSFORMATION:
-           - How has the {target_role} role evolved?
-           - New responsibilities that have been added
-           - Obsolete responsibilities
-
-        3. FUTURE PREDICTIONS:
-           - Skills that will be crucial in the next 2-3 years
-           - Emerging technologies to watch
-           - How AI/automation is changing this role
-
-        4. CAREER ADVICE:
-           - Most valuable skills to learn now
-           - Certifications or education paths
-           - Portfolio project ideas
-
-        Return as JSON:
-        {{
-            "skill_evolution": {{
-                "emerging_skills": ["skill1", "skill2"],
-                "declining_skills": ["skill1", "skill2"],
-                "new_categories": ["category1", "category2"]
-            }},
-            "role_transformation": {{
-                "added_responsibilities": ["resp1", "resp2"],
-                "obsolete_tasks": ["task1", "task2"],
-                "evolution_summary": "Brief description"
-            }},
-            "future_predictions": {{
-                "crucial_skills": ["skill1", "skill2"],
-                "emerging_tech": ["tech1", "tech2"],
-                "ai_impact": "How AI is changing this role"
-            }},
-            "career_advice": {{
-                "top_skills": ["skill1", "skill2", "skill3"],
-                "learning_path": "Recommended approach",
-                "project_ideas": ["idea1", "idea2"]
-            }}
-        }}
-        """
+Return ONLY JSON with this structure:
+{schema}"""
     
-    def _parse_trend_analysis(self, analysis_text, target_role):
+    def _parse_trend_analysis(self, analysis_text, target_role, stats=None, forecast=None):
         """Parse the trend analysis response"""
         try:
-            analysis_text = analysis_text.strip()
-            if analysis_text.startswith('```json'):
-                analysis_text = analysis_text[7:]
-            if analysis_text.endswith('```'):
-                analysis_text = analysis_text[:-3]
-            
-            analysis_data = json.loads(analysis_text)
+            # Fences, trailing commas and truncated output are repaired locally
+            analysis_data, _ = parse_json_text(analysis_text)
+            if not isinstance(analysis_data, dict):
+                raise ValueError("response is not a JSON object")
             analysis_data["analysis_timestamp"] = datetime.now().isoformat()
             analysis_data["target_role"] = target_role
             analysis_data["source"] = "Gemini 2.5 Flash + Historical Dataset"
+            self._apply_trend_stats(analysis_data, stats, forecast)
             
             return analysis_data
         except Exception as e:
-            print(f"❌ Trend analysis parsing failed: {e}")
-            return self._get_fallback_trends(target_role)
+            log.warning("trend analysis parsing failed", role=target_role, error=str(e))
+            return self._get_fallback_trends(target_role, stats, forecast)
+    
+    def _apply_trend_stats(self, analysis_data, stats, forecast=None):
+        """Replace the model's emerging/declining lists with the measured ones and its crucial
+        skills with the forecast most common ones"""
+        if forecast is not None:
+            predictions = analysis_data.get("future_predictions")
+            if not isinstance(predictions, dict):
+                predictions = analysis_data["future_predictions"] = {}
+            predictions["crucial_skills"] = [item["skill"] for item in forecast["skills"]]
+            analysis_data["demand_forecast"] = forecast
+        if not stats or not stats.get("positions"):
+            return
+        evolution = analysis_data.get("skill_evolution")
+        if not isinstance(evolution, dict):
+            evolution = analysis_data["skill_evolution"] = {}
+        evolution["emerging_skills"] = [item["skill"] for item in stats["emerging_skills"]]
+        evolution["declining_skills"] = [item["skill"] for item in stats["declining_skills"]]
+        analysis_data["trend_statistics"] = stats
     
-    def _get_fallback_trends(self, target_role):
-        """Fallback trend analysis"""
-        return {
+    def _get_fallback_trends(self, target_role, stats=None, forecast=None):
+        """Fallback trend analysis (measured skill trends when the dataset has them)"""
+        fallback = {
             "skill_evolution": {
                 "emerging_skills": ["AI/ML", "Cloud Computing", "Data Engineering"],
                 "declining_skills": ["Manual Reporting", "Traditional ETL"],
@@ -167,4 +173,6 @@ class CareerTrendAnalyzer:
             "target_role": target_role,
             "analysis_timestamp": datetime.now().isoformat(),
             "source": "Fallback Analysis"
-        }
\ No newline at end of file
+        }
+        self._apply_trend_stats(fallback, stats, forecast)
+        return fallback
\ No newline at end of file
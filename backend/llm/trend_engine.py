@@ -0,0 +1,231 @@
+# llm/trend_engine.py
+"""
+Statistical skill-trend engine over the historical positions in merged.json.
+
+The dataset is reduced once to sparse (title, year, skill) mention counts,
+sorted by title (CSR), plus a dense positions-per-(title, year) table. A role
+query selects the titles containing the role name and sums their rows with
+one bincount into a dense year x skill matrix, so any role, not only the known
+ones, is answered in milliseconds.
+
+For a window of years, each skill's yearly share (positions mentioning it /
+positions that year) is fitted against the year by weighted least squares,
+all skills at once. Weights come from the binomial sampling variance of a
+share, N_y / (p(1 - p)), which gives each slope a standard error and z-score
+even for short windows. Skills are then classified:
+  emerging     significant positive slope and relative growth above the floor
+  declining    significant negative slope and relative decline above the floor
+  stable core  widely held (mean share >= STABLE_CORE_SHARE) and not trending
+Windows end at the dataset's latest year, so results depend only on the data.
+"""
+import json
+import os
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    from llm.shared_data import parse_skill_list
+    from llm.logger import get_logger
+except ImportError:
+    from shared_data import parse_skill_list
+    from logger import get_logger
+
+log = get_logger(__name__)
+
+MERGED_JSON_PATH = 'data/merged.json'
+
+TOP_SKILLS = 10
+# Years with fewer positions for the role are left out of the fit
+MIN_YEAR_POSITIONS = 5
+# A skill needs this many mentions in the window to be tested at all
+MIN_SKILL_MENTIONS = 5
+Z_CRITICAL = 1.96  # two-sided 5%
+# Relative change per year (slope / mean share) a significant trend must also reach
+MIN_RELATIVE_GROWTH = 0.03
+STABLE_CORE_SHARE = 0.2
+
+_history_cache = {}
+_history_lock = threading.Lock()
+
+
+def load_positions(path=MERGED_JSON_PATH):
+    """merged.json flattened to (year, lowercased title, title, raw skills) tuples.
+    Parsed once per process and reused until the file changes (size/mtime)."""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _history_lock:
+        cached = _history_cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        with open(path, 'r') as f:
+            historical_data = json.load(f)
+        positions = [(entry['year'], position['position'].lower(), position['position'], position['skills'])
+                     for entry in historical_data for position in entry['positions']]
+        _history_cache[path] = (key, positions)
+        log.info("loaded historical positions", positions=len(positions), source=path)
+        return positions
+
+
+def split_skills(value):
+    """Fast path for the "['a', 'b']" strings merged.json stores; anything unusual goes through
+    parse_skill_list"""
+    if isinstance(value, list):
+        return value
+    if value.startswith("['") and value.endswith("']") and "\\" not in value and '"' not in value:
+        return value[2:-2].split("', '")
+    return parse_skill_list(value)
+
+
+class TrendEngine:
+    def __init__(self, positions):
+        years = np.fromiter((p[0] for p in positions), dtype=np.int64, count=len(positions))
+        self.first_year = int(years.min()) if len(years) else 0
+        self.last_year = int(years.max()) if len(years) else 0
+        n_years = self.last_year - self.first_year + 1
+
+        title_codes, self.titles = {}, []
+        skill_codes, self.skills = {}, []
+        position_title = np.empty(len(positions), dtype=np.int64)
+        mention_position, mention_skill = [], []
+        for i, (_, title_lower, _, raw) in enumerate(positions):
+            code = title_codes.get(title_lower)
+            if code is None:
+                code = title_codes[title_lower] = len(self.titles)
+                self.titles.append(title_lower)
+            position_title[i] = code
+            for skill in {s.strip().lower() for s in split_skills(raw)}:
+                if not skill:
+                    continue
+                skill_code = skill_codes.get(skill)
+                if skill_code is None:
+                    skill_code = skill_codes[skill] = len(self.skills)
+                    self.skills.append(skill)
+                mention_position.append(i)
+                mention_skill.append(skill_code)
+        self.skill_index = skill_codes
+        n_titles, n_skills = len(self.titles), len(self.skills)
+        self.n_years, self.n_skills = n_years, n_skills
+
+        # Positions per (title, year)
+        year_offset = years - self.first_year
+        self.title_year_positions = np.bincount(position_title * n_years + year_offset,
+                                                minlength=n_titles * n_years).reshape(n_titles, n_years)
+        self.year_positions = self.title_year_positions.sum(axis=0)
+
+        # Mention counts per (title, year, skill): unique keys sorted by title give CSR rows per title
+        mention_position = np.asarray(mention_position, dtype=np.int64)
+        keys = ((position_title[mention_position] * n_years + year_offset[mention_position]) * n_skills
+                + np.asarray(mention_skill, dtype=np.int64))
+        keys, counts = np.unique(keys, return_counts=True)
+        entry_title = keys // (n_years * n_skills)
+        self.entry_cell = keys % (n_years * n_skills)  # year_offset * n_skills + skill
+        self.entry_count = counts
+        self.title_offsets = np.searchsorted(entry_title, np.arange(n_titles + 1))
+        self.role_counts = lru_cache(maxsize=256)(self._role_counts)
+        self.role_trends = lru_cache(maxsize=1024)(self._role_trends)
+        log.info("trend engine ready", positions=len(positions), titles=n_titles, skills=n_skills,
+                 years=f"{self.first_year}-{self.last_year}", cells=len(keys))
+
+    def _role_counts(self, role):
+        """(positions per year, year x skill mention counts) over titles containing role"""
+        needle = role.strip().lower()
+        matched = [i for i, title in enumerate(self.titles) if needle in title]
+        if not matched:
+            return np.zeros(self.n_years, dtype=np.int64), np.zeros((self.n_years, self.n_skills), dtype=np.int64)
+        positions = self.title_year_positions[matched].sum(axis=0)
+        rows = np.concatenate([np.arange(self.title_offsets[i], self.title_offsets[i + 1]) for i in matched])
+        cells = np.bincount(self.entry_cell[rows], weights=self.entry_count[rows],
+                            minlength=self.n_years * self.n_skills)
+        return positions, cells.reshape(self.n_years, self.n_skills).astype(np.int64)
+
+    def fit(self, role, years_back):
+        """Vectorized weighted least squares of share on year for every skill.
+        Returns None when the role has too little data in the window."""
+        positions, counts = self.role_counts(role)
+        start = max(0, self.n_years - int(years_back))
+        years = np.arange(self.first_year, self.last_year + 1)[start:]
+        n, c = positions[start:], counts[start:]
+        keep = n >= MIN_YEAR_POSITIONS
+        if keep.sum() < 2:
+            return None
+        years, n, c = years[keep], n[keep].astype(np.float64), c[keep].astype(np.float64)
+        shares = c / n[:, None]                                      # (years, skills)
+        mean_share = c.sum(axis=0) / n.sum()                         # pooled share per skill
+        variance = np.clip(mean_share * (1 - mean_share), 1e-9, None)
+        weights = n[:, None] / variance                              # binomial precision per cell
+        x = years[:, None].astype(np.float64)
+        x_bar = (weights * x).sum(axis=0) / weights.sum(axis=0)
+        dx = x - x_bar
+        sxx = (weights * dx * dx).sum(axis=0)
+        y_bar = (weights * shares).sum(axis=0) / weights.sum(axis=0)
+        slope = (weights * dx * (shares - y_bar)).sum(axis=0) / sxx
+        z = slope * np.sqrt(sxx)                                     # slope / standard error
+        return {
+            "years": years, "positions": n, "shares": shares, "mentions": c.sum(axis=0),
+            "mean_share": mean_share, "slope": slope, "z": z,
+            "relative_growth": np.where(mean_share > 0, slope / np.maximum(mean_share, 1e-12), 0.0),
+        }
+
+    def _role_trends(self, role, years_back):
+        """Ranked emerging, declining and stable-core skills for role over the last years_back years"""
+        result = {"role": role, "analysis_period": f"Last {years_back} years",
+                  "analysis_source": "dataset_statistics"}
+        fit = self.fit(role, years_back)
+        if fit is None:
+            result["positions"] = 0
+            return result
+        tested = fit["mentions"] >= MIN_SKILL_MENTIONS
+        significant = tested & (np.abs(fit["z"]) >= Z_CRITICAL) & (np.abs(fit["relative_growth"]) >= MIN_RELATIVE_GROWTH)
+        emerging = np.flatnonzero(significant & (fit["slope"] > 0))
+        declining = np.flatnonzero(significant & (fit["slope"] < 0))
+        stable = np.flatnonzero(tested & ~significant & (fit["mean_share"] >= STABLE_CORE_SHARE))
+        top = np.flatnonzero(tested)[np.argsort(-fit["mean_share"][tested], kind="stable")][:TOP_SKILLS]
+
+        def describe(indices):
+            return [{
+                "skill": self.skills[i],
+                "share": round(float(fit["shares"][-1, i]), 4),
+                "mean_share": round(float(fit["mean_share"][i]), 4),
+                "slope_per_year": round(float(fit["slope"][i]), 5),
+                "relative_growth": round(float(fit["relative_growth"][i]), 4),
+                "z": round(float(fit["z"][i]), 2),
+            } for i in indices]
+
+        result.update({
+            "years": [int(fit["years"][0]), int(fit["years"][-1])],
+            "positions": int(fit["positions"].sum()),
+            "positions_per_year": {str(int(y)): int(p) for y, p in zip(fit["years"], fit["positions"])},
+            "top_skills": [{"skill": self.skills[i], "share": round(float(fit["mean_share"][i]), 4)} for i in top],
+            "emerging_skills": describe(emerging[np.argsort(-fit["slope"][emerging], kind="stable")][:TOP_SKILLS]),
+            "declining_skills": describe(declining[np.argsort(fit["slope"][declining], kind="stable")][:TOP_SKILLS]),
+            "stable_skills": describe(stable[np.argsort(-fit["mean_share"][stable], kind="stable")][:TOP_SKILLS]),
+        })
+        return result
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine(path=MERGED_JSON_PATH):
+    """Engine for the dataset currently on disk (rebuilt when it changes); None without a dataset"""
+    global _engine
+    if not os.path.exists(path):
+        return None
+    positions = load_positions(path)
+    with _engine_lock:
+        if _engine is None or _engine[0] is not positions:
+            _engine = (positions, TrendEngine(positions))
+        return _engine[1]
+
+
+def role_trends(role, years_back, path=MERGED_JSON_PATH):
+    """Trend statistics for role, or None when no dataset is available"""
+    try:
+        engine = get_engine(path)
+    except (OSError, ValueError, KeyError) as e:
+        log.warning("trend engine unavailable", error=str(e))
+        return None
+    return engine.role_trends(role, int(years_back)) if engine is not None else None
@@ -0,0 +1,263 @@
+# llm/trend_snapshots.py
+"""
+Precomputed trend snapshots per (role, years_back), served as keyed reads.
+
+Trend statistics change only when the historical dataset (merged.json)
+changes, so they are computed for every known role and the common years_back
+values from one trend engine over the dataset and written to a versioned directory:
+
+  data/trend_snapshots/<dataset version>-e<engine version>/
+      manifest.json   dataset fingerprint, roles, years_back values, build time
+      trends.json     {"<role>|<years_back>": skill evolution payload}
+
+A payload is what /career/analyze-trends serves as "trends" (see
+skill_evolution): measured emerging/declining/core skills, demand forecast
+predictions, and the raw trend statistics under "trend_statistics".
+
+The dataset version is a content hash of merged.json (recomputed only when its
+size or mtime changes), so a new dataset invalidates the old snapshots and an
+engine change (TREND_ENGINE_VERSION) does too. Readers never see a
+half-written snapshot: it is built in a temp dir and renamed into place.
+
+Build ahead of time (serve.py does this before forking workers, or run it
+from cron after a dataset refresh):
+  cd backend
+  python llm/trend_snapshots.py --years 3 5 10
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from llm.trend_engine import MERGED_JSON_PATH, get_engine, role_trends
+    from llm.forecasting import ForecastStore, demand_forecast
+    from llm.logger import get_logger
+except ImportError:
+    from trend_engine import MERGED_JSON_PATH, get_engine, role_trends
+    from forecasting import ForecastStore, demand_forecast
+    from logger import get_logger
+
+log = get_logger(__name__)
+
+SNAPSHOT_ROOT = os.getenv("TREND_SNAPSHOT_DIR", "data/trend_snapshots")
+# Bump when the computed payload changes shape or method
+TREND_ENGINE_VERSION = 3
+KNOWN_ROLES = ["Data Analyst", "Data Scientist", "Software Engineer", "Machine Learning Engineer", "Business Analyst"]
+YEARS_BACK_VALUES = (3, 5, 10)
+
+_version_cache = {}
+_version_lock = threading.Lock()
+
+
+def dataset_version(path=MERGED_JSON_PATH):
+    """Content hash of the dataset; re-hashed only when its size or mtime changes"""
+    stat = os.stat(path)
+    fingerprint = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _version_lock:
+        cached = _version_cache.get(path)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        digest = hashlib.blake2b(digest_size=8)
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        version = digest.hexdigest()
+        _version_cache[path] = (fingerprint, version)
+        return version
+
+
+def snapshot_dir(version, root=SNAPSHOT_ROOT):
+    return os.path.join(root, f"{version}-e{TREND_ENGINE_VERSION}")
+
+
+def snapshot_key(role, years_back):
+    return f"{role.strip().lower()}|{int(years_back)}"
+
+
+def skill_evolution(stats, years_back, forecast):
+    """Skill evolution payload from a role's measured trends (llm/trend_engine.py) and its
+    demand forecast (llm/forecasting.py). salary_impact is left for the analyzer to narrate."""
+    return {
+        "emerging_skills": [dict(item, growth=f"{item['slope_per_year'] * 100:+.1f} pts/year, now in {item['share']:.0%} of postings",
+                                 impact=_growth_label(item["relative_growth"])) for item in stats["emerging_skills"]],
+        "declining_skills": [dict(item, reason=f"share of postings falling {abs(item['slope_per_year']) * 100:.1f} pts/year, now {item['share']:.0%}")
+                             for item in stats["declining_skills"]],
+        "core_skills": [item["skill"] for item in stats["stable_skills"]],
+        "future_predictions": _forecast_predictions(forecast),
+        "salary_impact": None,
+        "years": stats["years"],
+        "positions": stats["positions"],
+        "role": stats["role"],
+        "analysis_period": f"Last {years_back} years",
+        "analysis_source": "dataset_statistics",
+        "trend_statistics": stats,
+    }
+
+
+def role_evolution(role, years_back):
+    """skill_evolution for role from the shared trend engine; None when the role has no postings"""
+    stats = role_trends(role, years_back)
+    if stats is None or not stats.get("positions"):
+        return None
+    return skill_evolution(stats, years_back, demand_forecast(role))
+
+
+def _growth_label(relative_growth):
+    growth = abs(relative_growth)
+    return "High" if growth >= 0.15 else "Medium" if growth >= 0.07 else "Low"
+
+
+def _forecast_predictions(forecast, limit=5):
+    """Skills whose share of the role's postings is forecast to rise most, with intervals"""
+    if forecast is None:
+        return []
+    predictions = []
+    for item in forecast["rising_skills"][:limit]:
+        final = item["forecast"][-1]
+        years = len(item["forecast"])
+        predictions.append({
+            "skill": item["skill"],
+            "timeline": f"by {final['year']}",
+            "impact": _growth_label(item["change"] / max(item["share"], 1e-6) / years),
+            "share": item["share"],
+            "forecast": item["forecast"],
+        })
+    return predictions
+
+
+def compute_trends(engine, roles=KNOWN_ROLES, years_back_values=YEARS_BACK_VALUES, forecast=demand_forecast):
+    """{snapshot_key: skill_evolution payload} for every role and window (None for roles without
+    postings). Windows end at the dataset's latest year, so a snapshot depends only on the data."""
+    trends = {}
+    for role in roles:
+        forecasts = None
+        for years_back in years_back_values:
+            stats = engine.role_trends(role, years_back)
+            if stats is None or not stats.get("positions"):
+                trends[snapshot_key(role, years_back)] = None
+                continue
+            if forecasts is None:
+                forecasts = forecast(role)
+            trends[snapshot_key(role, years_back)] = skill_evolution(stats, years_back, forecasts)
+    return trends
+
+
+def build_snapshots(path=MERGED_JSON_PATH, root=SNAPSHOT_ROOT, roles=KNOWN_ROLES,
+                    years_back_values=YEARS_BACK_VALUES):
+    """Compute and atomically publish the snapshot for the current dataset; returns its directory"""
+    version = dataset_version(path)
+    out_dir = snapshot_dir(version, root)
+    started = time.perf_counter()
+    forecast = demand_forecast if path == MERGED_JSON_PATH else ForecastStore(path).forecast
+    trends = compute_trends(get_engine(path), roles, years_back_values, forecast)
+    os.makedirs(root, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=".building-", dir=root)
+    try:
+        with open(os.path.join(tmp_dir, "trends.json"), "w") as f:
+            json.dump(trends, f)
+        manifest = {
+            "dataset_version": version,
+            "engine_version": TREND_ENGINE_VERSION,
+            "source": os.path.abspath(path),
+            "roles": list(roles),
+            "years_back": list(years_back_values),
+            "built_at": time.time(),
+        }
+        with open(os.path.join(tmp_dir, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+        if os.path.exists(out_dir):
+            shutil.rmtree(out_dir)
+        os.replace(tmp_dir, out_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    _prune(root, keep=os.path.basename(out_dir))
+    log.info("built trend snapshots", version=version, entries=len(trends), path=out_dir,
+             seconds=round(time.perf_counter() - started, 2))
+    return out_dir
+
+
+def _prune(root, keep):
+    """Remove snapshots of older datasets/engines (readers only open the current one)"""
+    for name in os.listdir(root):
+        if name != keep and not name.startswith("."):
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+def ensure_snapshots(path=MERGED_JSON_PATH, root=SNAPSHOT_ROOT):
+    """Build the snapshot for the current dataset unless it already exists"""
+    out_dir = snapshot_dir(dataset_version(path), root)
+    if os.path.exists(os.path.join(out_dir, "manifest.json")):
+        return out_dir
+    return build_snapshots(path, root)
+
+
+class TrendSnapshotStore:
+    """Keyed reads of the snapshot matching the dataset currently on disk"""
+
+    def __init__(self, path=MERGED_JSON_PATH, root=SNAPSHOT_ROOT):
+        self.path = path
+        self.root = root
+        self.loaded = None  # (snapshot dir, manifest, trends)
+        self.lock = threading.Lock()
+
+    def current_dir(self):
+        """Directory the current dataset's snapshot lives (or would live) in; None without a dataset"""
+        if not os.path.exists(self.path):
+            return None
+        return snapshot_dir(dataset_version(self.path), self.root)
+
+    def _load(self):
+        out_dir = self.current_dir()
+        if out_dir is None:
+            return None
+        with self.lock:
+            if self.loaded is not None and self.loaded[0] == out_dir:
+                return self.loaded
+            try:
+                with open(os.path.join(out_dir, "manifest.json"), "r") as f:
+                    manifest = json.load(f)
+                with open(os.path.join(out_dir, "trends.json"), "r") as f:
+                    trends = json.load(f)
+            except (OSError, ValueError):
+                return None  # not built for this dataset (yet)
+            self.loaded = (out_dir, manifest, trends)
+            log.info("trend snapshot loaded", version=manifest["dataset_version"], entries=len(trends))
+            return self.loaded
+
+    def get(self, role, years_back):
+        """(payload, manifest) for the current dataset, or (None, None) when not precomputed"""
+        loaded = self._load()
+        if loaded is None:
+            return None, None
+        payload = loaded[2].get(snapshot_key(role, years_back))
+        return (payload, loaded[1]) if payload is not None else (None, None)
+
+    def stale_dir(self):
+        """Snapshot directory of the current dataset when it has not been built yet, else None"""
+        out_dir = self.current_dir()
+        if out_dir is None or os.path.exists(os.path.join(out_dir, "manifest.json")):
+            return None
+        return out_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute trend snapshots for every known role")
+    parser.add_argument("--data", default=MERGED_JSON_PATH)
+    parser.add_argument("--out", default=SNAPSHOT_ROOT)
+    parser.add_argument("--roles", nargs="+", default=KNOWN_ROLES)
+    parser.add_argument("--years", nargs="+", type=int, default=list(YEARS_BACK_VALUES))
+    args = parser.parse_args()
+    print(build_snapshots(args.data, args.out, args.roles, args.years))
+
+
+if __name__ == "__main__":
+    main()
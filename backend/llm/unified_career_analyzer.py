@@ -11,8 +11,14 @@ from enhanced_analyzer import EnhancedCareerAnalyzer
 
 try:
     from .enhanced_analyzer import EnhancedCareerAnalyzer
+    from .prompt_builder import RESUME_TOKEN_BUDGET, compact_json, estimate_tokens, fit_resume
+    from .logger import get_logger
 except ImportError:
     from enhanced_analyzer import EnhancedCareerAnalyzer
+    from prompt_builder import RESUME_TOKEN_BUDGET, compact_json, estimate_tokens, fit_resume
+    from logger import get_logger
+
+log = get_logger(__name__)
 
 class UnifiedCareerAnalyzer:
     def __init__(self):
@@ -20,24 +26,22 @@ class UnifiedCareerAnalyzer:
         self.merged_data = self.load_processed_data()
         self.analysis_data = self.load_analysis_data()
         
-        print(f"🚀 Unified Career Analyzer Ready!")
-        print(f"📊 Loaded {len(self.merged_data):,} position records")
-        print(f"📅 Data spans {self.analysis_data['year_range'][0]} to {self.analysis_data['year_range'][1]}")
-        print(f"🔧 {len(self.analysis_data['skill_counts'])} meaningful skills identified")
-        
-        # Show top skills
         top_skills = list(self.analysis_data['skill_counts'].keys())[:10]
-        print(f"🏆 Top skills: {', '.join(top_skills)}")
+        log.info("unified career analyzer ready",
+                 positions=len(self.merged_data),
+                 years=f"{self.analysis_data['year_range'][0]}-{self.analysis_data['year_range'][1]}",
+                 skills=len(self.analysis_data['skill_counts']),
+                 top_skills=",".join(top_skills))
     
     def load_processed_data(self):
         """Load the fixed processed data"""
         try:
             # Try fixed data first, fall back to original
             df = pd.read_csv('data/merged_processed_fixed.csv')
-            print("✅ Loaded fixed processed data")
+            log.info("loaded processed data", source="merged_processed_fixed.csv")
         except:
             df = pd.read_csv('data/merged_processed.csv')
-            print("✅ Loaded original processed data")
+            log.info("loaded processed data", source="merged_processed.csv")
         return df
     
     def load_analysis_data(self):
@@ -46,26 +50,16 @@ class UnifiedCareerAnalyzer:
             # Try fixed analysis first, fall back to original
             with open('data/merged_analysis_fixed.json', 'r') as f:
                 analysis = json.load(f)
-            print("✅ Loaded fixed analysis data")
+            log.info("loaded analysis data", source="merged_analysis_fixed.json")
         except:
             with open('data/merged_analysis.json', 'r') as f:
                 analysis = json.load(f)
-            print("✅ Loaded original analysis data")
+            log.info("loaded analysis data", source="merged_analysis.json")
         return analysis
     
-    def convert_numpy_types(self, obj):
-        """Convert numpy types to native Python types for display"""
-        if isinstance(obj, list):
-            return [int(item) if hasattr(item, 'item') else item for item in obj]
-        elif hasattr(obj, 'item'):
-            return obj.item()
-        elif isinstance(obj, dict):
-            return {str(k): self.convert_numpy_types(v) for k, v in obj.items()}
-        return obj
-    
     def get_role_insights(self, target_role):
         """Get comprehensive insights for a specific role"""
-        print(f"🔍 Analyzing historical data for {target_role}...")
+        log.debug("analyzing historical data", role=target_role)
         
         # Filter for the target role
         role_data = self.merged_data[
@@ -102,7 +96,10 @@ class UnifiedCareerAnalyzer:
         
         # Yearly evolution (only recent years for relevance)
         yearly_evolution = {}
-        recent_years = sorted([year for year in role_data['year'].unique() if year >= 2010])  # Only years from 2010+
+        # .tolist() hands back native ints in one vectorized step; the API's orjson
+        # response class serializes any remaining NumPy values natively.
+        years_covered = np.sort(role_data['year'].unique()).tolist()
+        recent_years = [year for year in years_covered if year >= 2010]  # Only years from 2010+
         
         for year in recent_years[-5:]:  # Last 5 years only
             year_skills = []
@@ -129,18 +126,15 @@ class UnifiedCareerAnalyzer:
                     'top_skills': dict(Counter(year_skills).most_common(10))
                 }
         
-        # Convert numpy types to native Python types
-        recent_years_clean = self.convert_numpy_types(recent_years[-5:]) if recent_years else []
-        
         return {
             'role': target_role,
             'total_historical_positions': len(role_data),
-            'years_covered': self.convert_numpy_types(sorted(role_data['year'].unique())),
-            'recent_years_analyzed': recent_years_clean,
+            'years_covered': years_covered,
+            'recent_years_analyzed': recent_years[-5:],
             'most_common_skills': dict(skill_counts.most_common(15)),
             'skill_evolution': yearly_evolution,
-            'experience_distribution': self.convert_numpy_types(role_data['experience_level'].value_counts().to_dict()),
-            'industry_distribution': self.convert_numpy_types(role_data['industry'].value_counts().to_dict())
+            'experience_distribution': role_data['experience_level'].value_counts().to_dict(),
+            'industry_distribution': role_data['industry'].value_counts().to_dict()
         }
     
     def enhanced_career_analysis(self, resume_text, user_skills, target_role, experience_level="Intermediate", industry="Technology"):
@@ -185,29 +179,28 @@ class UnifiedCareerAnalyzer:
             recent_year = max(skill_evolution.keys())
             recent_skills = list(skill_evolution[recent_year].get('top_skills', {}).keys())[:5]
         
-        return f"""
-        CAREER ANALYSIS WITH HISTORICAL MARKET DATA (Based on {len(self.merged_data):,} positions since {self.analysis_data['year_range'][0]})
-
-        RESUME:
-        {resume_text[:2000]}
-
-        USER PROFILE:
-        - Skills: {user_skills}
-        - Target Role: {target_role}
-        - Experience Level: {experience_level}
-        - Industry: {industry}
-
-        HISTORICAL MARKET INSIGHTS (from {total_positions} real {target_role} positions):
-        - Most common skills: {common_skills}
-        - Recent trending skills ({recent_years}): {recent_skills}
-        - Data spans {len(years_data)} years ({min(years_data)}-{max(years_data)})
-        - Based on real position data from {total_positions} historical roles
-
-        Provide SPECIFIC, ACTIONABLE career advice that considers these real-world market patterns.
-        Focus on skills that are actually in demand based on historical data.
-        Consider how this role has evolved over time and what skills are most valuable today.
-        Tailor recommendations for {experience_level} level in the {industry} industry.
-        """
+        context = compact_json({
+            "positions_analyzed": total_positions,
+            "common_skills": common_skills,
+            "recent_trending_skills": {"years": recent_years, "skills": recent_skills},
+            "years_span": [min(years_data), max(years_data)] if years_data else [],
+        })
+        header = (
+            f"CAREER ANALYSIS WITH HISTORICAL MARKET DATA (based on {len(self.merged_data):,} positions "
+            f"since {self.analysis_data['year_range'][0]})\n"
+            f"USER PROFILE: skills {user_skills}; target role {target_role}; "
+            f"experience level {experience_level}; industry {industry}\n"
+            f"HISTORICAL MARKET INSIGHTS for {target_role}: {context}\n"
+            "Give SPECIFIC, ACTIONABLE advice grounded in these real market patterns: prioritise skills "
+            "that are in demand today, note how the role has evolved, and tailor to the experience level and industry.\n"
+            "RESUME:\n"
+        )
+        # The analyzer budgets this whole block as its resume excerpt, so the resume
+        # gets whatever is left after the (compact) historical context and the
+        # block passes through the analyzer's own budgeting untouched
+        resume_budget = max(RESUME_TOKEN_BUDGET - estimate_tokens(header), 0)
+        keywords = list(user_skills) + common_skills + target_role.lower().split()
+        return header + fit_resume(resume_text, keywords, resume_budget)
     
     def get_available_roles(self):
         """Get list of available roles with data counts"""
@@ -239,7 +232,7 @@ class UnifiedCareerAnalyzer:
                     skills_list = eval(skills)
                     if skill_name.lower() in [s.lower() for s in skills_list if isinstance(s, str)]:
                         skill_occurrences.append({
-                            'year': row['year'],
+                            'year': int(row['year']),  # used as a dict key below
                             'position': row['position_title'],
                             'industry': row['industry']
                         })
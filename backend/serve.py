@@ -0,0 +1,117 @@
+"""
+Production launcher for server:app with many workers per host.
+
+Memory stays flat as workers are added because:
+  1. cleaned_resumes.csv is converted once into a memory-mapped snapshot
+     (llm/shared_data.py); every worker maps the same pages instead of
+     building its own pandas DataFrame.
+  2. Under gunicorn the app is preloaded in the master process, so spaCy and
+     EnhancedCareerAnalyzer are built once and inherited copy-on-write by the
+     forked workers. gc.freeze() before each fork keeps the garbage collector
+     from touching (and therefore copying) those inherited objects.
+
+Trend snapshots and the skill co-occurrence graph for data/merged.json
+(llm/trend_snapshots.py, llm/skill_graph.py) are also built here, once, before
+any worker starts.
+
+Run with:
+  cd backend
+  python serve.py --workers 8 --port 8000
+
+Without gunicorn installed (e.g. Windows) it falls back to uvicorn's own
+multi-process mode, which still shares the mmapped snapshot but loads the
+models once per worker.
+"""
+import argparse
+import gc
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from llm.shared_data import build_snapshot, snapshot_is_fresh
+from llm.trend_snapshots import ensure_snapshots
+from llm.skill_graph import ensure_graph
+
+MERGED_JSON_PATH = "data/merged.json"
+RESUME_CSV_PATHS = [
+    "data/cleaned_resumes.csv",
+    "../data/cleaned_resumes.csv",
+]
+DEFAULT_SNAPSHOT_DIR = "data/shared/resumes"
+
+
+def prepare_shared_data(snapshot_dir):
+    """Build (or reuse) the mmapped snapshot and point workers at it"""
+    csv_path = next((p for p in RESUME_CSV_PATHS if os.path.exists(p)), None)
+    if csv_path is None:
+        print("⚠️ cleaned_resumes.csv not found - workers will start without resume data")
+        return
+    if snapshot_is_fresh(csv_path, snapshot_dir):
+        print(f"✅ Shared snapshot {snapshot_dir} is up to date")
+    else:
+        build_snapshot(csv_path, snapshot_dir)
+    os.environ["CAREER_SHARED_DATA_DIR"] = os.path.abspath(snapshot_dir)
+
+
+def prepare_trend_snapshots():
+    """Precompute trend snapshots and the skill graph for the current dataset so workers start
+    with keyed reads"""
+    if not os.path.exists(MERGED_JSON_PATH):
+        print("⚠️ merged.json not found - trend endpoints will use live analysis")
+        return
+    print(f"✅ Trend snapshots in {ensure_snapshots(MERGED_JSON_PATH)}")
+    print(f"✅ Skill graph in {ensure_graph(MERGED_JSON_PATH)}")
+
+
+def run_gunicorn(args):
+    from gunicorn.app.base import BaseApplication
+
+    class CareerApplication(BaseApplication):
+        def load_config(self):
+            options = {
+                "bind": f"{args.host}:{args.port}",
+                "workers": args.workers,
+                "worker_class": "uvicorn.workers.UvicornWorker",
+                "preload_app": True,
+                "timeout": args.timeout,
+                "pre_fork": lambda server, worker: gc.freeze(),
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from server import app
+            return app
+
+    CareerApplication().run()
+
+
+def run_uvicorn(args):
+    import uvicorn
+    uvicorn.run("server:app", host=args.host, port=args.port, workers=args.workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the CareerCompass API with shared read-only data")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--timeout", type=int, default=120)
+    parser.add_argument("--snapshot-dir", default=DEFAULT_SNAPSHOT_DIR)
+    args = parser.parse_args()
+
+    prepare_shared_data(args.snapshot_dir)
+    prepare_trend_snapshots()
+
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        print("⚠️ gunicorn not installed - falling back to uvicorn workers (no copy-on-write preload)")
+        run_uvicorn(args)
+        return
+    run_gunicorn(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,35 @@
-from fastapi import FastAPI
+import asyncio
+import hmac
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from llm.api import router as career_router
+from fastapi.middleware.gzip import GZipMiddleware
+from llm.api import job_queue, router as career_router
+from llm.metrics import HTTP_LATENCY, render_prometheus
+from llm.profiler import DEFAULT_INTERVAL_MS, profiles
+from llm.responses import CareerJSONResponse
+from llm.tracing import current_trace, finish_trace, start_trace
 
-app = FastAPI(title="Main API")
+# Responses smaller than this are sent uncompressed; below ~1KB the
+# compression overhead outweighs the bytes saved.
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+# Admin endpoints (profiling) are disabled unless ADMIN_TOKEN is set; callers
+# send it in the X-Admin-Token header.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+PROFILE_MAX_SECONDS = 300
+
+@asynccontextmanager
+async def lifespan(app):
+    # Runs in every worker after the fork: restart background jobs a dead process left behind
+    job_queue.resume()
+    yield
+
+app = FastAPI(title="Main API", default_response_class=CareerJSONResponse, lifespan=lifespan)
 
 # CORS (mirrors your previous open policy)
 app.add_middleware(
@@ -13,13 +40,114 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compression: brotli when brotli-asgi is installed (it falls back to gzip for
+# clients that don't send "br"), plain gzip otherwise.
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(BrotliMiddleware, minimum_size=COMPRESSION_MIN_SIZE, gzip_fallback=True)
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
+
+def is_admin(request: Request):
+    token = request.headers.get("x-admin-token", "")
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+# Profiling hooks: "X-Profile: 1" (with the admin token) samples the threads working for
+# this request and returns an X-Profile-Id for GET /admin/profile/{id}; every request also
+# counts towards an active whole-process session started with POST /admin/profile.
+# Registered before trace_and_time so it runs inside the request's trace.
+@app.middleware("http")
+async def profile_hooks(request: Request, call_next):
+    profiler = profiles.profile_request(current_trace()) if request.headers.get("x-profile") and is_admin(request) else None
+    try:
+        response = await call_next(request)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+    if profiler is not None:
+        response.headers["X-Profile-Id"] = profiles.store(profiler, f"{request.method} {request.url.path}")
+    if not request.url.path.startswith("/admin/"):
+        profiles.request_finished()
+    return response
+
+# Per-request trace (spans from llm/tracing.py, returned as Server-Timing) and
+# latency per route template (not raw path, to keep label cardinality bounded)
+@app.middleware("http")
+async def trace_and_time(request: Request, call_next):
+    start = time.perf_counter()
+    trace, token = start_trace(f"{request.method} {request.url.path}", method=request.method)
+    try:
+        response = await call_next(request)
+    except Exception:
+        finish_trace(trace, token, status=500)
+        raise
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    finish_trace(trace, token, route=route, status=response.status_code)
+    response.headers["Server-Timing"] = trace.server_timing()
+    HTTP_LATENCY.observe(time.perf_counter() - start, method=request.method,
+                         route=route, status=response.status_code)
+    return response
+
 # Include the LLM/career router at /career
 app.include_router(career_router)
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus text exposition of LLM token/latency and HTTP metrics"""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def collapsed_response(text, **headers):
+    headers["Content-Disposition"] = 'attachment; filename="profile.collapsed"'
+    return PlainTextResponse(text, headers={k: str(v) for k, v in headers.items()})
+
+@app.post("/admin/profile", include_in_schema=False)
+async def profile_process(request: Request, seconds: float = 30, requests: Optional[int] = None,
+                          interval_ms: float = DEFAULT_INTERVAL_MS):
+    """Sample all threads for `seconds`, or until `requests` requests finished (capped by seconds),
+    and return collapsed stacks for flamegraph.pl / speedscope"""
+    if not is_admin(request):
+        raise HTTPException(status_code=404, detail="Not Found")
+    seconds = max(0.1, min(seconds, PROFILE_MAX_SECONDS))
+    session = profiles.start_session(seconds, requests, interval_ms)
+    if session is None:
+        raise HTTPException(status_code=409, detail="A profiling session is already running")
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, session.done.wait, seconds)
+    finally:
+        text = profiles.end_session(session)
+    return collapsed_response(text, **{"X-Profile-Samples": session.profiler.samples,
+                                       "X-Profile-Requests": session.requests,
+                                       "X-Profile-Elapsed-Ms": round(session.profiler.elapsed * 1000, 1)})
+
+@app.get("/admin/profile/{profile_id}", include_in_schema=False)
+def get_request_profile(profile_id: str, request: Request):
+    """Collapsed stacks of a request profiled with the X-Profile header"""
+    stored = profiles.get(profile_id) if is_admin(request) else None
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    text, meta = stored
+    return collapsed_response(text, **{"X-Profile-Label": meta["label"], "X-Profile-Samples": meta["samples"],
+                                       "X-Profile-Elapsed-Ms": meta["elapsed_ms"]})
+
 @app.get("/")
 def root():
-    return {"message": "Main API is running", "routes": ["GET /", "mounted: /career/*"]}
+    return {"message": "Main API is running", "routes": ["GET /", "GET /metrics", "mounted: /career/*"]}
 
 # Run with:
 #   cd backend
 #   uvicorn server:app --reload --port 8000
+#
+# Multi-worker production mode (shared mmapped data, preloaded models):
+#   cd backend
+#   python serve.py --workers 8 --port 8000
+#
+# Profiling (ADMIN_TOKEN set in the environment):
+#   curl -X POST -H "X-Admin-Token: $ADMIN_TOKEN" "localhost:8000/admin/profile?seconds=30" > out.collapsed
+#   curl -X POST -H "X-Admin-Token: $ADMIN_TOKEN" "localhost:8000/admin/profile?requests=50&seconds=120" > out.collapsed
+#   curl -i -H "X-Admin-Token: $ADMIN_TOKEN" -H "X-Profile: 1" localhost:8000/career/analyze-trends/Data%20Analyst
+#     then GET /admin/profile/<X-Profile-Id>; render with flamegraph.pl out.collapsed > out.svg
+# With several workers each one profiles itself; a session covers the worker that received it.
+#
+# Speculative analysis (deterministic answer now, LLM enrichment in the background):
+#   curl -X POST "localhost:8000/career/analyze-resume?mode=speculative" -H "Content-Type: application/json" -d @req.json
+#   curl -N localhost:8000/career/jobs/<job_id>/events